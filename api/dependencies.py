@@ -0,0 +1,25 @@
+# app/api/dependencies.py
+"""
+Router dependencies that resolve their service when a request comes in.
+
+`Depends(auth_service.get_current_user)` reads the attribute while the
+router module is imported, which builds the service right then; these
+functions look it up in the container on each call instead.
+"""
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+
+from app.core.container import services
+from app.core.database import get_db
+from app.models.user import User
+
+security = HTTPBearer()
+
+
+def get_current_user(
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user"""
+    return services.get("auth").get_current_user(credentials, db)
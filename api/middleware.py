@@ -0,0 +1,281 @@
+# app/api/middleware.py
+import gzip
+import logging
+import math
+import re
+import time
+import uuid
+from typing import Optional
+from uuid import UUID
+
+import jwt
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+from app.core.config import settings
+from app.core.container import services
+from app.core.database import pool_limits
+from app.core.log import request_id_var, should_log_request
+from app.core.profiling import request_profiler, DEBUG_HEADER
+from app.core.rate_limit import KeyedRateLimiter, ConcurrencyLimiter, OverloadedError
+
+API_PREFIX = "/api/v1/"
+PAYMENT_PREFIX = "/api/v1/transactions/"
+# Long-lived responses; they hold no DB connection while open
+STREAMING_PATHS = ("/api/v1/wallets/events",)
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+REQUEST_ID_HEADER = "x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+request_logger = logging.getLogger("app.request")
+
+
+def _retry_after(seconds: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+class LoadSheddingMiddleware:
+    """Per-user and per-store token buckets on payment routes, plus a concurrency cap on all API routes
+
+    Everything here is answered from memory so that a rejected request never
+    touches the database:
+    - users are identified from the bearer token without a DB lookup
+      (falling back to client IP),
+    - the store is taken from the wallet -> store cache, so a store bucket
+      applies once its wallets have been seen by this worker.
+
+    Event streams skip the concurrency cap: each one stays open for as long
+    as its client is connected, so they would otherwise use up the slots.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.user_limiter = KeyedRateLimiter(settings.RATE_LIMIT_USER_PER_SECOND, settings.RATE_LIMIT_USER_BURST)
+        self.store_limiter = KeyedRateLimiter(settings.RATE_LIMIT_STORE_PER_SECOND, settings.RATE_LIMIT_STORE_BURST)
+        self.concurrency = ConcurrencyLimiter(
+            settings.LOAD_SHED_MAX_CONCURRENT or pool_limits.max_connections,
+            settings.LOAD_SHED_MAX_QUEUE,
+            settings.LOAD_SHED_QUEUE_TIMEOUT_SECONDS
+        )
+        self.authorization = services.lazy("authorization")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or not path.startswith(API_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        if path.startswith(PAYMENT_PREFIX):
+            rejection = self._check_rate_limits(scope)
+            if rejection is not None:
+                await rejection(scope, receive, send)
+                return
+
+        if path in STREAMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            async with self.concurrency:
+                await self.app(scope, receive, send)
+        except OverloadedError as e:
+            response = JSONResponse(
+                {"detail": f"Server busy: {e}"}, status_code=503, headers=_retry_after(self.concurrency.queue_timeout)
+            )
+            await response(scope, receive, send)
+
+    def _check_rate_limits(self, scope: Scope) -> Optional[JSONResponse]:
+        allowed, wait = self.user_limiter.hit(self._client_key(scope))
+        if allowed:
+            store_id = self._store_id(scope)
+            if store_id is not None:
+                allowed, wait = self.store_limiter.hit(store_id)
+        if allowed:
+            return None
+        return JSONResponse({"detail": "Too many requests"}, status_code=429, headers=_retry_after(wait))
+
+    def _client_key(self, scope: Scope) -> str:
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                try:
+                    payload = jwt.decode(value[7:].decode(), settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                    return f"user:{payload['sub']}"
+                except (jwt.PyJWTError, KeyError, UnicodeDecodeError):
+                    break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    def _store_id(self, scope: Scope) -> Optional[UUID]:
+        for part in scope.get("query_string", b"").decode("latin-1").split("&"):
+            if part.startswith("wallet_id="):
+                try:
+                    return self.authorization.peek_wallet_store_id(UUID(part[len("wallet_id="):]))
+                except ValueError:
+                    return None
+        return None
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """Compress complete JSON/text responses with brotli or gzip
+
+    Only single-message bodies above COMPRESSION_MINIMUM_SIZE are compressed;
+    streamed responses pass through untouched so events are not held back in
+    a compressor buffer. Event streams skip the middleware entirely: their
+    headers would otherwise wait for the first event or keepalive.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("path", "") in STREAMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            if encoding == "br":
+                body = brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+            else:
+                body = gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class ProfilingMiddleware:
+    """Profile sampled API requests into the in-memory slowest-samples buffer
+
+    Event streams are never profiled: the profiler would stay enabled on the
+    event loop, and keep the profiling slot, until the client disconnects.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(API_PREFIX) or path in STREAMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+        if not request_profiler.should_profile(Headers(scope=scope).get(DEBUG_HEADER)):
+            await self.app(scope, receive, send)
+            return
+        token = request_profiler.start(scope["method"], scope["path"])
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = None
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_profiler.finish(token, status_code)
+
+
+class RequestLoggingMiddleware:
+    """Give every request a correlation id and log it (sampled, see core.log.should_log_request)
+
+    The id comes from the caller's X-Request-ID when it looks sane, so a
+    trace can span the app and its clients, and is echoed on the response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = Headers(scope=scope).get(REQUEST_ID_HEADER)
+        request_id = incoming if incoming and _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status_code = None
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            path = scope.get("path", "")
+            if should_log_request(path, status_code, duration_ms):
+                level = logging.WARNING if status_code is None or status_code >= 500 else logging.INFO
+                request_logger.log(level, "%s %s %s", scope["method"], path, status_code, extra={
+                    "method": scope["method"],
+                    "path": path,
+                    "status_code": status_code,
+                    "duration_ms": round(duration_ms, 1)
+                })
+            request_id_var.reset(token)
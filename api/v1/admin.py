@@ -0,0 +1,56 @@
+# app/api/v1/admin.py
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from typing import List, Optional
+import hmac
+
+from app.core.config import settings
+from app.core.database import statement_cache_stats
+from app.core.profiling import request_profiler, sign_debug_header, DEBUG_HEADER
+from app.schemas.admin import ProfileSampleResponse, DebugHeaderResponse
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)):
+    """Admin endpoints answer only to the configured X-Admin-Key (and don't exist without one)"""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+
+router = APIRouter(dependencies=[Depends(require_admin_key)])
+
+
+@router.get("/profiles", response_model=List[ProfileSampleResponse], summary="Get slowest profiled requests")
+async def get_profiles(
+    limit: int = Query(20, ge=1, le=100),
+    include_profile: bool = Query(True, description="Include the cProfile report")
+):
+    """Slowest sampled requests in this worker, slowest first"""
+    samples = request_profiler.samples.snapshot()[:limit]
+    responses = [ProfileSampleResponse.from_orm(sample) for sample in samples]
+    if not include_profile:
+        for response in responses:
+            response.profile = None
+    return responses
+
+
+@router.delete("/profiles", status_code=204, summary="Clear profiled requests")
+async def clear_profiles():
+    """Drop all samples in this worker"""
+    request_profiler.samples.clear()
+
+
+@router.post("/profiles/debug-header", response_model=DebugHeaderResponse, summary="Get a signed profiling header")
+async def create_debug_header():
+    """Header that makes any API request to be profiled while it is valid"""
+    return DebugHeaderResponse(
+        header=DEBUG_HEADER,
+        value=sign_debug_header(),
+        expires_in=settings.PROFILING_HEADER_MAX_AGE_SECONDS
+    )
+
+
+@router.get("/statement-cache", summary="Get compiled-statement cache hit rate")
+async def get_statement_cache_stats():
+    """SQLAlchemy compiled-SQL cache hits and misses in this worker"""
+    return statement_cache_stats()
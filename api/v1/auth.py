@@ -8,15 +8,16 @@ import jwt
 import random
 
 from app.core.database import get_db
+from app.api import dependencies
+from app.core.container import services
 from app.core.config import settings
 from app.core.exceptions import InvalidVerificationCodeError, UserNotVerifiedError
-from app.schemas.user import PhoneVerificationRequest, PhoneVerificationConfirm, UserCreate, UserResponse
-from app.services.auth_service import AuthService
+from app.schemas.user import PhoneVerificationRequest, PhoneVerificationConfirm, UserCreate, UserResponse, UserTokenResponse
 from app.models.user import User
 
 router = APIRouter()
 security = HTTPBearer()
-auth_service = AuthService()
+auth_service = services.lazy("auth")
 
 
 @router.post("/send-verification", summary="Send SMS verification code")
@@ -32,7 +33,7 @@ async def send_verification_code(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/verify-phone", response_model=UserResponse, summary="Verify phone and create/login user")
+@router.post("/verify-phone", response_model=UserTokenResponse, summary="Verify phone and create/login user")
 async def verify_phone_and_login(
         request: PhoneVerificationConfirm,
         db: Session = Depends(get_db)
@@ -55,7 +56,7 @@ async def verify_phone_and_login(
 
 @router.get("/me", response_model=UserResponse, summary="Get current user")
 async def get_current_user(
-        current_user: User = Depends(auth_service.get_current_user)
+        current_user: User = Depends(dependencies.get_current_user)
 ):
     """Get current authenticated user information"""
     return current_user
\ No newline at end of file
@@ -1,24 +1,40 @@
 # app/api/v1/stores.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from decimal import Decimal
+from datetime import date
+from uuid import UUID
 
 from app.core.database import get_db
-from app.schemas.store import StoreCreate, StoreResponse
-from app.services.auth_service import AuthService
-from app.services.store_service import StoreService
+from app.api.dependencies import get_current_user
+from app.core.container import services
+from app.core.etag import etag_matches, not_modified, set_etag
+from app.api.projection import FIELDS_DESCRIPTION, parse_fields, project
+from app.schemas.store import StoreCreate, StoreUpdate, StoreResponse
+from app.schemas.wallet import WalletResponse, StoreWalletResponse, StoreWalletPage
+from app.schemas.pos_sync import SyncRequest, SyncResponse
+from app.schemas.analytics import StoreDailyRollupResponse, StoreHourlyRollupResponse
 from app.models.user import User
+from app.core.exceptions import StoreNotFoundError, SyncConflictError
 
 router = APIRouter()
-auth_service = AuthService()
-store_service = StoreService()
+store_service = services.lazy("store")
+analytics_service = services.lazy("analytics")
+wallet_service = services.lazy("wallet")
+notification_service = services.lazy("notification")
+
+STORE_WALLET_OWNER_FIELDS = {
+    "owner_name": lambda wallet: wallet.owner.name,
+    "owner_phone_number": lambda wallet: wallet.owner.phone_number
+}
 
 
 @router.post("/", response_model=StoreResponse, summary="Create new store")
 async def create_store(
         store_data: StoreCreate,
-        current_user: User = Depends(auth_service.get_current_user),
+        current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
     """Create a new store (user becomes owner/manager)"""
@@ -35,25 +51,37 @@ async def get_nearby_stores(
         longitude: Decimal = Query(..., description="User's longitude"),
         radius_km: int = Query(5, description="Search radius in kilometers"),
         category: Optional[str] = Query(None, description="Store category filter"),
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
         db: Session = Depends(get_db)
 ):
     """Find stores near user's location"""
     try:
+        field_names = parse_fields(fields, StoreResponse)
         stores = store_service.find_nearby_stores(db, latitude, longitude, radius_km, category)
+        if field_names:
+            return JSONResponse(project(stores, field_names))
         return stores
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/managed", response_model=List[StoreResponse], summary="Get stores managed by current user")
 async def get_managed_stores(
-        current_user: User = Depends(auth_service.get_current_user),
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+        current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
     """Get all stores managed by current user"""
     try:
+        field_names = parse_fields(fields, StoreResponse)
         stores = store_service.get_user_managed_stores(db, current_user.id)
+        if field_names:
+            return JSONResponse(project(stores, field_names))
         return stores
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -61,14 +89,44 @@ async def get_managed_stores(
 @router.get("/{store_id}", response_model=StoreResponse, summary="Get store details")
 async def get_store(
         store_id: str,
+        request: Request,
+        response: Response,
         db: Session = Depends(get_db)
 ):
-    """Get store information by ID"""
+    """Get store information by ID (supports If-None-Match)"""
     try:
+        etag = store_service.get_store_etag(db, store_id)
+        if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+
         store = store_service.get_store(db, store_id)
         if not store:
             raise HTTPException(status_code=404, detail="Store not found")
+        set_etag(response, etag)
         return store
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.patch("/{store_id}", response_model=StoreResponse, summary="Update store")
+async def update_store(
+        store_id: UUID,
+        store_data: StoreUpdate,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Update store details (store managers only)"""
+    try:
+        if not store_service.user_manages_store(db, current_user.id, store_id):
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        return store_service.update_store(db, store_id, store_data)
+    except HTTPException:
+        raise
+    except StoreNotFoundError:
+        raise HTTPException(status_code=404, detail="Store not found")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -76,7 +134,7 @@ async def get_store(
 @router.get("/{store_id}/qr", summary="Get store QR code")
 async def get_store_qr_code(
         store_id: str,
-        current_user: User = Depends(auth_service.get_current_user),
+        current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
     """Get QR code for store payments (store managers only)"""
@@ -89,3 +147,131 @@ async def get_store_qr_code(
         return {"qr_code": qr_code.qr_code_data, "store_id": store_id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{store_id}/wallets", response_model=StoreWalletPage, summary="Search customer wallets at store")
+async def search_store_wallets(
+        store_id: UUID,
+        q: Optional[str] = Query(None, description="Search text; omit to list all active wallets"),
+        by: str = Query("phone", pattern=r'^(phone|name|nickname)$', description="Phone suffix, name prefix or nickname"),
+        cursor: Optional[UUID] = Query(None, description="next_cursor from the previous page"),
+        limit: int = Query(20, ge=1, le=100),
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Find a customer's wallet at the counter (store managers only)"""
+    try:
+        field_names = parse_fields(fields, StoreWalletResponse)
+        if not store_service.user_manages_store(db, current_user.id, store_id):
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        wallets, next_cursor = wallet_service.search_store_wallets(db, store_id, q, by, cursor, limit)
+        if field_names:
+            return JSONResponse({
+                "items": project(wallets, field_names, STORE_WALLET_OWNER_FIELDS),
+                "next_cursor": str(next_cursor) if next_cursor else None
+            })
+        items = [
+            StoreWalletResponse(
+                **WalletResponse.from_orm(wallet).dict(),
+                owner_name=wallet.owner.name,
+                owner_phone_number=wallet.owner.phone_number
+            )
+            for wallet in wallets
+        ]
+        return StoreWalletPage(items=items, next_cursor=next_cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/{store_id}/terminals/{terminal_id}/sync",
+    response_model=SyncResponse,
+    summary="Sync a POS terminal's offline operations"
+)
+async def sync_terminal(
+        store_id: UUID,
+        sync_data: SyncRequest,
+        terminal_id: str = Path(..., max_length=100),
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Apply queued charges/spends in order and return wallet balances changed since sync_token (store managers only)
+
+    Safe to retry: operations already received under the same client_op_id
+    return their recorded outcome instead of being applied twice.
+    """
+    try:
+        if not store_service.user_manages_store(db, current_user.id, store_id):
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        response, transactions = wallet_service.sync_terminal_operations(
+            db,
+            store_id,
+            terminal_id,
+            sync_data.operations,
+            current_user.id,
+            sync_data.sync_token
+        )
+
+        # Send notifications (async)
+        for transaction in transactions:
+            await notification_service.send_transaction_notifications(db, transaction)
+
+        return response
+    except HTTPException:
+        raise
+    except SyncConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/{store_id}/dashboard/daily",
+    response_model=List[StoreDailyRollupResponse],
+    summary="Get daily store totals"
+)
+async def get_daily_dashboard(
+        store_id: UUID,
+        start_date: Optional[date] = Query(None, description="First day (default: 29 days before end_date)"),
+        end_date: Optional[date] = Query(None, description="Last day (default: today)"),
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Daily charge/spend/bonus/refund totals and active wallets (store managers only)"""
+    try:
+        if not store_service.user_manages_store(db, current_user.id, store_id):
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        return analytics_service.get_daily_rollups(db, store_id, start_date, end_date)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/{store_id}/dashboard/hourly",
+    response_model=List[StoreHourlyRollupResponse],
+    summary="Get hourly store totals for a day"
+)
+async def get_hourly_dashboard(
+        store_id: UUID,
+        day: Optional[date] = Query(None, description="Local day (default: today)"),
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Hourly charge/spend/bonus/refund totals for one day (store managers only)"""
+    try:
+        if not store_service.user_manages_store(db, current_user.id, store_id):
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        return analytics_service.get_hourly_rollups(db, store_id, day)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,28 +1,37 @@
 # app/api/v1/transactions.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from decimal import Decimal
+import math
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.core.database import get_db
-from app.schemas.wallet import TransactionCreate, TransactionResponse
-from app.services.auth_service import AuthService
-from app.services.wallet_service import WalletService
-from app.services.notification_service import NotificationService
+from app.api.dependencies import get_current_user
+from app.core.container import services
+from app.schemas.wallet import TransactionCreate, TransactionResponse, CreditTransferCreate, RefundCreate
 from app.models.user import User
 from app.models.wallet import TransactionMethod
-from app.core.exceptions import WalletNotFoundError, InsufficientFundsError
+from app.core.exceptions import (
+    WalletNotFoundError, InsufficientFundsError, WalletAccessDeniedError, TransactionNotFoundError,
+    RefundNotAllowedError, RiskCheckFailedError
+)
 
 router = APIRouter()
-auth_service = AuthService()
-wallet_service = WalletService()
-notification_service = NotificationService()
+wallet_service = services.lazy("wallet")
+notification_service = services.lazy("notification")
+
+
+def _too_many_spends(e: RiskCheckFailedError) -> HTTPException:
+    return HTTPException(
+        status_code=429, detail=str(e), headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
 
 
 @router.post("/charge", response_model=TransactionResponse, summary="Charge wallet")
 async def charge_wallet(
         wallet_id: UUID,
         transaction_data: TransactionCreate,
-        current_user: User = Depends(auth_service.get_current_user),
+        current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
     """Charge money to wallet (store managers only)"""
@@ -59,7 +68,7 @@ async def charge_wallet(
 async def spend_from_wallet(
         wallet_id: UUID,
         transaction_data: TransactionCreate,
-        current_user: User = Depends(auth_service.get_current_user),
+        current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
     """Spend money from wallet (wallet owner or store manager)"""
@@ -90,24 +99,103 @@ async def spend_from_wallet(
         raise HTTPException(status_code=404, detail="Wallet not found")
     except InsufficientFundsError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except RiskCheckFailedError as e:
+        raise _too_many_spends(e)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/qr-payment", summary="Process QR code payment")
+@router.post("/transfer", response_model=TransactionResponse, summary="Transfer credit between wallets")
+async def transfer_credit(
+        wallet_id: UUID,
+        transfer_data: CreditTransferCreate,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Transfer regular balance to another wallet of the same store or chain (wallet owner, member or store manager)"""
+    try:
+        # Verify user can spend from the source wallet
+        if not wallet_service.can_user_spend_from_wallet(db, current_user.id, wallet_id):
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        transaction = wallet_service.transfer_credit(
+            db,
+            wallet_id,
+            transfer_data.to_wallet_id,
+            transfer_data.amount,
+            current_user.id,
+            transfer_data.description
+        )
+
+        # Send notifications (async)
+        await notification_service.send_transaction_notifications(db, transaction)
+
+        return transaction
+
+    except HTTPException:
+        raise
+    except WalletNotFoundError:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    except InsufficientFundsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RiskCheckFailedError as e:
+        raise _too_many_spends(e)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/refund", response_model=TransactionResponse, summary="Refund a spend")
+async def refund_transaction(
+        transaction_id: UUID,
+        refund_data: RefundCreate,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """Refund a SPEND transaction fully or partially (store managers only)"""
+    try:
+        transaction = wallet_service.refund_transaction(
+            db,
+            transaction_id,
+            current_user.id,
+            refund_data.amount,
+            refund_data.description
+        )
+
+        # Send notifications (async)
+        await notification_service.send_transaction_notifications(db, transaction)
+
+        return transaction
+
+    except (TransactionNotFoundError, WalletNotFoundError):
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    except WalletAccessDeniedError:
+        raise HTTPException(status_code=403, detail="Access denied")
+    except RefundNotAllowedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/qr-payment", response_model=TransactionResponse, summary="Process QR code payment")
 async def process_qr_payment(
         qr_code: str,
-        amount: float,
-        current_user: User = Depends(auth_service.get_current_user),
+        amount: Decimal = Query(..., gt=0, decimal_places=2),
+        current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    """Process payment using store QR code"""
+    """Pay at the store behind a QR code, from the user's wallet there or their chain wallet"""
     try:
-        result = wallet_service.process_qr_payment(db, qr_code, amount, current_user.id)
-        return result
+        transaction = wallet_service.process_qr_payment(db, qr_code, amount, current_user.id)
+
+        # Send notifications (async)
+        await notification_service.send_transaction_notifications(db, transaction)
+
+        return transaction
     except WalletNotFoundError:
         raise HTTPException(status_code=404, detail="Wallet or store not found")
     except InsufficientFundsError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except RiskCheckFailedError as e:
+        raise _too_many_spends(e)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
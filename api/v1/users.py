@@ -4,19 +4,18 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.core.database import get_db
+from app.api.dependencies import get_current_user
+from app.core.container import services
 from app.schemas.user import UserResponse, UserCreate
-from app.services.auth_service import AuthService
-from app.services.user_service import UserService
 from app.models.user import User
 
 router = APIRouter()
-auth_service = AuthService()
-user_service = UserService()
+user_service = services.lazy("user")
 
 @router.patch("/profile", response_model=UserResponse, summary="Update user profile")
 async def update_profile(
     user_update: dict,
-    current_user: User = Depends(auth_service.get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update current user's profile information"""
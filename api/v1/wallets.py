@@ -1,36 +1,67 @@
 # app/api/v1/wallets.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from uuid import UUID
+import asyncio
+import json
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.schemas.wallet import WalletCreate, WalletResponse, TransactionCreate, TransactionResponse
-from app.services.auth_service import AuthService
-from app.services.wallet_service import WalletService
+from app.api.dependencies import get_current_user
+from app.core.container import services
+from app.core.etag import make_etag, etag_matches, not_modified, set_etag
+from app.api.projection import FIELDS_DESCRIPTION, parse_fields, project
+from app.core.events import event_broker
+from app.schemas.wallet import (
+    WalletCreate, WalletResponse, WalletBalanceTotal, WalletMemberAdd, WalletMemberResponse, TransactionCreate, TransactionResponse
+)
+from app.schemas.statement import WalletStatementResponse
 from app.models.user import User
-from app.core.exceptions import WalletNotFoundError, InsufficientFundsError
+from app.core.exceptions import (
+    WalletNotFoundError, InsufficientFundsError, WalletAccessDeniedError, UserNotFoundError, StatementNotFoundError
+)
 
 router = APIRouter()
-auth_service = AuthService()
-wallet_service = WalletService()
+wallet_service = services.lazy("wallet")
+statement_service = services.lazy("statement")
 
 @router.get("/", response_model=List[WalletResponse], summary="Get user's wallets")
 async def get_my_wallets(
-    current_user: User = Depends(auth_service.get_current_user),
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all wallets owned by current user"""
+    """Get all wallets owned by current user (supports If-None-Match)"""
     try:
+        field_names = parse_fields(fields, WalletResponse)
+        etag = wallet_service.get_user_wallets_etag(db, current_user.id)
+        if field_names:
+            # Each projection is a different representation
+            etag = make_etag(etag, *field_names)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+
         wallets = wallet_service.get_user_wallets(db, current_user.id)
+        if field_names:
+            projected = JSONResponse(project(wallets, field_names))
+            set_etag(projected, etag)
+            return projected
+        set_etag(response, etag)
         return wallets
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/", response_model=WalletResponse, summary="Create wallet at store")
 async def create_wallet(
     wallet_data: WalletCreate,
-    current_user: User = Depends(auth_service.get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new wallet for current user at specified store"""
@@ -45,15 +76,82 @@ async def create_wallet(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/events", summary="Stream wallet balance changes (Server-Sent Events)")
+async def stream_wallet_events(
+    request: Request,
+    wallet_id: Optional[List[UUID]] = Query(None, description="Wallets to watch (default: all of the user's wallets)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Push `balance` events whenever a watched wallet is charged, spent, refunded or transferred"""
+    try:
+        wallet_ids = wallet_service.get_subscribable_wallet_ids(db, current_user.id, wallet_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not wallet_ids:
+        raise HTTPException(status_code=404, detail="No wallets to watch")
+    # Don't hold a pooled connection for the lifetime of the stream
+    db.close()
+
+    async def event_stream():
+        with event_broker.subscribe(wallet_ids) as subscription:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), settings.EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: balance\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/balances", response_model=List[WalletBalanceTotal], summary="Get user's balances per store or chain")
+async def get_my_balances(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get current user's active balances summed per chain, or per store outside chains"""
+    try:
+        return wallet_service.get_user_balances(db, current_user.id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/statements/{statement_id}", response_model=WalletStatementResponse, summary="Get wallet statement")
+async def get_statement(
+    statement_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get one monthly statement (wallet owner, members or store managers)"""
+    try:
+        return statement_service.get_statement(db, statement_id, current_user.id)
+    except StatementNotFoundError:
+        raise HTTPException(status_code=404, detail="Statement not found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{wallet_id}", response_model=WalletResponse, summary="Get wallet details")
 async def get_wallet(
     wallet_id: UUID,
-    current_user: User = Depends(auth_service.get_current_user),
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get wallet details (owner or store manager only)"""
+    """Get wallet details (owner or store manager only; supports If-None-Match)"""
     try:
+        etag = wallet_service.get_wallet_etag(db, wallet_id, current_user.id)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+
+        # A posting between the two reads only makes the body newer than the tag,
+        # which costs the client one extra full response, never a stale one
         wallet = wallet_service.get_wallet_with_access_check(db, wallet_id, current_user.id)
+        set_etag(response, etag)
         return wallet
     except WalletNotFoundError:
         raise HTTPException(status_code=404, detail="Wallet not found")
@@ -65,16 +163,101 @@ async def get_wallet_transactions(
     wallet_id: UUID,
     skip: int = 0,
     limit: int = 50,
-    current_user: User = Depends(auth_service.get_current_user),
+    before: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get transaction history for wallet"""
+    """Get transaction history for wallet (pass the last row's created_at as `before` to page)"""
     try:
+        field_names = parse_fields(fields, TransactionResponse)
         # Verify access
         wallet_service.get_wallet_with_access_check(db, wallet_id, current_user.id)
-        transactions = wallet_service.get_wallet_transactions(db, wallet_id, skip, limit)
+        transactions = wallet_service.get_wallet_transactions(db, wallet_id, skip, limit, before)
+        if field_names:
+            return JSONResponse(project(transactions, field_names))
         return transactions
+    except HTTPException:
+        raise
+    except WalletNotFoundError:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get(
+    "/{wallet_id}/statements",
+    response_model=List[WalletStatementResponse],
+    summary="Get wallet monthly statements"
+)
+async def get_wallet_statements(
+    wallet_id: UUID,
+    limit: int = Query(24, ge=1, le=120),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get monthly statements for wallet, newest first (months without activity have none)"""
+    try:
+        return statement_service.get_wallet_statements(db, wallet_id, current_user.id, limit)
+    except WalletNotFoundError:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{wallet_id}/members", response_model=List[WalletMemberResponse], summary="Get wallet members")
+async def get_wallet_members(
+    wallet_id: UUID,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get members sharing this wallet"""
+    try:
+        field_names = parse_fields(fields, WalletMemberResponse)
+        members = wallet_service.get_wallet_members(db, wallet_id, current_user.id)
+        if field_names:
+            return JSONResponse(project(members, field_names))
+        return members
+    except HTTPException:
+        raise
+    except WalletNotFoundError:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/{wallet_id}/members", response_model=WalletMemberResponse, summary="Share wallet with user")
+async def add_wallet_member(
+    wallet_id: UUID,
+    member_data: WalletMemberAdd,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Add a member who can spend from this wallet (wallet owner only)"""
+    try:
+        return wallet_service.add_wallet_member(db, wallet_id, current_user.id, member_data.phone_number)
+    except WalletNotFoundError:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    except UserNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except WalletAccessDeniedError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/{wallet_id}/members/{user_id}", status_code=204, summary="Remove wallet member")
+async def remove_wallet_member(
+    wallet_id: UUID,
+    user_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Remove a member (wallet owner), or leave a shared wallet (member)"""
+    try:
+        wallet_service.remove_wallet_member(db, wallet_id, user_id, current_user.id)
     except WalletNotFoundError:
         raise HTTPException(status_code=404, detail="Wallet not found")
+    except UserNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except WalletAccessDeniedError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
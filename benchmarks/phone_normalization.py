@@ -0,0 +1,26 @@
+# app/benchmarks/phone_normalization.py
+"""
+Micro-benchmark for utils.phone_utils.normalize_phone_number.
+
+    python -m app.benchmarks.phone_normalization
+"""
+import timeit
+
+from app.utils.phone_utils import normalize_phone_number
+
+SAMPLES = {
+    "e164 (fast path)": "+821012345678",
+    "dashed": "010-1234-5678",
+    "digits": "01012345678",
+    "international spaced": "+82 10 1234 5678",
+}
+
+
+def run(number: int = 200_000) -> None:
+    for label, value in SAMPLES.items():
+        seconds = timeit.timeit(lambda: normalize_phone_number(value), number=number)
+        print(f"{label:<22} {seconds / number * 1e9:8.0f} ns/call  {number / seconds:12,.0f} calls/s")
+
+
+if __name__ == "__main__":
+    run()
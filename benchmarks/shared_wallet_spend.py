@@ -0,0 +1,106 @@
+# app/benchmarks/shared_wallet_spend.py
+"""
+Throughput of many members spending from one shared wallet at once.
+
+Every spend locks the same wallet row, so this measures how long the
+critical section in WalletService.spend_from_wallet really is. Run it
+against a disposable Postgres database; it leaves its rows behind.
+
+    DATABASE_URL=postgresql+psycopg://... python -m app.benchmarks.shared_wallet_spend --members 50
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from app.core.database import SessionLocal, engine, Base
+from app.models.user import User
+from app.models.store import Store
+from app.models.wallet import Wallet, WalletMember, WalletStatus, TransactionMethod
+from app.core.risk import risk_engine
+from app.services.wallet_service import WalletService
+
+
+def _setup(members: int, opening_balance: Decimal):
+    db = SessionLocal()
+    try:
+        suffix = random.randint(0, 9999)
+        owner = User(name="Bench owner", phone_number=f"+8210{suffix:04d}9999", is_verified=True)
+        store = Store(name="Bench store")
+        db.add_all([owner, store])
+        db.flush()
+        wallet = Wallet(
+            owner_id=owner.id, store_id=store.id, is_shared=True, status=WalletStatus.ACTIVE,
+            balance=opening_balance, bonus_balance=Decimal("0.00")
+        )
+        db.add(wallet)
+        db.flush()
+        member_ids = [owner.id]
+        for i in range(members - 1):
+            user = User(name=f"Bench member {i}", phone_number=f"+8210{suffix:04d}{i:04d}", is_verified=True)
+            db.add(user)
+            db.flush()
+            db.add(WalletMember(wallet_id=wallet.id, user_id=user.id))
+            member_ids.append(user.id)
+        db.commit()
+        return wallet.id, member_ids
+    finally:
+        db.close()
+
+
+def run(members: int, spends_per_member: int, amount: Decimal) -> None:
+    Base.metadata.create_all(bind=engine)
+    # Dozens of spends a minute on one wallet is exactly what the velocity rules stop
+    risk_engine.rules = []
+    total_spends = members * spends_per_member
+    opening_balance = amount * total_spends
+    wallet_id, member_ids = _setup(members, opening_balance)
+    wallet_service = WalletService()
+    latencies = []
+    latencies_lock = threading.Lock()
+
+    def member_worker(user_id):
+        db = SessionLocal()
+        local = []
+        try:
+            for _ in range(spends_per_member):
+                started = time.perf_counter()
+                wallet_service.spend_from_wallet(db, wallet_id, amount, TransactionMethod.TRANSFER, user_id)
+                local.append(time.perf_counter() - started)
+        finally:
+            db.close()
+        with latencies_lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=members) as pool:
+        list(pool.map(member_worker, member_ids))
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    try:
+        wallet = db.get(Wallet, wallet_id)
+        remaining = wallet.balance + wallet.bonus_balance
+    finally:
+        db.close()
+
+    latencies.sort()
+    print(f"members={members} spends={total_spends} elapsed={elapsed:.2f}s")
+    print(f"throughput={total_spends / elapsed:.1f} spends/s")
+    print(f"latency p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms")
+    print(f"remaining balance={remaining} (expected 0.00)")
+    if remaining != 0:
+        raise SystemExit("Lost update detected: wallet balance does not match postings")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=20)
+    parser.add_argument("--spends-per-member", type=int, default=50)
+    parser.add_argument("--amount", type=Decimal, default=Decimal("100.00"))
+    args = parser.parse_args()
+    run(args.members, args.spends_per_member, args.amount)
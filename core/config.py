@@ -1,6 +1,6 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 
@@ -23,8 +23,95 @@ class Settings(BaseSettings):
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
 
     # Performance
+    STARTUP_IMPORT_BUDGET_MS: int = 1500  # Warn when app import takes longer
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 30
+    DB_POOL_MODE: str = "direct"  # "direct" (QueuePool per worker) or "external" (PgBouncer-style transaction pooler)
+    DB_CONNECTION_BUDGET: Optional[int] = None  # Total across workers; split evenly when set
+    WEB_CONCURRENCY: int = 1  # Worker processes (same variable gunicorn/uvicorn read)
+    DB_QUERY_CACHE_SIZE: int = 1200  # Compiled statements kept per engine
+    DB_PREPARE_THRESHOLD: Optional[int] = 5  # psycopg 3 only (postgresql+psycopg://); forced off in external mode
+
+    # Rate limiting and load shedding
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_USER_PER_SECOND: float = 5.0
+    RATE_LIMIT_USER_BURST: int = 20
+    RATE_LIMIT_STORE_PER_SECOND: float = 50.0
+    RATE_LIMIT_STORE_BURST: int = 100
+    LOAD_SHED_MAX_CONCURRENT: Optional[int] = None  # Defaults to this worker's max DB connections
+    LOAD_SHED_MAX_QUEUE: int = 100
+    LOAD_SHED_QUEUE_TIMEOUT_SECONDS: float = 2.0
+
+    # Spend velocity checks (None disables a rule)
+    RISK_CHECKS_ENABLED: bool = True
+    RISK_BACKEND: str = "local"  # "local" (per worker) or "redis" (shared; needs the redis package)
+    RISK_REDIS_URL: str = os.getenv("RISK_REDIS_URL", "redis://localhost:6379/0")
+    RISK_MAX_SUBJECTS: int = 100000  # Users, wallets and stores tracked per worker
+    RISK_USER_SPENDS_PER_MINUTE: Optional[int] = 10
+    RISK_USER_SPENDS_PER_HOUR: Optional[int] = 100
+    RISK_WALLET_SPENDS_PER_MINUTE: Optional[int] = 10
+    RISK_WALLET_AMOUNT_PER_HOUR: Optional[float] = None
+    RISK_STORE_SPENDS_PER_MINUTE: Optional[int] = 600
+
+    # Profiling
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_EVERY: int = 0  # Profile 1 in N requests; 0 = only requests with a signed X-Debug-Profile header
+    PROFILING_MAX_SAMPLES: int = 50  # Slowest samples kept per worker
+    PROFILING_TOP_FUNCTIONS: int = 30
+    PROFILING_HEADER_MAX_AGE_SECONDS: int = 300
+    ADMIN_API_KEY: Optional[str] = os.getenv("ADMIN_API_KEY")  # Admin endpoints are disabled when unset
+
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Smaller bodies are sent as is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # Used when the optional brotli package is installed
+
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = "json"  # "json" (one object per line) or "text"
+    LOG_SQL_ECHO: bool = False  # Every statement; local debugging only
+    LOG_SLOW_QUERY_MS: float = 200  # 0 disables slow-query logging
+    LOG_SLOW_REQUEST_MS: float = 1000  # Slower requests are always logged
+    LOG_REQUEST_SAMPLE_RATE: float = 1.0  # Share of other requests logged
+    LOG_ROUTE_SAMPLE_RATES: Dict[str, float] = {"/health": 0.01, "/api/v1/stores/nearby": 0.1}  # By path prefix
+
+    # Wallet events (SSE)
+    EVENT_BACKEND: str = "local"  # "local" (single worker) or "postgres" (NOTIFY/LISTEN across workers)
+    EVENT_SUBSCRIBER_QUEUE_SIZE: int = 100
+    EVENT_KEEPALIVE_SECONDS: int = 15
+
+    # POS terminal sync
+    SYNC_MAX_BATCH_OPERATIONS: int = 500  # Applied in one database transaction
+    SYNC_DELTA_OVERLAP_SECONDS: int = 30  # Re-send changes this far before the token to cover in-flight commits
+
+    # Caching
+    STORE_CACHE_TTL_SECONDS: int = 300
+    STORE_CACHE_MAX_ENTRIES: int = 10000
+    ACCESS_CACHE_TTL_SECONDS: int = 60
+    ACCESS_CACHE_MAX_ENTRIES: int = 50000
+
+    # Analytics
+    ANALYTICS_TIMEZONE: str = "Asia/Seoul"
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: int = 60  # 0 disables the in-process runner
+    ANALYTICS_ROLLUP_LAG_SECONDS: int = 60  # Leave room for in-flight postings to commit
+    ANALYTICS_ROLLUP_MAX_WINDOW_HOURS: int = 24
+
+    # Wallet statements
+    STATEMENT_JOB_INTERVAL_SECONDS: int = 3600  # 0 disables the in-process runner
+    STATEMENT_CLOSE_LAG_SECONDS: int = 300  # Wait after month end for in-flight postings to commit
+
+    # Bonus expiry
+    BONUS_LOT_EXPIRY_DAYS: Optional[int] = 365  # None: newly earned bonus never expires
+    BONUS_EXPIRY_INTERVAL_SECONDS: int = 3600  # 0 disables the in-process runner
+    BONUS_EXPIRY_BATCH_WALLETS: int = 5000  # Wallets expired per transaction
+
+    # Ledger partitioning
+    TRANSACTION_PARTITION_MONTHS_AHEAD: int = 3
+    TRANSACTION_HOT_MONTHS: int = 13  # Months kept attached, including the current one
+    TRANSACTION_ARCHIVE_SCHEMA: str = "ledger_archive"
+    TRANSACTION_ARCHIVE_TABLESPACE: Optional[str] = None  # e.g. a tablespace on compressed storage
+    TRANSACTION_ARCHIVE_ACCESS_METHOD: Optional[str] = None  # e.g. "columnar" where available (PG15+)
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 86400  # 0 disables the in-process runner
 
     class Config:
         env_file = ".env"
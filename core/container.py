@@ -0,0 +1,71 @@
+# app/core/container.py
+"""
+One shared, lazily built instance of each service.
+
+Routers used to build their own AuthService(), WalletService() and so on at
+import time, which also imported every service module (and the repositories,
+models and schemas behind it) before the first request. Routers now hold a
+LazyService handle; the service module is imported and the instance built on
+first use, and every router shares that instance.
+"""
+import importlib
+import threading
+from typing import Any, Dict
+
+
+class ServiceContainer:
+    def __init__(self):
+        self._targets: Dict[str, str] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, target: str) -> None:
+        """Register "package.module:ClassName" under `name`"""
+        self._targets[name] = target
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    module_name, _, class_name = self._targets[name].partition(":")
+                    instance = getattr(importlib.import_module(module_name), class_name)()
+                    self._instances[name] = instance
+        return instance
+
+    def lazy(self, name: str) -> "LazyService":
+        if name not in self._targets:
+            raise KeyError(f"Unknown service: {name}")
+        return LazyService(self, name)
+
+    def built(self) -> list:
+        """Names of services built so far"""
+        return sorted(self._instances)
+
+
+class LazyService:
+    """Stands in for a service and builds it on first attribute access"""
+    __slots__ = ("_container", "_name")
+
+    def __init__(self, container: ServiceContainer, name: str):
+        self._container = container
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._container.get(self._name), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyService {self._name}>"
+
+
+services = ServiceContainer()
+services.register("auth", "app.services.auth_service:AuthService")
+services.register("user", "app.services.user_service:UserService")
+services.register("wallet", "app.services.wallet_service:WalletService")
+services.register("store", "app.services.store_service:StoreService")
+services.register("analytics", "app.services.analytics_service:AnalyticsService")
+services.register("notification", "app.services.notification_service:NotificationService")
+services.register("statement", "app.services.statement_service:StatementService")
+services.register("bonus", "app.services.bonus_service:BonusService")
+services.register("authorization", "app.services.authorization_service:AuthorizationService")
@@ -1,21 +1,126 @@
 # app/core/database.py
-from sqlalchemy import create_engine
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import create_engine, text, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import QueuePool, NullPool, StaticPool
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
+POOL_MODE_DIRECT = "direct"
+POOL_MODE_EXTERNAL = "external"
+
+
+@dataclass(frozen=True)
+class PoolLimits:
+    """Connection limits of this worker process"""
+    mode: str
+    workers: int
+    pool_size: int  # Kept open (0 with an external pooler: NullPool)
+    max_overflow: int
+    max_connections: int  # Most connections this worker opens at once
+    prepare_threshold: Optional[int]
+
+
+def compute_pool_limits() -> PoolLimits:
+    """Split DB_CONNECTION_BUDGET across WEB_CONCURRENCY workers
+
+    Without a budget every worker gets DB_POOL_SIZE + DB_MAX_OVERFLOW, as
+    before. With DB_POOL_MODE="external" (PgBouncer or similar in transaction
+    mode) the app keeps no connections of its own and turns off server-side
+    prepared statements, which do not survive a change of server connection.
+    """
+    workers = max(1, settings.WEB_CONCURRENCY)
+    if settings.DB_CONNECTION_BUDGET:
+        per_worker = max(1, settings.DB_CONNECTION_BUDGET // workers)
+    else:
+        per_worker = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+    if settings.DB_POOL_MODE == POOL_MODE_EXTERNAL:
+        return PoolLimits(POOL_MODE_EXTERNAL, workers, 0, 0, per_worker, None)
+    if settings.DB_POOL_MODE != POOL_MODE_DIRECT:
+        raise ValueError(f"DB_POOL_MODE must be {POOL_MODE_DIRECT!r} or {POOL_MODE_EXTERNAL!r}")
+    pool_size = min(settings.DB_POOL_SIZE, per_worker)
+    return PoolLimits(
+        POOL_MODE_DIRECT, workers, pool_size, per_worker - pool_size, per_worker, settings.DB_PREPARE_THRESHOLD
+    )
+
+
+pool_limits = compute_pool_limits()
+
+
+def _is_sqlite() -> bool:
+    # Tests only (see tests/conftest.py); production is always Postgres
+    return make_url(settings.DATABASE_URL).get_backend_name() == "sqlite"
+
+
+def _connect_args() -> dict:
+    if _is_sqlite():
+        # Sessions are used from threadpool workers and background threads
+        return {"check_same_thread": False}
+    # psycopg 3 switches a statement to a server-side prepared statement after
+    # it has run prepare_threshold times on a connection (psycopg2 cannot)
+    if make_url(settings.DATABASE_URL).get_driver_name() == "psycopg":
+        return {"prepare_threshold": pool_limits.prepare_threshold}
+    return {}
+
+
+def _pool_args() -> dict:
+    if _is_sqlite() and make_url(settings.DATABASE_URL).database in (None, "", ":memory:"):
+        # Every connection to sqlite:// is a new empty database, so share one
+        return {"poolclass": StaticPool}
+    if pool_limits.mode == POOL_MODE_EXTERNAL:
+        # The external pooler owns pooling; app connections to it are cheap
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": QueuePool,
+        "pool_size": pool_limits.pool_size,
+        "max_overflow": pool_limits.max_overflow,
+        "pool_pre_ping": True,  # Verify connections before use
+        "pool_recycle": 3600,   # Recycle connections every hour
+    }
+
+
 # Performance-optimized engine
 engine = create_engine(
     settings.DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_pre_ping=True,  # Verify connections before use
-    pool_recycle=3600,   # Recycle connections every hour
-    echo=settings.DEBUG  # Log SQL queries in debug mode
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,  # Compiled SQL cache, see statement_cache_stats()
+    connect_args=_connect_args(),
+    echo=settings.LOG_SQL_ECHO,  # Production uses slow-query logging instead, see core.log
+    **_pool_args()
 )
 
+_statement_cache_stats = Counter()
+_statement_cache_lock = threading.Lock()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _count_statement_cache(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        with _statement_cache_lock:
+            _statement_cache_stats[context.cache_hit.name] += 1
+
+
+def statement_cache_stats() -> dict:
+    """Compiled-statement cache hits/misses of this worker since start"""
+    with _statement_cache_lock:
+        counts = dict(_statement_cache_stats)
+    hits = counts.get("CACHE_HIT", 0)
+    misses = counts.get("CACHE_MISS", 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "uncached": sum(counts.values()) - hits - misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else None,
+        "cache_size": settings.DB_QUERY_CACHE_SIZE
+    }
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -25,4 +130,47 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def init_db():
+    """Create extensions the models' indexes rely on, then any missing tables"""
+    # Services load lazily, so make sure every model is registered on Base
+    import app.models  # noqa: F401
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        Base.metadata.create_all(bind=connection)
+
+
+def report_pool_limits() -> None:
+    """Log this worker's effective connection limits, and warn when they cannot fit"""
+    limits = pool_limits
+    logger.info(
+        "Database pool: mode=%s workers=%d pool_size=%d max_overflow=%d max_connections=%d "
+        "(all workers: %d) prepare_threshold=%s",
+        limits.mode, limits.workers, limits.pool_size, limits.max_overflow, limits.max_connections,
+        limits.max_connections * limits.workers, limits.prepare_threshold
+    )
+    if settings.DB_CONNECTION_BUDGET and limits.max_connections * limits.workers > settings.DB_CONNECTION_BUDGET:
+        logger.warning(
+            "DB_CONNECTION_BUDGET=%d is smaller than one connection per worker", settings.DB_CONNECTION_BUDGET
+        )
+    if limits.mode == POOL_MODE_EXTERNAL:
+        if settings.EVENT_BACKEND == "postgres":
+            logger.warning("EVENT_BACKEND=postgres needs LISTEN on a session; point it past the pooler")
+        return
+    if engine.dialect.name != "postgresql":
+        return
+    try:
+        with engine.connect() as connection:
+            server_max = int(connection.execute(text("SHOW max_connections")).scalar())
+    except Exception:
+        logger.exception("Could not read max_connections")
+        return
+    total = limits.max_connections * limits.workers
+    if total > server_max:
+        logger.warning(
+            "Workers may open %d connections but Postgres allows %d; set DB_CONNECTION_BUDGET",
+            total, server_max
+        )
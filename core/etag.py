@@ -0,0 +1,38 @@
+# app/core/etag.py
+"""
+Weak ETags for conditional GETs.
+
+Endpoints compute the tag from a version check that is much cheaper than
+loading and serializing the resource, and answer 304 when the client's
+If-None-Match already names it.
+"""
+import hashlib
+from typing import Optional
+
+from starlette.responses import Response
+
+CACHE_CONTROL = "private, no-cache"  # Clients may keep a copy but must revalidate every time
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(":".join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header value"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
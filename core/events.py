@@ -0,0 +1,143 @@
+# app/core/events.py
+"""
+In-process pub/sub for wallet balance changes.
+
+The posting path publishes after commit; SSE subscribers receive events for
+the wallets they asked for. With EVENT_BACKEND="local" events stay inside one
+worker. With EVENT_BACKEND="postgres" they go through NOTIFY/LISTEN so every
+worker sees every posting, and each worker then fans out locally.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+from sqlalchemy import select, func
+
+from .config import settings
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "wallet_events"
+
+
+class Subscription:
+    def __init__(self, wallet_ids: Set[str], maxsize: int):
+        self.wallet_ids = wallet_ids
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, event: dict) -> None:
+        # Balance events carry full state, so a slow client only needs the newest ones
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class LocalBackend:
+    def __init__(self, broker: "EventBroker"):
+        self.broker = broker
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def publish(self, event: dict) -> None:
+        self.broker.deliver(event)
+
+
+class PostgresNotifyBackend:
+    """Cross-worker fanout over NOTIFY/LISTEN on a dedicated connection
+
+    LISTEN needs a session-level connection, so point DATABASE_URL (or the
+    listener) at Postgres directly rather than a transaction-mode pooler.
+    """
+
+    def __init__(self, broker: "EventBroker"):
+        self.broker = broker
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._listen, name="wallet-event-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def publish(self, event: dict) -> None:
+        with engine.connect() as connection:
+            connection.execute(select(func.pg_notify(NOTIFY_CHANNEL, json.dumps(event))))
+            connection.commit()
+
+    def _listen(self) -> None:
+        import psycopg
+
+        url = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while not self._stopped.is_set():
+            try:
+                with psycopg.connect(url, autocommit=True) as connection:
+                    connection.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    while not self._stopped.is_set():
+                        for notify in connection.notifies(timeout=1.0):
+                            self.broker.deliver(json.loads(notify.payload))
+            except Exception:
+                logger.exception("Wallet event listener failed; reconnecting")
+                time.sleep(1.0)
+
+
+class EventBroker:
+    def __init__(self, backend: str = "local", queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.backend = PostgresNotifyBackend(self) if backend == "postgres" else LocalBackend(self)
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.backend.start()
+
+    def stop(self) -> None:
+        self.backend.stop()
+
+    @contextmanager
+    def subscribe(self, wallet_ids: Iterable) -> Iterator[Subscription]:
+        subscription = Subscription({str(wallet_id) for wallet_id in wallet_ids}, self.queue_size)
+        with self._lock:
+            for wallet_id in subscription.wallet_ids:
+                self._subscriptions.setdefault(wallet_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                for wallet_id in subscription.wallet_ids:
+                    subscribers = self._subscriptions.get(wallet_id)
+                    if subscribers is not None:
+                        subscribers.discard(subscription)
+                        if not subscribers:
+                            del self._subscriptions[wallet_id]
+
+    def publish(self, event: dict) -> None:
+        """Publish from any thread; never raises into the posting path"""
+        try:
+            self.backend.publish(event)
+        except Exception:
+            logger.exception("Failed to publish wallet event")
+
+    def deliver(self, event: dict) -> None:
+        """Hand an event to this worker's subscribers on the event loop"""
+        with self._lock:
+            subscribers = list(self._subscriptions.get(event.get("wallet_id"), ()))
+        if not subscribers or self._loop is None:
+            return
+        for subscription in subscribers:
+            self._loop.call_soon_threadsafe(subscription.offer, event)
+
+
+event_broker = EventBroker(settings.EVENT_BACKEND, settings.EVENT_SUBSCRIBER_QUEUE_SIZE)
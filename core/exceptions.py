@@ -17,4 +17,39 @@ class UserNotVerifiedError(StoreCrediteError):
 
 class InvalidVerificationCodeError(StoreCrediteError):
     """Invalid or expired verification code"""
-    pass
\ No newline at end of file
+    pass
+
+class StoreNotFoundError(StoreCrediteError):
+    """Store not found"""
+    pass
+
+class UserNotFoundError(StoreCrediteError):
+    """User not found"""
+    pass
+
+class WalletAccessDeniedError(StoreCrediteError):
+    """User is not allowed to perform this wallet operation"""
+    pass
+
+class TransactionNotFoundError(StoreCrediteError):
+    """Transaction not found"""
+    pass
+
+class RefundNotAllowedError(StoreCrediteError):
+    """Transaction cannot be refunded (wrong type or already fully refunded)"""
+    pass
+
+
+class StatementNotFoundError(StoreCrediteError):
+    """Wallet statement not found"""
+    pass
+
+class SyncConflictError(StoreCrediteError):
+    """The same terminal operations were uploaded concurrently; retrying returns the recorded outcome"""
+    pass
+
+class RiskCheckFailedError(StoreCrediteError):
+    """Spend refused by a velocity rule; retry_after is seconds until it would pass"""
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,130 @@
+# app/core/log.py
+"""
+Structured logging that stays off the hot path.
+
+Records are put on an in-memory queue by the calling thread and formatted
+and written by a QueueListener thread, so no log I/O happens on the event
+loop or inside a request. With LOG_FORMAT="json" each record is one JSON
+line carrying the request's correlation id (see RequestLoggingMiddleware).
+Queries slower than LOG_SLOW_QUERY_MS are logged as warnings.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import traceback
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+
+from .config import settings
+from .database import engine
+
+MAX_STATEMENT_LENGTH = 500
+
+# Correlation id of the request being handled; sync endpoints run in a
+# threadpool with a copy of the context, so their logs carry it too.
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id while still on the calling thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = "".join(traceback.format_exception(*record.exc_info))
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging() -> None:
+    """Route the root logger through a queue to stdout; safe to call more than once"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+        ))
+
+    # Unbounded, so a burst never blocks a request; the listener drains it
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL)
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+    if settings.LOG_SLOW_QUERY_MS > 0:
+        event.listen(engine, "before_cursor_execute", _start_query_timer)
+        event.listen(engine, "after_cursor_execute", _log_slow_query)
+
+
+def stop_logging() -> None:
+    """Flush queued records; call on shutdown"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def should_log_request(path: str, status_code: Optional[int], duration_ms: float) -> bool:
+    """Errors and slow requests always; everything else at its route's sample rate"""
+    if status_code is None or status_code >= 500 or duration_ms >= settings.LOG_SLOW_REQUEST_MS:
+        return True
+    rate = settings.LOG_REQUEST_SAMPLE_RATE
+    for prefix, route_rate in settings.LOG_ROUTE_SAMPLE_RATES.items():
+        if path.startswith(prefix):
+            rate = route_rate
+            break
+    return rate >= 1.0 or random.random() < rate
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # A single slot, not a stack: statements on one connection never nest, and a
+    # statement that raises (no after_cursor_execute) is simply overwritten
+    conn.info["log_query_start"] = time.perf_counter()
+
+
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("log_query_start", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms >= settings.LOG_SLOW_QUERY_MS:
+        # Parameters are left out: they hold phone numbers and amounts
+        slow_query_logger.warning(
+            "Slow query", extra={"duration_ms": round(duration_ms, 1), "statement": statement[:MAX_STATEMENT_LENGTH]}
+        )
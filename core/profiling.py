@@ -0,0 +1,176 @@
+# app/core/profiling.py
+"""
+Sampled per-request profiles: a cProfile call profile plus the SQL statements
+the request ran on `core.database.engine`, with their timings.
+
+A request is profiled when it is the Nth since the last sample
+(PROFILING_SAMPLE_EVERY) or carries a valid signed X-Debug-Profile header.
+Only the slowest PROFILING_MAX_SAMPLES are kept.
+"""
+import cProfile
+import hashlib
+import hmac
+import heapq
+import io
+import itertools
+import pstats
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from .config import settings
+from .database import engine
+
+DEBUG_HEADER = "x-debug-profile"
+MAX_STATEMENT_LENGTH = 500
+
+
+@dataclass
+class SqlEvent:
+    offset_ms: float  # Since the start of the request
+    duration_ms: float
+    statement: str
+
+
+@dataclass
+class ProfileSample:
+    method: str
+    path: str
+    started_at: datetime
+    duration_ms: float = 0.0
+    status_code: Optional[int] = None
+    sql: List[SqlEvent] = field(default_factory=list)
+    profile: str = ""  # pstats report, top functions by cumulative time
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def sql_ms(self) -> float:
+        return sum(event.duration_ms for event in self.sql)
+
+
+# The sample being recorded for the current request, if any. Sync endpoints
+# run in a threadpool with a copy of the context, so they see it too.
+_current_sample: ContextVar[Optional[ProfileSample]] = ContextVar("current_profile_sample", default=None)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_sample.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sample = _current_sample.get()
+    starts = conn.info.get("profile_query_start")
+    if sample is None or not starts:
+        return
+    started = starts.pop()
+    sample.sql.append(SqlEvent(
+        offset_ms=(started - sample._started) * 1000,
+        duration_ms=(time.perf_counter() - started) * 1000,
+        statement=statement[:MAX_STATEMENT_LENGTH]
+    ))
+
+
+class SlowestSamples:
+    """Keeps the `maxsize` slowest samples seen"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._heap: list = []  # (duration_ms, tiebreak, sample), fastest on top
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, sample: ProfileSample) -> None:
+        entry = (sample.duration_ms, next(self._counter), sample)
+        with self._lock:
+            if len(self._heap) < self.maxsize:
+                heapq.heappush(self._heap, entry)
+            elif entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def snapshot(self) -> List[ProfileSample]:
+        with self._lock:
+            entries = list(self._heap)
+        return [sample for _, _, sample in sorted(entries, key=lambda entry: entry[0], reverse=True)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap.clear()
+
+
+def sign_debug_header(issued_at: Optional[int] = None) -> str:
+    """Value for the X-Debug-Profile header, valid for PROFILING_HEADER_MAX_AGE_SECONDS"""
+    issued_at = int(time.time()) if issued_at is None else issued_at
+    signature = hmac.new(settings.SECRET_KEY.encode(), f"profile:{issued_at}".encode(), hashlib.sha256).hexdigest()
+    return f"{issued_at}.{signature}"
+
+
+def verify_debug_header(value: str) -> bool:
+    issued_at, _, _ = value.partition(".")
+    if not issued_at.isdigit():
+        return False
+    if abs(time.time() - int(issued_at)) > settings.PROFILING_HEADER_MAX_AGE_SECONDS:
+        return False
+    return hmac.compare_digest(value, sign_debug_header(int(issued_at)))
+
+
+class RequestProfiler:
+    """Decides which requests to profile and records them
+
+    cProfile sees the event loop thread, so a profile can include other
+    requests' coroutines interleaved with this one (and misses work handed to
+    the threadpool); the SQL timeline is always per request. Only one request
+    is profiled at a time per process.
+    """
+
+    def __init__(self, sample_every: int, max_samples: int, top_functions: int):
+        self.sample_every = sample_every
+        self.top_functions = top_functions
+        self.samples = SlowestSamples(max_samples)
+        self._requests = itertools.count(1)
+        self._busy = threading.Lock()
+
+    def should_profile(self, debug_header: Optional[str]) -> bool:
+        if debug_header is not None and verify_debug_header(debug_header):
+            return True
+        return self.sample_every > 0 and next(self._requests) % self.sample_every == 0
+
+    def start(self, method: str, path: str) -> Optional[tuple]:
+        """Begin profiling; returns a token for finish(), or None if another profile is running"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        sample = ProfileSample(method=method, path=path, started_at=datetime.now(timezone.utc))
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Another profiler (e.g. a debugger) owns this thread
+            self._busy.release()
+            return None
+        reset = _current_sample.set(sample)
+        return sample, profiler, reset
+
+    def finish(self, token: tuple, status_code: Optional[int]) -> None:
+        sample, profiler, reset = token
+        try:
+            profiler.disable()
+            sample.duration_ms = (time.perf_counter() - sample._started) * 1000
+            sample.status_code = status_code
+            _current_sample.reset(reset)
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(self.top_functions)
+            sample.profile = report.getvalue()
+            self.samples.add(sample)
+        finally:
+            self._busy.release()
+
+
+request_profiler = RequestProfiler(
+    settings.PROFILING_SAMPLE_EVERY, settings.PROFILING_MAX_SAMPLES, settings.PROFILING_TOP_FUNCTIONS
+)
@@ -0,0 +1,93 @@
+# app/core/rate_limit.py
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity`"""
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def try_acquire(self, now: float) -> Tuple[bool, float]:
+        """Take one token; returns (allowed, seconds until a token is available)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class KeyedRateLimiter:
+    """One token bucket per key, keeping at most `max_keys` most recently used buckets"""
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: Hashable) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.try_acquire(now)
+
+
+class OverloadedError(Exception):
+    """Raised when the concurrency limiter's queue is full or the wait timed out"""
+    pass
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests with a short, bounded wait queue in front
+
+    Sized to the DB pool so requests wait here, where they can be rejected
+    cheaply, instead of inside SQLAlchemy's pool checkout timeout.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = None
+
+    async def __aenter__(self):
+        if self._semaphore is None:
+            # Created lazily so it binds to the running event loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise OverloadedError("Request queue is full")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise OverloadedError("Timed out waiting for capacity")
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.in_flight -= 1
+        self._semaphore.release()
@@ -0,0 +1,236 @@
+# app/core/risk.py
+"""
+Velocity checks for the spend path.
+
+Each completed spend is remembered per user, wallet and store as a
+(timestamp, amount) event; a rule caps how many spends, or how much money,
+one subject may move within a sliding window. A subject keeps events only
+for the longest window of its scope's rules. Checks run before the wallet
+row is locked and cost a few dict and deque operations, with no database
+queries; spends are recorded once they have committed, so refused and
+failed spends never count. Spends checked at the same moment are not
+counted against each other, so concurrent spends can overshoot a limit
+by a few events.
+
+With RISK_BACKEND="local" each worker keeps its own windows, so the limits
+apply per worker. RISK_BACKEND="redis" (needs the optional `redis` package)
+shares them across workers at the cost of a round-trip for the check and
+one for the record, neither of them under the wallet lock.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import settings
+from .exceptions import RiskCheckFailedError
+
+logger = logging.getLogger(__name__)
+
+SCOPE_USER = "user"
+SCOPE_WALLET = "wallet"
+SCOPE_STORE = "store"
+
+Event = Tuple[float, Decimal]
+
+
+@dataclass(frozen=True)
+class RiskRule:
+    """At most `max_count` spends and/or `max_amount` spent per subject in `window_seconds`"""
+    name: str
+    scope: str
+    window_seconds: int
+    max_count: Optional[int] = None
+    max_amount: Optional[Decimal] = None
+
+    def check(self, events: Sequence[Event], now: float, amount: Decimal) -> Optional[float]:
+        """Return seconds until the spend would pass, or None when it passes now
+
+        `events` is oldest first and may reach back past this rule's window;
+        only the in-window tail is read.
+        """
+        since = now - self.window_seconds
+        if self.max_count is not None and len(events) >= self.max_count:
+            # Passes once the max_count-th newest spend has left the window
+            boundary = events[-self.max_count][0]
+            if boundary > since:
+                return boundary - since
+        if self.max_amount is not None:
+            if amount > self.max_amount:
+                return float(self.window_seconds)
+            total = amount
+            in_window = 0
+            for timestamp, spent in reversed(events):
+                if timestamp <= since:
+                    break
+                total += spent
+                in_window += 1
+            if total > self.max_amount:
+                # Passes once enough of the oldest in-window spends have left
+                for timestamp, spent in islice(events, len(events) - in_window, None):
+                    total -= spent
+                    if total <= self.max_amount:
+                        return timestamp - since
+        return None
+
+
+Windows = Dict[str, int]  # subject key -> seconds of events to keep
+Evaluate = Callable[[Dict[str, Sequence[Event]], float], None]
+
+
+class LocalRiskStore:
+    """Per-worker event windows, keeping at most `max_keys` most recently used subjects"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._events: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, windows: Windows, evaluate: Evaluate) -> None:
+        now = time.monotonic()
+        with self._lock:
+            events = {}
+            for key, horizon in windows.items():
+                window = self._events.get(key)
+                if window is None:
+                    events[key] = ()
+                    continue
+                while window and window[0][0] <= now - horizon:
+                    window.popleft()
+                events[key] = window
+            # Rules read the deques in place, so they run under the lock
+            evaluate(events, now)
+
+    def record(self, windows: Windows, amount: Decimal) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key, horizon in windows.items():
+                window = self._events.get(key)
+                if window is None:
+                    window = self._events[key] = deque()
+                    if len(self._events) > self.max_keys:
+                        self._events.popitem(last=False)
+                else:
+                    self._events.move_to_end(key)
+                while window and window[0][0] <= now - horizon:
+                    window.popleft()
+                window.append((now, amount))
+
+
+class RedisRiskStore:
+    """Event windows shared by every worker, one sorted set per subject"""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:  # Optional; only needed for RISK_BACKEND="redis"
+            raise RuntimeError('RISK_BACKEND="redis" requires the redis package')
+        self.client = redis.Redis.from_url(url)
+
+    def check(self, windows: Windows, evaluate: Evaluate) -> None:
+        now = time.time()
+        pipeline = self.client.pipeline(transaction=False)
+        for key, horizon in windows.items():
+            pipeline.zremrangebyscore(key, "-inf", now - horizon)
+            pipeline.zrange(key, 0, -1, withscores=True)
+        replies = pipeline.execute()
+        events = {
+            key: [(score, Decimal(member.decode().split(":")[1])) for member, score in replies[index * 2 + 1]]
+            for index, key in enumerate(windows)
+        }
+        evaluate(events, now)
+
+    def record(self, windows: Windows, amount: Decimal) -> None:
+        now = time.time()
+        pipeline = self.client.pipeline(transaction=False)
+        # Unique member per spend, so two equal spends in the same instant both count
+        member = f"{uuid.uuid4().hex}:{amount}"
+        for key, horizon in windows.items():
+            pipeline.zadd(key, {member: now})
+            pipeline.expire(key, horizon)
+        pipeline.execute()
+
+
+class RiskEngine:
+    def __init__(self, rules: Sequence[RiskRule], store):
+        self.rules = rules
+        self.store = store
+
+    @property
+    def rules(self) -> List[RiskRule]:
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules: Sequence[RiskRule]) -> None:
+        self._rules = list(rules)
+        # Each scope keeps events for its own longest window; scopes without rules keep none
+        self._horizons: Dict[str, int] = {}
+        for rule in self._rules:
+            self._horizons[rule.scope] = max(self._horizons.get(rule.scope, 0), rule.window_seconds)
+
+    def check_spend(self, user_id, wallet_id, store_id, amount: Decimal) -> None:
+        """Raise RiskCheckFailedError if the spend would break a rule; the spend is not counted yet"""
+        if not self._rules:
+            return
+        keys = self._keys(user_id, wallet_id, store_id)
+
+        def evaluate(events: Dict[str, Sequence[Event]], now: float) -> None:
+            for rule in self._rules:
+                wait = rule.check(events[keys[rule.scope]], now, amount)
+                if wait is not None:
+                    raise RiskCheckFailedError(f"Spend limit reached ({rule.name})", retry_after=wait)
+
+        try:
+            self.store.check({keys[scope]: horizon for scope, horizon in self._horizons.items()}, evaluate)
+        except RiskCheckFailedError:
+            raise
+        except Exception:
+            # An unreachable shared backend must not take payments down with it
+            logger.exception("Risk check failed to run; admitting spend")
+
+    def record_spend(self, user_id, wallet_id, store_id, amount: Decimal) -> None:
+        """Count a committed spend toward later checks"""
+        if not self._rules:
+            return
+        keys = self._keys(user_id, wallet_id, store_id)
+        try:
+            self.store.record({keys[scope]: horizon for scope, horizon in self._horizons.items()}, amount)
+        except Exception:
+            logger.exception("Failed to record spend for risk checks")
+
+    def _keys(self, user_id, wallet_id, store_id) -> Dict[str, str]:
+        subjects = {SCOPE_USER: user_id, SCOPE_WALLET: wallet_id, SCOPE_STORE: store_id}
+        return {scope: f"risk:{scope}:{subjects[scope]}" for scope in self._horizons}
+
+
+def _default_rules() -> List[RiskRule]:
+    candidates = [
+        RiskRule("user spends per minute", SCOPE_USER, 60, max_count=settings.RISK_USER_SPENDS_PER_MINUTE),
+        RiskRule("user spends per hour", SCOPE_USER, 3600, max_count=settings.RISK_USER_SPENDS_PER_HOUR),
+        RiskRule("wallet spends per minute", SCOPE_WALLET, 60, max_count=settings.RISK_WALLET_SPENDS_PER_MINUTE),
+        RiskRule(
+            "wallet amount per hour", SCOPE_WALLET, 3600,
+            max_amount=None if settings.RISK_WALLET_AMOUNT_PER_HOUR is None
+            else Decimal(str(settings.RISK_WALLET_AMOUNT_PER_HOUR))
+        ),
+        RiskRule("store spends per minute", SCOPE_STORE, 60, max_count=settings.RISK_STORE_SPENDS_PER_MINUTE),
+    ]
+    return [rule for rule in candidates if rule.max_count is not None or rule.max_amount is not None]
+
+
+def _build_engine() -> RiskEngine:
+    if not settings.RISK_CHECKS_ENABLED:
+        return RiskEngine([], None)
+    if settings.RISK_BACKEND == "redis":
+        store = RedisRiskStore(settings.RISK_REDIS_URL)
+    else:
+        store = LocalRiskStore(settings.RISK_MAX_SUBJECTS)
+    return RiskEngine(_default_rules(), store)
+
+
+risk_engine = _build_engine()
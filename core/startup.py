@@ -0,0 +1,38 @@
+# app/core/startup.py
+"""
+Import-time accounting for cold starts.
+
+main.py imports its routers through timed_import(); report_imports() logs
+where startup time went and warns when the total exceeds
+STARTUP_IMPORT_BUDGET_MS.
+"""
+import importlib
+import logging
+import time
+from types import ModuleType
+from typing import Dict
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_process_started = time.perf_counter()
+import_timings: Dict[str, float] = {}
+
+
+def timed_import(module_name: str) -> ModuleType:
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    import_timings[module_name] = (time.perf_counter() - started) * 1000
+    return module
+
+
+def report_imports() -> None:
+    total_ms = (time.perf_counter() - _process_started) * 1000
+    for module_name, elapsed_ms in sorted(import_timings.items(), key=lambda item: item[1], reverse=True):
+        logger.info("Imported %s in %.1f ms", module_name, elapsed_ms)
+    log = logger.warning if total_ms > settings.STARTUP_IMPORT_BUDGET_MS else logger.info
+    log(
+        "Startup imports took %.1f ms (budget %d ms), %.1f ms of it in routers",
+        total_ms, settings.STARTUP_IMPORT_BUDGET_MS, sum(import_timings.values())
+    )
@@ -0,0 +1,29 @@
+# app/core/types.py
+"""
+Column types that work on every database the app runs against.
+
+Production is Postgres; the test harness also runs on SQLite. Models use
+these instead of dialect-specific types so the same metadata creates and
+queries on both.
+"""
+import uuid
+
+from sqlalchemy import Uuid
+
+
+class GUID(Uuid):
+    """uuid.UUID column: native UUID on Postgres, CHAR(32) elsewhere"""
+    cache_ok = True
+
+    def __init__(self):
+        super().__init__(as_uuid=True)
+
+    def bind_processor(self, dialect):
+        process = super().bind_processor(dialect)
+
+        # Accept id strings (e.g. a JWT subject) everywhere, as Postgres itself does
+        def coerce(value):
+            if value is not None and not isinstance(value, uuid.UUID):
+                value = uuid.UUID(str(value))
+            return process(value) if process else value
+        return coerce
@@ -0,0 +1,25 @@
+# app/jobs/__init__.py
+"""
+Background jobs.
+
+Each job module exposes run_until_caught_up(). The API process schedules
+it with run_periodically() when the job's interval setting is > 0 (see
+main.lifespan), and cron can run it standalone:
+
+    python -m app.jobs.<module>
+"""
+import asyncio
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(run: Callable[[], None], interval_seconds: int, name: str) -> None:
+    """Call `run` in a worker thread every interval_seconds; a failed run is logged, not fatal"""
+    while True:
+        try:
+            await asyncio.to_thread(run)
+        except Exception:
+            logger.exception("%s run failed", name)
+        await asyncio.sleep(interval_seconds)
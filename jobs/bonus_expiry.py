@@ -0,0 +1,26 @@
+# app/jobs/bonus_expiry.py
+"""
+Sweeper that expires bonus lots past their expiry date.
+
+Scheduled by BONUS_EXPIRY_INTERVAL_SECONDS (see app.jobs).
+"""
+from app.core.database import SessionLocal, engine
+from app.core.container import services
+
+bonus_service = services.lazy("bonus")
+
+
+def run_until_caught_up() -> None:
+    # The sweep is one statement of data-modifying CTEs
+    if engine.dialect.name != "postgresql":
+        return
+    db = SessionLocal()
+    try:
+        while bonus_service.expire_next_batch(db):
+            pass
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_until_caught_up()
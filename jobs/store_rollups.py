@@ -0,0 +1,26 @@
+# app/jobs/store_rollups.py
+"""
+Catch-up job that keeps store dashboard rollups current.
+
+Scheduled by ANALYTICS_ROLLUP_INTERVAL_SECONDS (see app.jobs).
+"""
+from app.core.database import SessionLocal, engine
+from app.core.container import services
+
+analytics_service = services.lazy("analytics")
+
+
+def run_until_caught_up() -> None:
+    # Rollups are INSERT ... ON CONFLICT with date_trunc and gen_random_uuid()
+    if engine.dialect.name != "postgresql":
+        return
+    db = SessionLocal()
+    try:
+        while analytics_service.run_store_rollups(db):
+            pass
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_until_caught_up()
@@ -0,0 +1,129 @@
+# app/jobs/transaction_partitions.py
+"""
+Monthly partition maintenance for the transactions table.
+
+Creates partitions TRANSACTION_PARTITION_MONTHS_AHEAD months in advance so
+postings always have a target, and detaches partitions older than
+TRANSACTION_HOT_MONTHS into TRANSACTION_ARCHIVE_SCHEMA, optionally rewriting
+them onto a compressed tablespace or table access method. Runs at API startup
+and then every PARTITION_MAINTENANCE_INTERVAL_SECONDS, or standalone with:
+
+    python -m app.jobs.transaction_partitions
+"""
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "transactions"
+_PARTITION_NAME = re.compile(r"^transactions_p(\d{4})_(\d{2})$")
+_ADVISORY_LOCK_KEY = "transaction_partitions"
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_month(name: str) -> Optional[date]:
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def is_partitioned(conn: Connection) -> bool:
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": PARENT_TABLE}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    return list(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+    ), {"table": PARENT_TABLE}).scalars())
+
+
+def ensure_partitions(conn: Connection, months_ahead: int) -> List[str]:
+    """Create partitions from the current month to months_ahead months out"""
+    today = datetime.now(timezone.utc).date()
+    existing = set(list_partitions(conn))
+    created = []
+    for offset in range(months_ahead + 1):
+        start, end = _month_start(today, offset), _month_start(today, offset + 1)
+        name = f"{PARENT_TABLE}_p{start:%Y_%m}"
+        if name in existing:
+            continue
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+        ))
+        created.append(name)
+    return created
+
+
+def archive_partitions(conn: Connection, hot_months: int) -> List[str]:
+    """Detach partitions older than hot_months and move them to the archive schema"""
+    cutoff = _month_start(datetime.now(timezone.utc).date(), -(hot_months - 1))
+    quote = conn.dialect.identifier_preparer.quote
+    schema = quote(settings.TRANSACTION_ARCHIVE_SCHEMA)
+    archived = []
+    for name in list_partitions(conn):
+        month = _partition_month(name)
+        if month is None or month >= cutoff:
+            continue
+        # CONCURRENTLY keeps postings flowing: no ACCESS EXCLUSIVE lock on the parent
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name} CONCURRENTLY"))
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+        conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {schema}"))
+        if settings.TRANSACTION_ARCHIVE_ACCESS_METHOD:
+            conn.execute(text(
+                f"ALTER TABLE {schema}.{name} SET ACCESS METHOD {quote(settings.TRANSACTION_ARCHIVE_ACCESS_METHOD)}"
+            ))
+        if settings.TRANSACTION_ARCHIVE_TABLESPACE:
+            conn.execute(text(
+                f"ALTER TABLE {schema}.{name} SET TABLESPACE {quote(settings.TRANSACTION_ARCHIVE_TABLESPACE)}"
+            ))
+        archived.append(name)
+    return archived
+
+
+def run_maintenance(archive: bool = True) -> None:
+    # DETACH ... CONCURRENTLY cannot run inside a transaction block
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if not is_partitioned(conn):
+            logger.warning("transactions table is not partitioned; skipping partition maintenance")
+            return
+        if not conn.execute(text("SELECT pg_try_advisory_lock(hashtext(:key))"), {"key": _ADVISORY_LOCK_KEY}).scalar():
+            return
+        try:
+            created = ensure_partitions(conn, settings.TRANSACTION_PARTITION_MONTHS_AHEAD)
+            archived = archive_partitions(conn, settings.TRANSACTION_HOT_MONTHS) if archive else []
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(hashtext(:key))"), {"key": _ADVISORY_LOCK_KEY})
+    if created or archived:
+        logger.info("Transaction partitions created=%s archived=%s", created, archived)
+
+
+async def run_periodically(interval_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(run_maintenance)
+        except Exception:
+            logger.exception("Transaction partition maintenance failed")
+
+
+if __name__ == "__main__":
+    run_maintenance()
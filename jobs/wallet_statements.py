@@ -0,0 +1,26 @@
+# app/jobs/wallet_statements.py
+"""
+Job that writes monthly wallet statements once each month has closed.
+
+Scheduled by STATEMENT_JOB_INTERVAL_SECONDS (see app.jobs).
+"""
+from app.core.database import SessionLocal, engine
+from app.core.container import services
+
+statement_service = services.lazy("statement")
+
+
+def run_until_caught_up() -> None:
+    # Statements are built with LATERAL joins and INSERT ... ON CONFLICT
+    if engine.dialect.name != "postgresql":
+        return
+    db = SessionLocal()
+    try:
+        while statement_service.generate_next_statements(db):
+            pass
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_until_caught_up()
@@ -2,18 +2,67 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api.v1 import auth, users, wallets, stores, transactions
+from app.core.log import configure_logging, stop_logging
+from app.core.startup import timed_import, report_imports
+from app.core.database import init_db, report_pool_limits
+from app.core.events import event_broker
+from app.api.middleware import (
+    LoadSheddingMiddleware, CompressionMiddleware, ProfilingMiddleware, RequestLoggingMiddleware
+)
+
+# Before anything logs, so every record goes through the queue
+configure_logging()
+
+# Routers, imported through timed_import so startup cost shows up in report_imports()
+ROUTERS = (
+    ("app.api.v1.auth", "/api/v1/auth", "authentication"),
+    ("app.api.v1.users", "/api/v1/users", "users"),
+    ("app.api.v1.stores", "/api/v1/stores", "stores"),
+    ("app.api.v1.wallets", "/api/v1/wallets", "wallets"),
+    ("app.api.v1.transactions", "/api/v1/transactions", "transactions"),
+    ("app.api.v1.admin", "/api/v1/admin", "admin"),
+)
 
 # Create tables on startup
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    Base.metadata.create_all(bind=engine)
+    report_imports()
+    init_db()
+    report_pool_limits()
+    event_broker.start()
+    # Jobs are imported here, and only when enabled, to keep them off the import path
+    from app.jobs import run_periodically, transaction_partitions
+    # Postings need this month's partition before the first request
+    transaction_partitions.run_maintenance(archive=False)
+    background_tasks = []
+    if settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            transaction_partitions.run_periodically(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+        ))
+    if settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS > 0:
+        from app.jobs import store_rollups
+        background_tasks.append(asyncio.create_task(run_periodically(
+            store_rollups.run_until_caught_up, settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS, "Store rollup"
+        )))
+    if settings.STATEMENT_JOB_INTERVAL_SECONDS > 0:
+        from app.jobs import wallet_statements
+        background_tasks.append(asyncio.create_task(run_periodically(
+            wallet_statements.run_until_caught_up, settings.STATEMENT_JOB_INTERVAL_SECONDS, "Wallet statement"
+        )))
+    if settings.BONUS_EXPIRY_INTERVAL_SECONDS > 0:
+        from app.jobs import bonus_expiry
+        background_tasks.append(asyncio.create_task(run_periodically(
+            bonus_expiry.run_until_caught_up, settings.BONUS_EXPIRY_INTERVAL_SECONDS, "Bonus expiry"
+        )))
     yield
     # Shutdown
-    pass
+    for task in background_tasks:
+        task.cancel()
+    event_broker.stop()
+    stop_logging()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -22,6 +71,13 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Sampled request profiling (innermost, so it times only the route and its SQL)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Rate limiting and load shedding (added before CORS so CORS headers wrap its 429/503 responses)
+app.add_middleware(LoadSheddingMiddleware)
+
 # CORS middleware for Flutter app
 app.add_middleware(
     CORSMiddleware,
@@ -31,12 +87,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON for mobile clients on slow links (outermost, so every response is covered)
+app.add_middleware(CompressionMiddleware)
+
+# Correlation ids and request logs (outermost, so even shed requests get both)
+app.add_middleware(RequestLoggingMiddleware)
+
 # Include API routes
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["authentication"])
-app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
-app.include_router(stores.router, prefix="/api/v1/stores", tags=["stores"])
-app.include_router(wallets.router, prefix="/api/v1/wallets", tags=["wallets"])
-app.include_router(transactions.router, prefix="/api/v1/transactions", tags=["transactions"])
+for module_name, prefix, tag in ROUTERS:
+    app.include_router(timed_import(module_name).router, prefix=prefix, tags=[tag])
 
 @app.get("/")
 async def root():
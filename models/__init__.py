@@ -0,0 +1,2 @@
+# app/models/__init__.py
+from . import user, store, wallet, notification, analytics, pos_sync, statement  # noqa: F401 - register every table on Base
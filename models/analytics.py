@@ -0,0 +1,58 @@
+# app/models/analytics.py
+from sqlalchemy import Column, String, Numeric, ForeignKey, Integer, Date, DateTime, UniqueConstraint
+from app.core.types import GUID
+from .base import BaseModel
+
+
+class StoreHourlyRollup(BaseModel):
+    __tablename__ = "store_hourly_rollups"
+
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    charge_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    spend_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    bonus_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    refund_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("store_id", "bucket_start", name="uq_store_hourly_rollups_store_bucket"),
+    )
+
+
+class StoreDailyRollup(BaseModel):
+    __tablename__ = "store_daily_rollups"
+
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False)
+    day = Column(Date, nullable=False)  # Local date in ANALYTICS_TIMEZONE
+    charge_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    spend_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    bonus_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    refund_amount = Column(Numeric(14, 2), default=0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    active_wallet_count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("store_id", "day", name="uq_store_daily_rollups_store_day"),
+    )
+
+
+class StoreDailyActiveWallet(BaseModel):
+    """Wallets with at least one posting on a day; backs the distinct count in StoreDailyRollup"""
+    __tablename__ = "store_daily_active_wallets"
+
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    wallet_id = Column(GUID(), ForeignKey("wallets.id"), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("store_id", "day", "wallet_id", name="uq_store_daily_active_wallets"),
+    )
+
+
+class RollupWatermark(BaseModel):
+    """How far into the ledger a rollup job has read"""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), nullable=False, unique=True)
+    processed_until = Column(DateTime(timezone=True), nullable=False)
@@ -1,6 +1,6 @@
 # app/models/base.py
 from sqlalchemy import Column, DateTime, func
-from sqlalchemy.dialects.postgresql import UUID
+from app.core.types import GUID
 from sqlalchemy.ext.declarative import declared_attr
 from app.core.database import Base
 import uuid
@@ -11,7 +11,7 @@ class BaseModel(Base):
 
     @declared_attr
     def id(cls):
-        return Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+        return Column(GUID(), primary_key=True, default=uuid.uuid4)
 
     @declared_attr
     def created_at(cls):
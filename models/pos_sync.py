@@ -0,0 +1,38 @@
+# app/models/pos_sync.py
+from sqlalchemy import Column, String, Numeric, ForeignKey, Enum, Text, DateTime, UniqueConstraint
+from app.core.types import GUID
+from .base import BaseModel
+from .wallet import TransactionType, TransactionMethod
+import enum
+
+
+class SyncOperationStatus(str, enum.Enum):
+    APPLIED = "APPLIED"
+    REJECTED = "REJECTED"
+
+
+class SyncOperation(BaseModel):
+    """One POS terminal operation received through batch sync
+
+    The unique (store, terminal, client_op_id) key makes re-uploads of a batch
+    idempotent: a terminal that lost the response just sends it again and gets
+    the recorded outcome back.
+    """
+    __tablename__ = "pos_sync_operations"
+
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False)
+    terminal_id = Column(String(100), nullable=False)
+    client_op_id = Column(String(100), nullable=False)
+    client_created_at = Column(DateTime(timezone=True), nullable=False)  # Terminal clock, informational only
+    wallet_id = Column(GUID(), ForeignKey("wallets.id"), nullable=False)
+    type = Column(Enum(TransactionType), nullable=False)
+    method = Column(Enum(TransactionMethod), nullable=False)
+    amount = Column(Numeric(12, 2), nullable=False)
+    status = Column(Enum(SyncOperationStatus), nullable=False)
+    transaction_id = Column(GUID())  # Set when APPLIED; no FK, transactions is partitioned
+    error = Column(Text)  # Set when REJECTED
+    created_by = Column(GUID(), ForeignKey("users.id"), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("store_id", "terminal_id", "client_op_id", name="uq_pos_sync_operations_client_op"),
+    )
@@ -0,0 +1,32 @@
+# app/models/statement.py
+from sqlalchemy import Column, Numeric, ForeignKey, Integer, Date, UniqueConstraint
+from app.core.types import GUID
+from .base import BaseModel
+
+
+class WalletStatement(BaseModel):
+    """Monthly wallet statement, generated once the month has closed
+
+    Only months with activity get a row; a month's opening balances are the
+    closing balances of the wallet's latest earlier statement.
+    """
+    __tablename__ = "wallet_statements"
+
+    wallet_id = Column(GUID(), ForeignKey("wallets.id"), nullable=False)
+    period_start = Column(Date, nullable=False)  # First day of the month in ANALYTICS_TIMEZONE
+    opening_balance = Column(Numeric(12, 2), nullable=False)
+    opening_bonus_balance = Column(Numeric(12, 2), nullable=False)
+    charge_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    bonus_earned_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    spend_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    refund_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    bonus_expired_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    transfer_in_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    transfer_out_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    closing_balance = Column(Numeric(12, 2), nullable=False)
+    closing_bonus_balance = Column(Numeric(12, 2), nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("wallet_id", "period_start", name="uq_wallet_statements_wallet_period"),
+    )
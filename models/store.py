@@ -1,6 +1,6 @@
 # app/models/store.py
-from sqlalchemy import Column, String, Boolean, Enum, ForeignKey, Decimal, Integer, Time
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, Enum, ForeignKey, Numeric, Integer, Time
+from app.core.types import GUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 import enum
@@ -21,6 +21,17 @@ class StoreManagerRole(str, enum.Enum):
     CASHIER = "CASHIER"
 
 
+class StoreGroup(BaseModel):
+    """A chain of stores sharing one wallet per customer"""
+    __tablename__ = "store_groups"
+
+    name = Column(String(255), nullable=False)
+    is_active = Column(Boolean, default=True)  # Inactive chains' wallets are usable only at their own store
+
+    # Relationships
+    stores = relationship("Store", back_populates="store_group")
+
+
 class Store(BaseModel):
     __tablename__ = "stores"
 
@@ -28,8 +39,10 @@ class Store(BaseModel):
     category = Column(Enum(StoreCategory), default=StoreCategory.OTHER)
     business_registration_number = Column(String(50), unique=True)
     is_active = Column(Boolean, default=True, index=True)
+    store_group_id = Column(GUID(), ForeignKey("store_groups.id"), index=True)  # Chain the store belongs to, if any
 
     # Relationships
+    store_group = relationship("StoreGroup", back_populates="stores")
     managers = relationship("StoreManager", back_populates="store")
     location = relationship("StoreLocation", back_populates="store", uselist=False)
     contacts = relationship("StoreContact", back_populates="store")
@@ -41,8 +54,8 @@ class Store(BaseModel):
 class StoreManager(BaseModel):
     __tablename__ = "store_managers"
 
-    store_id = Column(UUID(as_uuid=True), ForeignKey("stores.id"), nullable=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False)
+    user_id = Column(GUID(), ForeignKey("users.id"), nullable=False)
     role = Column(Enum(StoreManagerRole), default=StoreManagerRole.MANAGER)
     is_active = Column(Boolean, default=True)
 
@@ -58,10 +71,10 @@ class StoreManager(BaseModel):
 class StoreLocation(BaseModel):
     __tablename__ = "store_locations"
 
-    store_id = Column(UUID(as_uuid=True), ForeignKey("stores.id"), nullable=False, unique=True)
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False, unique=True)
     address = Column(String, nullable=False)
-    latitude = Column(Decimal(10, 8))
-    longitude = Column(Decimal(11, 8))
+    latitude = Column(Numeric(10, 8))
+    longitude = Column(Numeric(11, 8))
     region = Column(String(100))
     postal_code = Column(String(20))
 
@@ -72,7 +85,7 @@ class StoreLocation(BaseModel):
 class StoreContact(BaseModel):
     __tablename__ = "store_contacts"
 
-    store_id = Column(UUID(as_uuid=True), ForeignKey("stores.id"), nullable=False)
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False)
     contact_type = Column(String(20), default="PHONE")
     contact_value = Column(String(255), nullable=False)
     is_primary = Column(Boolean, default=False)
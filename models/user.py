@@ -1,5 +1,5 @@
 # app/models/user.py
-from sqlalchemy import Column, String, Boolean, Date, Enum
+from sqlalchemy import Column, String, Boolean, Date, Enum, Index, CheckConstraint, func
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 import enum
@@ -15,7 +15,7 @@ class User(BaseModel):
     __tablename__ = "users"
 
     name = Column(String(100), nullable=False)
-    phone_number = Column(String(20), unique=True, nullable=False, index=True)
+    phone_number = Column(String(20), unique=True, nullable=False, index=True)  # E.164, see utils.phone_utils
     date_of_birth = Column(Date)
     gender = Column(Enum(Gender))
     email = Column(String(255))
@@ -26,3 +26,22 @@ class User(BaseModel):
     wallet_memberships = relationship("WalletMember", back_populates="user")
     store_managements = relationship("StoreManager", back_populates="user")
     created_transactions = relationship("Transaction", foreign_keys="Transaction.created_by", back_populates="creator")
+
+    __table_args__ = (
+        CheckConstraint(r"phone_number ~ '^\+[1-9][0-9]{7,14}$'", name="ck_users_phone_number_e164").ddl_if(
+            dialect="postgresql"
+        ),
+    )
+
+
+# Cashier lookups: phone suffix via reversed-prefix match, name prefix match
+Index(
+    "ix_users_phone_number_reversed",
+    func.reverse(User.phone_number).label("phone_number_reversed"),
+    postgresql_ops={"phone_number_reversed": "text_pattern_ops"}
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_users_name_lower",
+    func.lower(User.name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"}
+).ddl_if(dialect="postgresql")
@@ -1,9 +1,12 @@
 # app/models/wallet.py
-from sqlalchemy import Column, String, Boolean, Decimal, ForeignKey, Enum, Text, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, Numeric, ForeignKey, Enum, Text, Integer, UniqueConstraint, Index, DateTime
+from app.core.types import GUID
+from sqlalchemy import and_
 from sqlalchemy.orm import relationship
 from .base import BaseModel
+from datetime import datetime, timezone
 import enum
+import uuid
 
 
 class WalletStatus(str, enum.Enum):
@@ -24,6 +27,7 @@ class TransactionType(str, enum.Enum):
     CREDIT_TRANSFER = "CREDIT_TRANSFER"
     CREDIT_SALE = "CREDIT_SALE"
     REFUND = "REFUND"
+    BONUS_EXPIRED = "BONUS_EXPIRED"
 
 
 class TransactionMethod(str, enum.Enum):
@@ -31,6 +35,8 @@ class TransactionMethod(str, enum.Enum):
     CASH = "CASH"
     EXTERNAL_APP = "EXTERNAL_APP"
     TRANSFER = "TRANSFER"
+    SYSTEM = "SYSTEM"  # Posted by the app itself (e.g. bonus expiry)
+    QR = "QR"  # Customer paid by scanning the store's QR code
 
 
 class Wallet(BaseModel):
@@ -38,43 +44,65 @@ class Wallet(BaseModel):
 
     nickname = Column(String(100))
     status = Column(Enum(WalletStatus), default=WalletStatus.ACTIVE, index=True)
-    balance = Column(Decimal(12, 2), default=0.00, nullable=False)
-    bonus_balance = Column(Decimal(12, 2), default=0.00, nullable=False)
-    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-    store_id = Column(UUID(as_uuid=True), ForeignKey("stores.id"), nullable=False, index=True)
+    balance = Column(Numeric(12, 2), default=0.00, nullable=False)
+    bonus_balance = Column(Numeric(12, 2), default=0.00, nullable=False)
+    owner_id = Column(GUID(), ForeignKey("users.id"), nullable=False, index=True)
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False)  # Covered by ix_wallets_store_id_status_id
+    # Set on chain wallets, which are spendable at every store of the group; store_id is where it was opened
+    store_group_id = Column(GUID(), ForeignKey("store_groups.id"))
     is_shared = Column(Boolean, default=False, index=True)
+    version = Column(Integer, default=1, nullable=False)  # Bumped by every ORM update; used for ETags
 
     # Relationships
     owner = relationship("User", back_populates="owned_wallets")
     store = relationship("Store", back_populates="wallets")
+    store_group = relationship("StoreGroup")
     members = relationship("WalletMember", back_populates="wallet", cascade="all, delete-orphan")
     transactions = relationship("Transaction", back_populates="wallet")
     summary = relationship("WalletSummary", back_populates="wallet", uselist=False)
 
     __table_args__ = (
+        Index("ix_wallets_store_id_status_id", "store_id", "status", "id"),  # Cashier listing, keyset on id
+        Index("ix_wallets_store_id_updated_at", "store_id", "updated_at"),  # POS sync balance deltas
+        Index("ix_wallets_store_group_id_status_id", "store_group_id", "status", "id"),  # Chain wallets at a store
+        Index("ix_wallets_store_group_id_updated_at", "store_group_id", "updated_at"),
+        # One chain wallet per customer and chain
+        Index(
+            "uq_wallets_owner_id_store_group_id", "owner_id", "store_group_id", unique=True,
+            postgresql_where=store_group_id.is_not(None), sqlite_where=store_group_id.is_not(None)
+        ),
+        Index(
+            "ix_wallets_nickname_trgm", "nickname",
+            postgresql_using="gin", postgresql_ops={"nickname": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
         {"schema": None},  # For unique constraint on owner_id, store_id
     )
+    __mapper_args__ = {"version_id_col": version}
 
 
 class WalletMember(BaseModel):
     __tablename__ = "wallet_members"
 
-    wallet_id = Column(UUID(as_uuid=True), ForeignKey("wallets.id"), nullable=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    wallet_id = Column(GUID(), ForeignKey("wallets.id"), nullable=False)
+    user_id = Column(GUID(), ForeignKey("users.id"), nullable=False, index=True)
     role = Column(Enum(WalletMemberRole), default=WalletMemberRole.MEMBER)
 
     # Relationships
     wallet = relationship("Wallet", back_populates="members")
     user = relationship("User", back_populates="wallet_memberships")
 
+    __table_args__ = (
+        UniqueConstraint("wallet_id", "user_id", name="uq_wallet_members_wallet_user"),
+    )
+
 
 class WalletSummary(BaseModel):
     __tablename__ = "wallet_summaries"
 
-    wallet_id = Column(UUID(as_uuid=True), ForeignKey("wallets.id"), nullable=False, unique=True)
-    total_charge_amount = Column(Decimal(12, 2), default=0.00)
-    total_spend_amount = Column(Decimal(12, 2), default=0.00)
-    total_bonus_earned = Column(Decimal(12, 2), default=0.00)
+    wallet_id = Column(GUID(), ForeignKey("wallets.id"), nullable=False, unique=True)
+    total_charge_amount = Column(Numeric(12, 2), default=0.00)
+    total_spend_amount = Column(Numeric(12, 2), default=0.00)
+    total_bonus_earned = Column(Numeric(12, 2), default=0.00)
     transaction_count = Column(Integer, default=0)
 
     # Relationships
@@ -82,31 +110,84 @@ class WalletSummary(BaseModel):
 
 
 class Transaction(BaseModel):
+    """Ledger row; the table is range-partitioned by month on created_at
+
+    Postgres requires the partition key in the primary key, and foreign keys
+    cannot point at a partitioned table's id alone, so reference_transaction_id
+    is a plain indexed column.
+    """
     __tablename__ = "transactions"
 
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    created_at = Column(
+        DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc)
+    )
     type = Column(Enum(TransactionType), nullable=False, index=True)
     method = Column(Enum(TransactionMethod), nullable=False)
-    wallet_id = Column(UUID(as_uuid=True), ForeignKey("wallets.id"), nullable=False, index=True)
-    amount = Column(Decimal(12, 2), nullable=False)
-    fee_amount = Column(Decimal(12, 2), default=0.00)
-    balance_after_transaction = Column(Decimal(12, 2), nullable=False)
+    wallet_id = Column(GUID(), ForeignKey("wallets.id"), nullable=False)
+    # Store the posting was made at; differs from the wallet's store for chain wallets.
+    # None for postings made at no store (transfers, expiry) and rows older than the column.
+    store_id = Column(GUID(), ForeignKey("stores.id"))
+    amount = Column(Numeric(12, 2), nullable=False)
+    fee_amount = Column(Numeric(12, 2), default=0.00)
+    bonus_amount = Column(Numeric(12, 2), default=0.00, nullable=False)  # Part of amount taken from/returned to bonus_balance
+    balance_after_transaction = Column(Numeric(12, 2), nullable=False)
     description = Column(Text)
-    reference_transaction_id = Column(UUID(as_uuid=True), ForeignKey("transactions.id"))
-    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    reference_transaction_id = Column(GUID(), index=True)
+    created_by = Column(GUID(), ForeignKey("users.id"))  # None for SYSTEM postings
 
     # Relationships
     wallet = relationship("Wallet", back_populates="transactions")
     creator = relationship("User", foreign_keys=[created_by], back_populates="created_transactions")
-    reference_transaction = relationship("Transaction", remote_side="Transaction.id")
+    reference_transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(Transaction.reference_transaction_id) == remote(Transaction.id)",
+        uselist=False
+    )
+
+    __table_args__ = (
+        Index("ix_transactions_wallet_id_created_at", "wallet_id", "created_at"),  # Wallet history, newest first
+        Index("ix_transactions_created_at", "created_at"),  # Rollup catch-up scans by time window
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class BonusLot(BaseModel):
+    """Bonus credited by one BONUS_EARNED posting, spent oldest-first until used up or expired
+
+    The open lots of a wallet add up to its bonus_balance, except for bonus
+    earned before lots existed, which is untracked and never expires. Lots
+    are only changed while their wallet row is locked.
+    """
+    __tablename__ = "bonus_lots"
+
+    wallet_id = Column(GUID(), ForeignKey("wallets.id"), nullable=False)
+    source_transaction_id = Column(GUID())  # BONUS_EARNED or REFUND posting; no FK, transactions is partitioned
+    amount = Column(Numeric(12, 2), nullable=False)
+    remaining_amount = Column(Numeric(12, 2), nullable=False)
+    expires_at = Column(DateTime(timezone=True))  # None never expires
+
+    __table_args__ = (
+        # FIFO consumption on spend; only open lots are indexed
+        Index(
+            "ix_bonus_lots_wallet_id_open", "wallet_id", "created_at",
+            postgresql_where=remaining_amount > 0
+        ),
+        # Expiry sweep: open lots by expiry time
+        Index(
+            "ix_bonus_lots_expires_at_open", "expires_at",
+            postgresql_where=and_(remaining_amount > 0, expires_at.is_not(None))
+        ),
+    )
 
 
 class BonusPolicy(BaseModel):
     __tablename__ = "bonus_policies"
 
-    store_id = Column(UUID(as_uuid=True), ForeignKey("stores.id"), nullable=False)
-    bonus_rate = Column(Decimal(5, 4), default=0.05)  # 5%
-    minimum_charge_amount = Column(Decimal(12, 2), default=0)
-    maximum_bonus_amount = Column(Decimal(12, 2))
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False)
+    bonus_rate = Column(Numeric(5, 4), default=0.05)  # 5%
+    minimum_charge_amount = Column(Numeric(12, 2), default=0)
+    maximum_bonus_amount = Column(Numeric(12, 2))
     is_active = Column(Boolean, default=True)
 
     # Relationships
@@ -116,7 +197,7 @@ class BonusPolicy(BaseModel):
 class QRCode(BaseModel):
     __tablename__ = "qr_codes"
 
-    store_id = Column(UUID(as_uuid=True), ForeignKey("stores.id"), nullable=False)
+    store_id = Column(GUID(), ForeignKey("stores.id"), nullable=False)
     qr_code_data = Column(String(500), nullable=False, unique=True)
     qr_type = Column(String(20), default="PAYMENT")
     is_active = Column(Boolean, default=True)
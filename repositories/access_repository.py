@@ -0,0 +1,43 @@
+# app/repositories/access_repository.py
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import select, literal, union_all, and_
+from uuid import UUID
+from app.models.store import Store, StoreGroup, StoreManager
+from app.models.wallet import QRCode, Wallet, WalletMember
+
+GRANT_MANAGES_STORE = "S"
+GRANT_OWNS_WALLET = "O"
+GRANT_MEMBER_OF_WALLET = "M"
+
+
+class AccessRepository:
+    def get_user_grants(self, db: Session, user_id: UUID) -> List[Tuple[str, UUID]]:
+        """Get (grant kind, object id) rows for a user's store roles and wallet access in one query"""
+        stmt = union_all(
+            select(literal(GRANT_MANAGES_STORE), StoreManager.store_id).where(
+                and_(StoreManager.user_id == user_id, StoreManager.is_active.is_(True))
+            ),
+            select(literal(GRANT_OWNS_WALLET), Wallet.id).where(Wallet.owner_id == user_id),
+            select(literal(GRANT_MEMBER_OF_WALLET), WalletMember.wallet_id).where(WalletMember.user_id == user_id),
+        )
+        return [(kind, object_id) for kind, object_id in db.execute(stmt)]
+
+    def get_wallet_scope(self, db: Session, wallet_id: UUID) -> Optional[Tuple[UUID, Optional[UUID]]]:
+        """Get (store id, store group id) of a wallet without loading the wallet"""
+        row = db.execute(select(Wallet.store_id, Wallet.store_group_id).where(Wallet.id == wallet_id)).first()
+        return tuple(row) if row else None
+
+    def get_store_group_id(self, db: Session, store_id: UUID) -> Optional[UUID]:
+        """Get the active chain a store belongs to, or None"""
+        return db.execute(
+            select(StoreGroup.id).join(Store, Store.store_group_id == StoreGroup.id).where(
+                and_(Store.id == store_id, StoreGroup.is_active.is_(True))
+            )
+        ).scalar()
+
+    def get_qr_store_id(self, db: Session, qr_code_data: str) -> Optional[UUID]:
+        """Get the store behind an active payment QR code"""
+        return db.execute(select(QRCode.store_id).where(and_(
+            QRCode.qr_code_data == qr_code_data, QRCode.qr_type == "PAYMENT", QRCode.is_active.is_(True)
+        ))).scalar()
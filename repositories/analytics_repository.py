@@ -0,0 +1,109 @@
+# app/repositories/analytics_repository.py
+from typing import List, Optional
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, select, update, func, case, cast, literal, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from uuid import UUID
+from app.models.analytics import StoreHourlyRollup, StoreDailyRollup, StoreDailyActiveWallet, RollupWatermark
+from app.models.wallet import Wallet, Transaction, TransactionType
+
+# Where the posting was made; older rows and storeless postings count for the wallet's store
+_POSTING_STORE = func.coalesce(Transaction.store_id, Wallet.store_id)
+
+_SUMMED_COLUMNS = ("charge_amount", "spend_amount", "bonus_amount", "refund_amount", "transaction_count")
+
+
+def _amount_if(transaction_type: TransactionType):
+    return func.coalesce(func.sum(case((Transaction.type == transaction_type, Transaction.amount), else_=0)), 0)
+
+
+def _totals_columns():
+    return [
+        _amount_if(TransactionType.CHARGE),
+        _amount_if(TransactionType.SPEND),
+        _amount_if(TransactionType.BONUS_EARNED),
+        _amount_if(TransactionType.REFUND),
+        func.count(Transaction.id),
+    ]
+
+
+class AnalyticsRepository:
+    def get_daily_rollups(self, db: Session, store_id: UUID, start: date, end: date) -> List[StoreDailyRollup]:
+        """Get daily rollups for store, inclusive date range"""
+        return db.query(StoreDailyRollup).filter(
+            and_(StoreDailyRollup.store_id == store_id, StoreDailyRollup.day >= start, StoreDailyRollup.day <= end)
+        ).order_by(StoreDailyRollup.day).all()
+
+    def get_hourly_rollups(self, db: Session, store_id: UUID, start: datetime, end: datetime) -> List[StoreHourlyRollup]:
+        """Get hourly rollups for store, half-open time range"""
+        return db.query(StoreHourlyRollup).filter(
+            and_(
+                StoreHourlyRollup.store_id == store_id,
+                StoreHourlyRollup.bucket_start >= start,
+                StoreHourlyRollup.bucket_start < end
+            )
+        ).order_by(StoreHourlyRollup.bucket_start).all()
+
+    def lock_watermark(self, db: Session, name: str, initial: datetime) -> Optional[RollupWatermark]:
+        """Lock the job's watermark row, or return None when another runner holds it"""
+        db.execute(
+            pg_insert(RollupWatermark).values(id=func.gen_random_uuid(), name=name, processed_until=initial)
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        return db.query(RollupWatermark).filter(
+            RollupWatermark.name == name
+        ).with_for_update(skip_locked=True).first()
+
+    def get_first_transaction_time(self, db: Session) -> Optional[datetime]:
+        return db.query(func.min(Transaction.created_at)).scalar()
+
+    def apply_window(self, db: Session, start: datetime, end: datetime, timezone: str) -> None:
+        """Fold transactions created in (start, end] into hourly and daily rollups
+
+        All statements are set-based INSERT ... SELECT ... ON CONFLICT, so the
+        cost depends on the window size, not on the size of the ledger.
+        """
+        in_window = and_(Transaction.created_at > start, Transaction.created_at <= end)
+        # Literal (not bound) parameters so GROUP BY matches the select list
+        hour = func.date_trunc(literal("hour", literal_execute=True), Transaction.created_at)
+        day = cast(func.timezone(literal(timezone, literal_execute=True), Transaction.created_at), Date)
+
+        for model, bucket_column, bucket in (
+                (StoreHourlyRollup, "bucket_start", hour),
+                (StoreDailyRollup, "day", day)
+        ):
+            totals = select(
+                func.gen_random_uuid(), _POSTING_STORE, bucket, *_totals_columns()
+            ).select_from(Transaction).join(Wallet, Wallet.id == Transaction.wallet_id).where(
+                in_window
+            ).group_by(_POSTING_STORE, bucket)
+            stmt = pg_insert(model).from_select(["id", "store_id", bucket_column, *_SUMMED_COLUMNS], totals)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["store_id", bucket_column],
+                set_={
+                    **{column: getattr(model, column) + getattr(stmt.excluded, column) for column in _SUMMED_COLUMNS},
+                    "updated_at": func.now()
+                }
+            )
+            db.execute(stmt)
+
+        pairs = select(_POSTING_STORE.label("store_id"), day, Transaction.wallet_id).select_from(Transaction).join(
+            Wallet, Wallet.id == Transaction.wallet_id
+        ).where(in_window).distinct().subquery()
+        inserted = pg_insert(StoreDailyActiveWallet).from_select(
+            ["id", "store_id", "day", "wallet_id"],
+            select(func.gen_random_uuid(), *pairs.c)
+        ).on_conflict_do_nothing().returning(
+            StoreDailyActiveWallet.store_id, StoreDailyActiveWallet.day
+        ).cte("inserted")
+        new_counts = select(
+            inserted.c.store_id, inserted.c.day, func.count().label("new_wallets")
+        ).group_by(inserted.c.store_id, inserted.c.day).subquery()
+        db.execute(
+            update(StoreDailyRollup).where(
+                and_(StoreDailyRollup.store_id == new_counts.c.store_id, StoreDailyRollup.day == new_counts.c.day)
+            ).values(
+                active_wallet_count=StoreDailyRollup.active_wallet_count + new_counts.c.new_wallets
+            ).execution_options(synchronize_session=False)
+        )
@@ -1,5 +1,6 @@
 # app/repositories/base.py
 from typing import Generic, Type, TypeVar, Optional, List
+from sqlalchemy import select, lambda_stmt
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.declarative import DeclarativeMeta
 from uuid import UUID
@@ -12,7 +13,11 @@ class BaseRepository(Generic[ModelType]):
         self.model = model
 
     def get(self, db: Session, id: UUID) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+        # Lambda statement: built and compiled once per model, only `id` is re-bound per call
+        model = self.model
+        stmt = lambda_stmt(lambda: select(model))
+        stmt += lambda s: s.where(model.id == id)
+        return db.execute(stmt).scalars().first()
 
     def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
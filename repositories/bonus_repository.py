@@ -0,0 +1,97 @@
+# app/repositories/bonus_repository.py
+from typing import List
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, select, update, insert, func, literal, cast, Row
+from uuid import UUID
+from .base import BaseRepository
+from app.models.wallet import BonusLot, Wallet, Transaction, TransactionType, TransactionMethod
+
+
+def _expired(now: datetime):
+    return and_(BonusLot.remaining_amount > 0, BonusLot.expires_at <= now)
+
+
+def _enum_literal(column, value):
+    # INSERT ... SELECT needs the enum type spelled out; a bare parameter arrives as text
+    return cast(literal(value, column.type), column.type)
+
+
+class BonusLotRepository(BaseRepository[BonusLot]):
+    def __init__(self):
+        super().__init__(BonusLot)
+
+    def get_open_lots(self, db: Session, wallet_id: UUID) -> List[BonusLot]:
+        """Get wallet's lots with bonus left, oldest first"""
+        return db.query(BonusLot).filter(
+            and_(BonusLot.wallet_id == wallet_id, BonusLot.remaining_amount > 0)
+        ).order_by(BonusLot.created_at, BonusLot.id).all()
+
+    def get_wallets_with_expired_lots(self, db: Session, now: datetime, limit: int) -> List[UUID]:
+        """Get up to `limit` wallet ids that have open lots past their expiry"""
+        return db.execute(
+            select(BonusLot.wallet_id).where(_expired(now)).group_by(BonusLot.wallet_id).limit(limit)
+        ).scalars().all()
+
+    def expire_lots(self, db: Session, wallet_ids: List[UUID], now: datetime) -> List[Row]:
+        """Expire the wallets' lots past `now` in one statement; wallets must be locked
+
+        A chain of data-modifying CTEs: empty the expired lots, total them per
+        wallet, take the totals off bonus_balance (bumping the row version so
+        cached ETags and stale ORM copies notice), and post one BONUS_EXPIRED
+        transaction per wallet. Never takes the bonus balance below zero.
+        Returns (wallet_id, balance, bonus_balance, transaction_id, amount)
+        for each wallet changed.
+        """
+        expiring = select(
+            BonusLot.id, BonusLot.remaining_amount
+        ).where(
+            and_(BonusLot.wallet_id.in_(wallet_ids), _expired(now))
+        ).subquery("expiring")
+        expired_lots = update(BonusLot).where(
+            BonusLot.id == expiring.c.id
+        ).values(remaining_amount=0).returning(
+            BonusLot.wallet_id, expiring.c.remaining_amount.label("expired_amount")
+        ).cte("expired_lots")
+
+        # Every CTE reads the same snapshot, so this sees the balances before the debit
+        totals = select(
+            expired_lots.c.wallet_id,
+            func.least(func.sum(expired_lots.c.expired_amount), Wallet.bonus_balance).label("amount")
+        ).join(Wallet, Wallet.id == expired_lots.c.wallet_id).group_by(
+            expired_lots.c.wallet_id, Wallet.bonus_balance
+        ).cte("totals")
+
+        debited = update(Wallet).where(
+            and_(Wallet.id == totals.c.wallet_id, totals.c.amount > 0)
+        ).values(
+            bonus_balance=Wallet.bonus_balance - totals.c.amount,
+            version=Wallet.version + 1
+        ).returning(
+            Wallet.id.label("wallet_id"),
+            totals.c.amount,
+            Wallet.balance,
+            Wallet.bonus_balance
+        ).cte("debited")
+
+        postings = insert(Transaction).from_select([
+            "id", "wallet_id", "type", "method", "amount", "fee_amount", "bonus_amount",
+            "balance_after_transaction", "description", "created_at"
+        ], select(
+            func.gen_random_uuid(),
+            debited.c.wallet_id,
+            _enum_literal(Transaction.type, TransactionType.BONUS_EXPIRED),
+            _enum_literal(Transaction.method, TransactionMethod.SYSTEM),
+            debited.c.amount,
+            literal(0),
+            debited.c.amount,
+            debited.c.balance + debited.c.bonus_balance,
+            literal("Bonus expired"),
+            literal(now)
+        )).returning(Transaction.id, Transaction.wallet_id).cte("postings")
+
+        stmt = select(
+            debited.c.wallet_id, debited.c.balance, debited.c.bonus_balance,
+            postings.c.id.label("transaction_id"), debited.c.amount
+        ).join(postings, postings.c.wallet_id == debited.c.wallet_id).add_cte(expired_lots, totals)
+        return db.execute(stmt).all()
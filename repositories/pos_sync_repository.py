@@ -0,0 +1,49 @@
+# app/repositories/pos_sync_repository.py
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, Row
+from datetime import datetime
+from uuid import UUID
+from .base import BaseRepository
+from app.models.pos_sync import SyncOperation
+from app.models.wallet import Wallet, WalletStatus
+from .wallet_repository import wallets_usable_at
+
+
+class SyncOperationRepository(BaseRepository[SyncOperation]):
+    def __init__(self):
+        super().__init__(SyncOperation)
+
+    def get_recorded(
+            self,
+            db: Session,
+            store_id: UUID,
+            terminal_id: str,
+            client_op_ids: List[str]
+    ) -> Dict[str, SyncOperation]:
+        """Get already received operations of a terminal, keyed by client_op_id"""
+        operations = db.query(SyncOperation).filter(
+            and_(
+                SyncOperation.store_id == store_id,
+                SyncOperation.terminal_id == terminal_id,
+                SyncOperation.client_op_id.in_(client_op_ids)
+            )
+        ).all()
+        return {operation.client_op_id: operation for operation in operations}
+
+    def get_changed_wallets(
+            self,
+            db: Session,
+            store_id: UUID,
+            since: Optional[datetime],
+            store_group_id: Optional[UUID] = None
+    ) -> List[Row]:
+        """Get balances of wallets usable at store updated after `since`, or of all active ones on first sync"""
+        query = db.query(
+            Wallet.id, Wallet.balance, Wallet.bonus_balance, Wallet.status
+        ).filter(wallets_usable_at(store_id, store_group_id))
+        if since is None:
+            query = query.filter(Wallet.status == WalletStatus.ACTIVE)
+        else:
+            query = query.filter(Wallet.updated_at > since)
+        return query.order_by(Wallet.updated_at, Wallet.id).all()
@@ -0,0 +1,108 @@
+# app/repositories/statement_repository.py
+from typing import List
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, select, func, case, literal, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from uuid import UUID
+from .base import BaseRepository
+from app.models.statement import WalletStatement
+from app.models.wallet import Transaction, TransactionType
+
+_outgoing_transfer = and_(
+    Transaction.type == TransactionType.CREDIT_TRANSFER, Transaction.reference_transaction_id.is_(None)
+)
+_incoming_transfer = and_(
+    Transaction.type == TransactionType.CREDIT_TRANSFER, Transaction.reference_transaction_id.is_not(None)
+)
+_regular_part = Transaction.amount - Transaction.bonus_amount
+
+# Effect of each posting on the wallet's regular and bonus balances
+_REGULAR_DELTA = case(
+    (Transaction.type == TransactionType.CHARGE, Transaction.amount),
+    (Transaction.type == TransactionType.SPEND, -_regular_part),
+    (Transaction.type == TransactionType.REFUND, _regular_part),
+    (_outgoing_transfer, -Transaction.amount),
+    (_incoming_transfer, Transaction.amount),
+    else_=0
+)
+_BONUS_DELTA = case(
+    (Transaction.type == TransactionType.BONUS_EARNED, Transaction.amount),
+    (Transaction.type == TransactionType.SPEND, -Transaction.bonus_amount),
+    (Transaction.type == TransactionType.REFUND, Transaction.bonus_amount),
+    (Transaction.type == TransactionType.BONUS_EXPIRED, -Transaction.amount),
+    else_=0
+)
+
+
+def _sum_if(condition):
+    return func.sum(case((condition, Transaction.amount), else_=0))
+
+
+class StatementRepository(BaseRepository[WalletStatement]):
+    def __init__(self):
+        super().__init__(WalletStatement)
+
+    def get_wallet_statements(self, db: Session, wallet_id: UUID, limit: int = 24) -> List[WalletStatement]:
+        """Get wallet's statements, newest month first"""
+        return db.query(WalletStatement).filter(
+            WalletStatement.wallet_id == wallet_id
+        ).order_by(WalletStatement.period_start.desc()).limit(limit).all()
+
+    def generate_month(self, db: Session, period_start: date, start: datetime, end: datetime) -> int:
+        """Insert statements for every wallet with postings in [start, end)
+
+        One INSERT ... SELECT: the month's postings are summed per wallet
+        (pruned to the month's ledger partition) and joined to each wallet's
+        latest earlier statement for the opening balances. Existing rows are
+        left alone, so a re-run after a crash is harmless. Returns rows inserted.
+        """
+        activity = select(
+            Transaction.wallet_id.label("wallet_id"),
+            _sum_if(Transaction.type == TransactionType.CHARGE).label("charge_amount"),
+            _sum_if(Transaction.type == TransactionType.BONUS_EARNED).label("bonus_earned_amount"),
+            _sum_if(Transaction.type == TransactionType.SPEND).label("spend_amount"),
+            _sum_if(Transaction.type == TransactionType.REFUND).label("refund_amount"),
+            _sum_if(Transaction.type == TransactionType.BONUS_EXPIRED).label("bonus_expired_amount"),
+            _sum_if(_incoming_transfer).label("transfer_in_amount"),
+            _sum_if(_outgoing_transfer).label("transfer_out_amount"),
+            func.sum(_REGULAR_DELTA).label("regular_delta"),
+            func.sum(_BONUS_DELTA).label("bonus_delta"),
+            func.count(Transaction.id).label("transaction_count")
+        ).where(
+            and_(Transaction.created_at >= start, Transaction.created_at < end)
+        ).group_by(Transaction.wallet_id).subquery("activity")
+
+        previous = select(
+            WalletStatement.closing_balance, WalletStatement.closing_bonus_balance
+        ).where(
+            and_(WalletStatement.wallet_id == activity.c.wallet_id, WalletStatement.period_start < period_start)
+        ).order_by(WalletStatement.period_start.desc()).limit(1).lateral("previous")
+
+        opening_balance = func.coalesce(previous.c.closing_balance, 0)
+        opening_bonus_balance = func.coalesce(previous.c.closing_bonus_balance, 0)
+        rows = select(
+            func.gen_random_uuid(),
+            activity.c.wallet_id,
+            literal(period_start),
+            opening_balance,
+            opening_bonus_balance,
+            activity.c.charge_amount,
+            activity.c.bonus_earned_amount,
+            activity.c.spend_amount,
+            activity.c.refund_amount,
+            activity.c.bonus_expired_amount,
+            activity.c.transfer_in_amount,
+            activity.c.transfer_out_amount,
+            opening_balance + activity.c.regular_delta,
+            opening_bonus_balance + activity.c.bonus_delta,
+            activity.c.transaction_count
+        ).select_from(activity.outerjoin(previous, true()))
+
+        stmt = pg_insert(WalletStatement).from_select([
+            "id", "wallet_id", "period_start", "opening_balance", "opening_bonus_balance",
+            "charge_amount", "bonus_earned_amount", "spend_amount", "refund_amount",
+            "bonus_expired_amount", "transfer_in_amount", "transfer_out_amount", "closing_balance", "closing_bonus_balance",
+            "transaction_count"
+        ], rows).on_conflict_do_nothing(index_elements=["wallet_id", "period_start"])
+        return db.execute(stmt).rowcount
@@ -0,0 +1,69 @@
+# app/repositories/store_repository.py
+from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import and_
+from decimal import Decimal
+from uuid import UUID
+from .base import BaseRepository
+from app.models.store import Store, StoreManager, StoreLocation, StoreCategory
+from app.models.wallet import QRCode
+
+
+class StoreRepository(BaseRepository[Store]):
+    def __init__(self):
+        super().__init__(Store)
+
+    def get_with_location(self, db: Session, store_id: UUID) -> Optional[Store]:
+        """Get store with its location loaded in the same query"""
+        return db.query(Store).options(
+            joinedload(Store.location)
+        ).filter(Store.id == store_id).first()
+
+    def get_many_with_location(self, db: Session, store_ids: List[UUID]) -> List[Store]:
+        """Get several stores with locations in one query"""
+        if not store_ids:
+            return []
+        return db.query(Store).options(
+            joinedload(Store.location)
+        ).filter(Store.id.in_(store_ids)).all()
+
+    def get_managed_stores(self, db: Session, user_id: UUID) -> List[Store]:
+        """Get stores the user actively manages, with locations"""
+        return db.query(Store).join(
+            StoreManager, StoreManager.store_id == Store.id
+        ).options(
+            joinedload(Store.location)
+        ).filter(
+            and_(StoreManager.user_id == user_id, StoreManager.is_active.is_(True))
+        ).order_by(Store.created_at).all()
+
+    def get_in_bounds(
+            self,
+            db: Session,
+            min_latitude: Decimal,
+            max_latitude: Decimal,
+            min_longitude: Decimal,
+            max_longitude: Decimal,
+            category: Optional[StoreCategory] = None,
+            limit: int = 200
+    ) -> List[Store]:
+        """Get active stores located inside a latitude/longitude box, with locations"""
+        query = db.query(Store).join(
+            StoreLocation, StoreLocation.store_id == Store.id
+        ).options(
+            contains_eager(Store.location)
+        ).filter(
+            and_(
+                Store.is_active.is_(True),
+                StoreLocation.latitude.between(min_latitude, max_latitude),
+                StoreLocation.longitude.between(min_longitude, max_longitude)
+            )
+        )
+        if category is not None:
+            query = query.filter(Store.category == category)
+        return query.limit(limit).all()
+
+    def get_active_qr_code(self, db: Session, store_id: UUID) -> Optional[QRCode]:
+        return db.query(QRCode).filter(
+            and_(QRCode.store_id == store_id, QRCode.qr_type == "PAYMENT", QRCode.is_active.is_(True))
+        ).order_by(QRCode.created_at).first()
@@ -0,0 +1,62 @@
+# app/repositories/transaction_repository.py
+from typing import List, Optional, Tuple
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func
+from uuid import UUID
+from .base import BaseRepository
+from app.models.wallet import Transaction, TransactionType
+
+
+class TransactionRepository(BaseRepository[Transaction]):
+    """Queries over the monthly-partitioned transactions table
+
+    Filters on created_at let Postgres prune partitions, so pass a time bound
+    whenever the caller knows one.
+    """
+
+    def __init__(self):
+        super().__init__(Transaction)
+
+    def get_by_id(self, db: Session, id: UUID, created_at: Optional[datetime] = None) -> Optional[Transaction]:
+        """Get transaction, probing a single partition when its timestamp is known"""
+        query = db.query(Transaction).filter(Transaction.id == id)
+        if created_at is not None:
+            query = query.filter(Transaction.created_at == created_at)
+        return query.first()
+
+    def get_wallet_transactions(
+            self,
+            db: Session,
+            wallet_id: UUID,
+            skip: int = 0,
+            limit: int = 50,
+            before: Optional[datetime] = None
+    ) -> List[Transaction]:
+        """Get transactions for a wallet, ordered by most recent
+
+        `before` pages by timestamp instead of offset; newer partitions are
+        pruned and the (wallet_id, created_at) index is read from that point.
+        """
+        query = db.query(Transaction).filter(Transaction.wallet_id == wallet_id)
+        if before is not None:
+            query = query.filter(Transaction.created_at < before)
+        return query.order_by(Transaction.created_at.desc()).offset(skip).limit(limit).all()
+
+    def get_refund_totals(self, db: Session, original: Transaction) -> Tuple[Decimal, Decimal]:
+        """Get (total refunded, bonus part refunded) for a transaction via the reference index
+
+        Refunds are always newer than the original, so older partitions are skipped.
+        """
+        total, bonus = db.query(
+            func.coalesce(func.sum(Transaction.amount), 0),
+            func.coalesce(func.sum(Transaction.bonus_amount), 0)
+        ).filter(
+            and_(
+                Transaction.reference_transaction_id == original.id,
+                Transaction.type == TransactionType.REFUND,
+                Transaction.created_at >= original.created_at
+            )
+        ).one()
+        return Decimal(total), Decimal(bonus)
@@ -1,8 +1,10 @@
 # app/repositories/user_repository.py
 from typing import Optional
+from sqlalchemy import select, lambda_stmt
 from sqlalchemy.orm import Session
 from .base import BaseRepository
 from app.models.user import User
+from app.utils.phone_utils import try_normalize_phone_number
 
 
 class UserRepository(BaseRepository[User]):
@@ -10,7 +12,12 @@ class UserRepository(BaseRepository[User]):
         super().__init__(User)
 
     def get_by_phone(self, db: Session, phone_number: str) -> Optional[User]:
-        return db.query(User).filter(User.phone_number == phone_number).first()
+        """Exact unique-index lookup on the normalized (E.164) number"""
+        normalized = try_normalize_phone_number(phone_number)
+        if normalized is None:
+            return None
+        stmt = lambda_stmt(lambda: select(User).where(User.phone_number == normalized))
+        return db.execute(stmt).scalars().first()
 
     def get_by_email(self, db: Session, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
@@ -1,11 +1,13 @@
 # app/repositories/wallet_repository.py
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import and_, or_, case, func, select, lambda_stmt, Row
 from uuid import UUID
+from decimal import Decimal
 from .base import BaseRepository
-from app.models.wallet import Wallet, Transaction
+from app.models.wallet import Wallet, WalletMember, WalletStatus
 from app.models.user import User
+from app.models.store import Store
 
 
 class WalletRepository(BaseRepository[Wallet]):
@@ -19,33 +21,156 @@ class WalletRepository(BaseRepository[Wallet]):
             joinedload(Wallet.summary)
         ).filter(Wallet.owner_id == user_id).all()
 
-    def get_store_wallets(self, db: Session, store_id: UUID, skip: int = 0, limit: int = 100) -> List[Wallet]:
-        """Get all wallets for a store"""
-        return db.query(Wallet).options(
-            joinedload(Wallet.owner)
+    def get_user_wallet_versions(self, db: Session, user_id: UUID) -> List[Tuple[UUID, int]]:
+        """Get (id, version) of wallets owned by a user, without loading them"""
+        return db.query(Wallet.id, Wallet.version).filter(Wallet.owner_id == user_id).order_by(Wallet.id).all()
+
+    def get_version(self, db: Session, wallet_id: UUID) -> Optional[int]:
+        """Get wallet's version counter without loading the row into the session"""
+        return db.query(Wallet.version).filter(Wallet.id == wallet_id).scalar()
+
+    def get_store_wallets(
+            self,
+            db: Session,
+            store_id: UUID,
+            store_group_id: Optional[UUID] = None,
+            after: Optional[UUID] = None,
+            limit: int = 100,
+            phone_suffix: Optional[str] = None,
+            name_prefix: Optional[str] = None,
+            nickname: Optional[str] = None
+    ) -> List[Wallet]:
+        """Get active wallets usable at a store with owner info, keyset-paginated by wallet id
+
+        With store_group_id the chain's wallets are included. Each search filter
+        matches one index: reversed phone prefix, lower(name) prefix, or trigram
+        on nickname.
+        """
+        query = db.query(Wallet).join(User, User.id == Wallet.owner_id).options(
+            contains_eager(Wallet.owner)
         ).filter(
-            and_(Wallet.store_id == store_id, Wallet.status == "ACTIVE")
-        ).offset(skip).limit(limit).all()
+            and_(wallets_usable_at(store_id, store_group_id), Wallet.status == WalletStatus.ACTIVE)
+        )
+        if phone_suffix:
+            query = query.filter(func.reverse(User.phone_number).startswith(phone_suffix[::-1], autoescape=True))
+        if name_prefix:
+            query = query.filter(func.lower(User.name).startswith(name_prefix.lower(), autoescape=True))
+        if nickname:
+            query = query.filter(Wallet.nickname.icontains(nickname, autoescape=True))
+        if after is not None:
+            query = query.filter(Wallet.id > after)
+        return query.order_by(Wallet.id).limit(limit).all()
+
+    def get_user_store_wallet(
+            self,
+            db: Session,
+            user_id: UUID,
+            store_id: UUID,
+            store_group_id: Optional[UUID] = None
+    ) -> Optional[Wallet]:
+        """Get user's wallet at store in any status: one opened there, else their chain wallet"""
+        if store_group_id is None:
+            stmt = lambda_stmt(lambda: select(Wallet).where(
+                and_(Wallet.owner_id == user_id, Wallet.store_id == store_id)
+            ).limit(1))
+        else:
+            stmt = lambda_stmt(lambda: select(Wallet).where(
+                and_(
+                    Wallet.owner_id == user_id,
+                    or_(Wallet.store_id == store_id, Wallet.store_group_id == store_group_id)
+                )
+            ).order_by(Wallet.store_id != store_id).limit(1))
+        return db.execute(stmt).scalars().first()
+
+    def get_user_payment_wallet(
+            self,
+            db: Session,
+            user_id: UUID,
+            store_id: UUID,
+            store_group_id: Optional[UUID],
+            amount: Decimal
+    ) -> Optional[Wallet]:
+        """Get the active wallet a user pays `amount` with at store
+
+        Without a chain (or with an inactive one) that is the wallet opened at
+        the store. In a chain, a store wallet opened before the store joined is
+        used first when it covers the amount; otherwise the chain wallet.
+        """
+        if store_group_id is None:
+            stmt = lambda_stmt(lambda: select(Wallet).where(
+                and_(Wallet.owner_id == user_id, Wallet.store_id == store_id, Wallet.status == WalletStatus.ACTIVE)
+            ).limit(1))
+        else:
+            stmt = lambda_stmt(lambda: select(Wallet).where(
+                and_(
+                    Wallet.owner_id == user_id,
+                    Wallet.status == WalletStatus.ACTIVE,
+                    or_(Wallet.store_id == store_id, Wallet.store_group_id == store_group_id)
+                )
+            ).order_by(case(
+                (and_(Wallet.store_group_id.is_(None), Wallet.balance + Wallet.bonus_balance >= amount), 0),
+                (Wallet.store_group_id == store_group_id, 1),
+                else_=2
+            )).limit(1))
+        return db.execute(stmt).scalars().first()
 
-    def get_user_store_wallet(self, db: Session, user_id: UUID, store_id: UUID) -> Optional[Wallet]:
-        """Get specific wallet for user at store"""
+    def get_user_balance_totals(self, db: Session, user_id: UUID) -> List[Row]:
+        """Sum a user's active wallets per chain, or per store outside chains
+
+        A store wallet opened before its store joined a chain counts toward the chain.
+        """
+        group_id = func.coalesce(Wallet.store_group_id, Store.store_group_id)
+        store_id = case((group_id.is_(None), Wallet.store_id))
+        return db.execute(
+            select(
+                group_id.label("store_group_id"),
+                store_id.label("store_id"),
+                func.count(Wallet.id).label("wallet_count"),
+                func.sum(Wallet.balance).label("balance"),
+                func.sum(Wallet.bonus_balance).label("bonus_balance")
+            ).join(Store, Store.id == Wallet.store_id).where(
+                and_(Wallet.owner_id == user_id, Wallet.status == WalletStatus.ACTIVE)
+            ).group_by(group_id, store_id)
+        ).all()
+
+    def get_for_update(self, db: Session, wallet_id: UUID) -> Optional[Wallet]:
+        """Get wallet and lock its row until the current transaction ends
+
+        populate_existing() refreshes a copy the session already holds from an
+        unlocked read, so callers always see the locked row's balances.
+        """
+        return db.query(Wallet).filter(Wallet.id == wallet_id).with_for_update().populate_existing().first()
+
+    def get_many_for_update(self, db: Session, wallet_ids: List[UUID]) -> List[Wallet]:
+        """Lock several wallet rows in id order
+
+        Every multi-wallet operation takes its locks in the same order, so two
+        of them touching the same wallets can wait on each other but never deadlock.
+        """
         return db.query(Wallet).filter(
-            and_(Wallet.owner_id == user_id, Wallet.store_id == store_id)
-        ).first()
+            Wallet.id.in_(wallet_ids)
+        ).order_by(Wallet.id).with_for_update().populate_existing().all()
 
 
-class TransactionRepository(BaseRepository[Transaction]):
+def wallets_usable_at(store_id: UUID, store_group_id: Optional[UUID]):
+    """Filter for wallets usable at a store: its own, plus its chain's"""
+    if store_group_id is None:
+        return Wallet.store_id == store_id
+    return or_(Wallet.store_id == store_id, Wallet.store_group_id == store_group_id)
+
+
+class WalletMemberRepository(BaseRepository[WalletMember]):
     def __init__(self):
-        super().__init__(Transaction)
+        super().__init__(WalletMember)
 
-    def get_wallet_transactions(
-            self,
-            db: Session,
-            wallet_id: UUID,
-            skip: int = 0,
-            limit: int = 50
-    ) -> List[Transaction]:
-        """Get transactions for a wallet, ordered by most recent"""
-        return db.query(Transaction).filter(
-            Transaction.wallet_id == wallet_id
-        ).order_by(Transaction.created_at.desc()).offset(skip).limit(limit).all()
+    def get_wallet_members(self, db: Session, wallet_id: UUID) -> List[WalletMember]:
+        """Get members of a shared wallet"""
+        return db.query(WalletMember).filter(
+            WalletMember.wallet_id == wallet_id
+        ).order_by(WalletMember.created_at).all()
+
+    def get_member(self, db: Session, wallet_id: UUID, user_id: UUID) -> Optional[WalletMember]:
+        """Get membership of user in wallet"""
+        return db.query(WalletMember).filter(
+            and_(WalletMember.wallet_id == wallet_id, WalletMember.user_id == user_id)
+        ).first()
@@ -0,0 +1,33 @@
+# app/schemas/admin.py
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+class SqlEventResponse(BaseModel):
+    offset_ms: float
+    duration_ms: float
+    statement: str
+
+    class Config:
+        from_attributes = True
+
+
+class ProfileSampleResponse(BaseModel):
+    method: str
+    path: str
+    started_at: datetime
+    duration_ms: float
+    status_code: Optional[int]
+    sql_ms: float
+    sql: List[SqlEventResponse]
+    profile: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DebugHeaderResponse(BaseModel):
+    header: str
+    value: str
+    expires_in: int
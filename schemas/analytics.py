@@ -0,0 +1,27 @@
+# app/schemas/analytics.py
+from pydantic import BaseModel
+from decimal import Decimal
+from datetime import date, datetime
+
+
+class StoreRollupTotals(BaseModel):
+    charge_amount: Decimal
+    spend_amount: Decimal
+    bonus_amount: Decimal
+    refund_amount: Decimal
+    transaction_count: int
+
+
+class StoreDailyRollupResponse(StoreRollupTotals):
+    day: date
+    active_wallet_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class StoreHourlyRollupResponse(StoreRollupTotals):
+    bucket_start: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,42 @@
+# app/schemas/pos_sync.py
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from decimal import Decimal
+from datetime import datetime
+from uuid import UUID
+
+
+class SyncOperationCreate(BaseModel):
+    client_op_id: str = Field(..., min_length=1, max_length=100)  # Unique per terminal; retries reuse it
+    client_created_at: datetime
+    wallet_id: UUID
+    type: str = Field(..., pattern=r'^(CHARGE|SPEND)$')
+    method: str = Field(..., pattern=r'^(CARD|CASH|EXTERNAL_APP)$')
+    amount: Decimal = Field(..., gt=0, decimal_places=2)
+    description: Optional[str] = None
+
+
+class SyncRequest(BaseModel):
+    operations: List[SyncOperationCreate] = []  # In the order they happened on the terminal
+    sync_token: Optional[str] = None  # From the previous response; omit for a full balance snapshot
+
+
+class SyncOperationResult(BaseModel):
+    client_op_id: str
+    status: str  # APPLIED or REJECTED
+    transaction_id: Optional[UUID] = None
+    error: Optional[str] = None
+    duplicate: bool = False  # Recorded by an earlier upload
+
+
+class WalletBalanceDelta(BaseModel):
+    wallet_id: UUID
+    balance: Decimal
+    bonus_balance: Decimal
+    status: str
+
+
+class SyncResponse(BaseModel):
+    results: List[SyncOperationResult]
+    wallets: List[WalletBalanceDelta]
+    sync_token: str
@@ -0,0 +1,26 @@
+# app/schemas/statement.py
+from pydantic import BaseModel
+from decimal import Decimal
+from datetime import date
+from uuid import UUID
+
+
+class WalletStatementResponse(BaseModel):
+    id: UUID
+    wallet_id: UUID
+    period_start: date
+    opening_balance: Decimal
+    opening_bonus_balance: Decimal
+    charge_amount: Decimal
+    bonus_earned_amount: Decimal
+    spend_amount: Decimal
+    refund_amount: Decimal
+    bonus_expired_amount: Decimal
+    transfer_in_amount: Decimal
+    transfer_out_amount: Decimal
+    closing_balance: Decimal
+    closing_bonus_balance: Decimal
+    transaction_count: int
+
+    class Config:
+        from_attributes = True
@@ -13,10 +13,13 @@ class StoreLocationBase(BaseModel):
     region: Optional[str] = None
     postal_code: Optional[str] = None
 
+    class Config:
+        from_attributes = True
+
 
 class StoreBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
-    category: str = Field(..., regex=r'^(RESTAURANT|CAFE|SALON|NAILSHOP|CONVENIENCE_STORE|OTHER)$')
+    category: str = Field(..., pattern=r'^(RESTAURANT|CAFE|SALON|NAILSHOP|CONVENIENCE_STORE|OTHER)$')
     business_registration_number: Optional[str] = None
 
 
@@ -24,9 +27,18 @@ class StoreCreate(StoreBase):
     location: StoreLocationBase
 
 
+class StoreUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    category: Optional[str] = Field(None, pattern=r'^(RESTAURANT|CAFE|SALON|NAILSHOP|CONVENIENCE_STORE|OTHER)$')
+    business_registration_number: Optional[str] = None
+    is_active: Optional[bool] = None
+    location: Optional[StoreLocationBase] = None
+
+
 class StoreResponse(StoreBase):
     id: UUID
     is_active: bool
+    store_group_id: Optional[UUID] = None  # Chain the store belongs to, if any
     created_at: datetime
     location: Optional[StoreLocationBase]
 
@@ -3,21 +3,35 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional
 from datetime import date, datetime
 from uuid import UUID
-import re
+from app.utils.phone_utils import normalize_phone_number
+
+
+def normalize_phone_field(cls, value: str) -> str:
+    """Reusable pydantic validator for phone_number fields"""
+    return normalize_phone_number(value)
 
 
 class UserBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
-    phone_number: str = Field(..., regex=r'^010-\d{4}-\d{4}$')
+    phone_number: str  # Any common format in, E.164 (+821012345678) out
     date_of_birth: Optional[date] = None
-    gender: Optional[str] = Field(None, regex=r'^(MALE|FEMALE|OTHER)$')
+    gender: Optional[str] = Field(None, pattern=r'^(MALE|FEMALE|OTHER)$')
     email: Optional[str] = Field(None, max_length=255)
 
+    _phone_number = validator("phone_number", allow_reuse=True)(normalize_phone_field)
+
 
 class UserCreate(UserBase):
     pass
 
 
+class UserUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    date_of_birth: Optional[date] = None
+    gender: Optional[str] = Field(None, pattern=r'^(MALE|FEMALE|OTHER)$')
+    email: Optional[str] = Field(None, max_length=255)
+
+
 class UserResponse(UserBase):
     id: UUID
     is_verified: bool
@@ -27,62 +41,19 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
-class PhoneVerificationRequest(BaseModel):
-    phone_number: str = Field(..., regex=r'^010-\d{4}-\d{4}$')
-
-
-class PhoneVerificationConfirm(BaseModel):
-    phone_number: str = Field(..., regex=r'^010-\d{4}-\d{4}$')
-    verification_code: str = Field(..., regex=r'^\d{6}$')
-
-
-# app/schemas/wallet.py
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List
-from decimal import Decimal
-from datetime import datetime
-from uuid import UUID
-
-
-class WalletBase(BaseModel):
-    nickname: Optional[str] = Field(None, max_length=100)
-    is_shared: bool = False
-
-
-class WalletCreate(WalletBase):
-    store_id: UUID
+class UserTokenResponse(UserResponse):
+    access_token: str
+    token_type: str = "bearer"
 
 
-class WalletResponse(WalletBase):
-    id: UUID
-    status: str
-    balance: Decimal
-    bonus_balance: Decimal
-    owner_id: UUID
-    store_id: UUID
-    created_at: datetime
-
-    class Config:
-        from_attributes = True
-
+class PhoneVerificationRequest(BaseModel):
+    phone_number: str
 
-class TransactionCreate(BaseModel):
-    type: str = Field(..., regex=r'^(CHARGE|SPEND|BONUS_EARNED|REFUND)$')
-    method: str = Field(..., regex=r'^(CARD|CASH|EXTERNAL_APP|TRANSFER)$')
-    amount: Decimal = Field(..., gt=0, decimal_places=2)
-    description: Optional[str] = None
+    _phone_number = validator("phone_number", allow_reuse=True)(normalize_phone_field)
 
 
-class TransactionResponse(BaseModel):
-    id: UUID
-    type: str
-    method: str
-    wallet_id: UUID
-    amount: Decimal
-    fee_amount: Decimal
-    balance_after_transaction: Decimal
-    description: Optional[str]
-    created_at: datetime
+class PhoneVerificationConfirm(BaseModel):
+    phone_number: str
+    verification_code: str = Field(..., pattern=r'^\d{6}$')
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    _phone_number = validator("phone_number", allow_reuse=True)(normalize_phone_field)
@@ -0,0 +1,101 @@
+# app/schemas/wallet.py
+from pydantic import BaseModel, Field, validator
+from typing import Optional, List
+from decimal import Decimal
+from datetime import datetime
+from uuid import UUID
+from app.schemas.user import normalize_phone_field
+
+
+class WalletBase(BaseModel):
+    nickname: Optional[str] = Field(None, max_length=100)
+    is_shared: bool = False
+
+
+class WalletCreate(WalletBase):
+    store_id: UUID
+
+
+class WalletResponse(WalletBase):
+    id: UUID
+    status: str
+    balance: Decimal
+    bonus_balance: Decimal
+    owner_id: UUID
+    store_id: UUID
+    store_group_id: Optional[UUID] = None  # Set on chain wallets, usable at every store of the chain
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class StoreWalletResponse(WalletResponse):
+    owner_name: str
+    owner_phone_number: str
+
+
+class StoreWalletPage(BaseModel):
+    items: List[StoreWalletResponse]
+    next_cursor: Optional[UUID] = None  # Pass as `cursor` to get the next page
+
+
+class WalletBalanceTotal(BaseModel):
+    """A user's active balance at one chain, or at one store outside chains"""
+    store_group_id: Optional[UUID] = None
+    store_id: Optional[UUID] = None  # Only set outside chains
+    wallet_count: int
+    balance: Decimal
+    bonus_balance: Decimal
+
+
+class WalletMemberAdd(BaseModel):
+    phone_number: str
+
+    _phone_number = validator("phone_number", allow_reuse=True)(normalize_phone_field)
+
+
+class WalletMemberResponse(BaseModel):
+    id: UUID
+    wallet_id: UUID
+    user_id: UUID
+    role: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TransactionCreate(BaseModel):
+    type: str = Field(..., pattern=r'^(CHARGE|SPEND|BONUS_EARNED|REFUND)$')
+    method: str = Field(..., pattern=r'^(CARD|CASH|EXTERNAL_APP|TRANSFER)$')
+    amount: Decimal = Field(..., gt=0, decimal_places=2)
+    description: Optional[str] = None
+
+
+class CreditTransferCreate(BaseModel):
+    to_wallet_id: UUID
+    amount: Decimal = Field(..., gt=0, decimal_places=2)
+    description: Optional[str] = None
+
+
+class RefundCreate(BaseModel):
+    amount: Optional[Decimal] = Field(None, gt=0, decimal_places=2)  # Defaults to the remaining refundable amount
+    description: Optional[str] = None
+
+
+class TransactionResponse(BaseModel):
+    id: UUID
+    type: str
+    method: str
+    wallet_id: UUID
+    store_id: Optional[UUID] = None  # Store the posting was made at
+    amount: Decimal
+    fee_amount: Decimal
+    balance_after_transaction: Decimal
+    description: Optional[str]
+    reference_transaction_id: Optional[UUID] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
\ No newline at end of file
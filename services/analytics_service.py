@@ -0,0 +1,68 @@
+# app/services/analytics_service.py
+from typing import List, Optional
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.analytics import StoreDailyRollup, StoreHourlyRollup
+from app.repositories.analytics_repository import AnalyticsRepository
+
+STORE_ROLLUP_JOB = "store_rollups"
+
+
+class AnalyticsService:
+    def __init__(self):
+        self.analytics_repo = AnalyticsRepository()
+
+    def get_daily_rollups(
+            self,
+            db: Session,
+            store_id: UUID,
+            start: Optional[date] = None,
+            end: Optional[date] = None
+    ) -> List[StoreDailyRollup]:
+        """Get daily store totals (defaults to the last 30 days)"""
+        end = end or datetime.now(ZoneInfo(settings.ANALYTICS_TIMEZONE)).date()
+        start = start or end - timedelta(days=29)
+        return self.analytics_repo.get_daily_rollups(db, store_id, start, end)
+
+    def get_hourly_rollups(self, db: Session, store_id: UUID, day: Optional[date] = None) -> List[StoreHourlyRollup]:
+        """Get hourly store totals for one local day (defaults to today)"""
+        tz = ZoneInfo(settings.ANALYTICS_TIMEZONE)
+        day = day or datetime.now(tz).date()
+        start = datetime(day.year, day.month, day.day, tzinfo=tz)
+        return self.analytics_repo.get_hourly_rollups(db, store_id, start, start + timedelta(days=1))
+
+    def run_store_rollups(self, db: Session) -> bool:
+        """Fold the next window of new transactions into store rollups
+
+        Reads transactions created after the job's watermark, up to now minus
+        ANALYTICS_ROLLUP_LAG_SECONDS, at most ANALYTICS_ROLLUP_MAX_WINDOW_HOURS
+        at a time. Rollups and watermark commit together, so a failed run is
+        simply retried. Returns True when more windows are waiting.
+        """
+        now = datetime.now(timezone.utc)
+        first = self.analytics_repo.get_first_transaction_time(db) or now
+        watermark = self.analytics_repo.lock_watermark(db, STORE_ROLLUP_JOB, first - timedelta(microseconds=1))
+        if watermark is None:
+            # Another worker is running this job
+            db.rollback()
+            return False
+
+        try:
+            ready_until = now - timedelta(seconds=settings.ANALYTICS_ROLLUP_LAG_SECONDS)
+            start = watermark.processed_until
+            end = min(ready_until, start + timedelta(hours=settings.ANALYTICS_ROLLUP_MAX_WINDOW_HOURS))
+            if end <= start:
+                db.rollback()
+                return False
+
+            self.analytics_repo.apply_window(db, start, end, settings.ANALYTICS_TIMEZONE)
+            watermark.processed_until = end
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return end < ready_until
@@ -5,6 +5,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
 import jwt
+import logging
 import random
 import asyncio
 
@@ -14,6 +15,7 @@ from app.models.user import User
 from app.repositories.user_repository import UserRepository
 from app.core.exceptions import InvalidVerificationCodeError, UserNotVerifiedError
 
+logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 
@@ -36,8 +38,8 @@ class AuthService:
         }
 
         # TODO: Integrate with SMS service (KakaoTalk SMS, Naver Cloud Platform SMS, etc.)
-        # For now, just log the code (remove in production!)
-        print(f"SMS Verification Code for {phone_number}: {code}")
+        # Never log the code itself: the log sink is shipped and retained
+        logger.info("SMS verification code issued for ***%s", phone_number[-4:])
 
         # In production, send actual SMS here
         # await self.sms_service.send_sms(phone_number, f"StoreCredit 인증번호: {code}")
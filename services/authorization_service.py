@@ -0,0 +1,150 @@
+# app/services/authorization_service.py
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.repositories.access_repository import (
+    AccessRepository, GRANT_MANAGES_STORE, GRANT_OWNS_WALLET, GRANT_MEMBER_OF_WALLET
+)
+
+# Shared by every AuthorizationService instance in this process.
+_access_cache = TTLCache(maxsize=settings.ACCESS_CACHE_MAX_ENTRIES, ttl=settings.ACCESS_CACHE_TTL_SECONDS)
+# A wallet never moves to another store or chain, so this mapping only needs a long TTL to bound memory.
+_wallet_store_cache = TTLCache(maxsize=settings.ACCESS_CACHE_MAX_ENTRIES, ttl=3600)
+# Store -> chain and payment QR code -> store; chain membership is changed by operators,
+# so a stale entry lives at most STORE_CACHE_TTL_SECONDS.
+_store_group_cache = TTLCache(maxsize=settings.STORE_CACHE_MAX_ENTRIES, ttl=settings.STORE_CACHE_TTL_SECONDS)
+_qr_store_cache = TTLCache(maxsize=settings.STORE_CACHE_MAX_ENTRIES, ttl=settings.STORE_CACHE_TTL_SECONDS)
+
+# Cached for stores outside any chain, so they don't query on every lookup
+_NO_GROUP = object()
+
+
+@dataclass(frozen=True)
+class AccessMap:
+    """Everything a user may act on, loaded in one query"""
+    managed_store_ids: FrozenSet[UUID]
+    owned_wallet_ids: FrozenSet[UUID]
+    member_wallet_ids: FrozenSet[UUID]
+
+    def can_use_wallet(self, wallet_id: UUID) -> bool:
+        return wallet_id in self.owned_wallet_ids or wallet_id in self.member_wallet_ids
+
+
+@dataclass(frozen=True)
+class WalletScope:
+    """Where a wallet can be used: its own store, or every store of its chain"""
+    store_id: UUID
+    store_group_id: Optional[UUID] = None
+
+
+class AuthorizationService:
+    def __init__(self):
+        self.access_repo = AccessRepository()
+
+    def get_access_map(self, db: Session, user_id: UUID) -> AccessMap:
+        """Get user's cached access map, loading it on miss"""
+        access = _access_cache.get(user_id)
+        if access is None:
+            grants = {GRANT_MANAGES_STORE: set(), GRANT_OWNS_WALLET: set(), GRANT_MEMBER_OF_WALLET: set()}
+            for kind, object_id in self.access_repo.get_user_grants(db, user_id):
+                grants[kind].add(object_id)
+            access = AccessMap(
+                managed_store_ids=frozenset(grants[GRANT_MANAGES_STORE]),
+                owned_wallet_ids=frozenset(grants[GRANT_OWNS_WALLET]),
+                member_wallet_ids=frozenset(grants[GRANT_MEMBER_OF_WALLET])
+            )
+            _access_cache.set(user_id, access)
+        return access
+
+    def get_wallet_scope(self, db: Session, wallet_id: UUID) -> Optional[WalletScope]:
+        """Get wallet's store and chain (cached)"""
+        scope = _wallet_store_cache.get(wallet_id)
+        if scope is None:
+            row = self.access_repo.get_wallet_scope(db, wallet_id)
+            if row is not None:
+                scope = WalletScope(*row)
+                _wallet_store_cache.set(wallet_id, scope)
+        return scope
+
+    def get_wallet_store_id(self, db: Session, wallet_id: UUID) -> Optional[UUID]:
+        """Get wallet's store id (cached)"""
+        scope = self.get_wallet_scope(db, wallet_id)
+        return scope.store_id if scope else None
+
+    def peek_wallet_store_id(self, wallet_id: UUID) -> Optional[UUID]:
+        """Get wallet's store id only if it is already cached (never queries)"""
+        scope = _wallet_store_cache.get(wallet_id)
+        return scope.store_id if scope else None
+
+    def remember_wallet_store(self, wallet_id: UUID, store_id: UUID, store_group_id: Optional[UUID] = None) -> None:
+        """Record a wallet's store and chain when the caller already has it loaded"""
+        _wallet_store_cache.set(wallet_id, WalletScope(store_id, store_group_id))
+
+    def get_store_group_id(self, db: Session, store_id: UUID) -> Optional[UUID]:
+        """Get the chain a store belongs to, or None (cached)"""
+        store_id = UUID(str(store_id))
+        group_id = _store_group_cache.get(store_id)
+        if group_id is None:
+            group_id = self.access_repo.get_store_group_id(db, store_id) or _NO_GROUP
+            _store_group_cache.set(store_id, group_id)
+        return None if group_id is _NO_GROUP else group_id
+
+    def get_qr_store_id(self, db: Session, qr_code_data: str) -> Optional[UUID]:
+        """Get the store behind an active payment QR code (cached)"""
+        store_id = _qr_store_cache.get(qr_code_data)
+        if store_id is None:
+            store_id = self.access_repo.get_qr_store_id(db, qr_code_data)
+            if store_id is not None:
+                _qr_store_cache.set(qr_code_data, store_id)
+        return store_id
+
+    def wallet_usable_at_store(self, db: Session, wallet, store_id: UUID) -> bool:
+        """A store wallet is usable at its store, a chain wallet at every store of the chain
+
+        `wallet` is a Wallet or a WalletScope.
+        """
+        if wallet.store_id == store_id:
+            return True
+        return wallet.store_group_id is not None and wallet.store_group_id == self.get_store_group_id(db, store_id)
+
+    def user_manages_store(self, db: Session, user_id: UUID, store_id: UUID) -> bool:
+        return UUID(str(store_id)) in self.get_access_map(db, user_id).managed_store_ids
+
+    def can_user_manage_wallet(self, db: Session, user_id: UUID, wallet_id: UUID) -> bool:
+        """Managers of the wallet's store, or of any store of its chain, can manage it"""
+        return self.get_acting_store_id(db, user_id, wallet_id) is not None
+
+    def get_acting_store_id(self, db: Session, user_id: UUID, wallet_id: UUID) -> Optional[UUID]:
+        """Store a manager acts for on a wallet: its own store if they manage it, else one of its chain's"""
+        access = self.get_access_map(db, user_id)
+        if not access.managed_store_ids:
+            return None
+        scope = self.get_wallet_scope(db, wallet_id)
+        if scope is None:
+            return None
+        if scope.store_id in access.managed_store_ids:
+            return scope.store_id
+        if scope.store_group_id is not None:
+            for store_id in sorted(access.managed_store_ids):
+                if self.get_store_group_id(db, store_id) == scope.store_group_id:
+                    return store_id
+        return None
+
+    def can_user_spend_from_wallet(self, db: Session, user_id: UUID, wallet_id: UUID) -> bool:
+        """Wallet owner, wallet members and store managers can spend"""
+        access = self.get_access_map(db, user_id)
+        if access.can_use_wallet(wallet_id):
+            return True
+        return self.get_acting_store_id(db, user_id, wallet_id) is not None
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """Drop user's access map after their roles or memberships change"""
+        _access_cache.delete(user_id)
+
+    def invalidate_store_group(self, store_id: UUID) -> None:
+        """Drop a store's cached chain after it joins or leaves one"""
+        _store_group_cache.delete(UUID(str(store_id)))
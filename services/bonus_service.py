@@ -0,0 +1,50 @@
+# app/services/bonus_service.py
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import event_broker
+from app.models.wallet import TransactionType
+from app.repositories.bonus_repository import BonusLotRepository
+from app.repositories.wallet_repository import WalletRepository
+
+
+class BonusService:
+    def __init__(self):
+        self.bonus_repo = BonusLotRepository()
+        self.wallet_repo = WalletRepository()
+
+    def expire_next_batch(self, db: Session) -> bool:
+        """Expire lots past their expiry for the next batch of wallets
+
+        Wallets are locked in id order, like every other multi-wallet posting,
+        so the sweep and concurrent spends never deadlock and a spend never
+        uses bonus that is expiring under it. Returns True when the batch was
+        full and more wallets may be waiting.
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            wallet_ids = self.bonus_repo.get_wallets_with_expired_lots(
+                db, now, settings.BONUS_EXPIRY_BATCH_WALLETS
+            )
+            if not wallet_ids:
+                db.rollback()
+                return False
+            self.wallet_repo.get_many_for_update(db, wallet_ids)
+            expired = self.bonus_repo.expire_lots(db, wallet_ids, now)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for row in expired:
+            event_broker.publish({
+                "wallet_id": str(row.wallet_id),
+                "balance": str(row.balance),
+                "bonus_balance": str(row.bonus_balance),
+                "transaction_id": str(row.transaction_id),
+                "transaction_type": TransactionType.BONUS_EXPIRED.value,
+                "amount": str(row.amount),
+                "created_at": now.isoformat()
+            })
+        return len(wallet_ids) == settings.BONUS_EXPIRY_BATCH_WALLETS
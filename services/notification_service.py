@@ -0,0 +1,22 @@
+# app/services/notification_service.py
+import logging
+from sqlalchemy.orm import Session
+
+from app.models.wallet import Transaction
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationService:
+    async def send_transaction_notifications(self, db: Session, transaction: Transaction) -> None:
+        """Log a posting for the wallet's owner and members
+
+        Open apps already get live balances from the wallet event stream. This
+        is the single place routers call after a posting, so delivery to closed
+        apps (push, SMS) plugs in here without touching the routes. Until then
+        it only writes a debug log line.
+        """
+        logger.debug(
+            "Transaction notification: wallet=%s type=%s amount=%s",
+            transaction.wallet_id, transaction.type.value, transaction.amount
+        )
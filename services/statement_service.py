@@ -0,0 +1,75 @@
+# app/services/statement_service.py
+from typing import List
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.exceptions import WalletNotFoundError, StatementNotFoundError
+from app.models.statement import WalletStatement
+from app.repositories.analytics_repository import AnalyticsRepository
+from app.repositories.statement_repository import StatementRepository
+from app.services.authorization_service import AuthorizationService
+
+STATEMENT_JOB = "wallet_statements"
+
+
+def _month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1, tzinfo=moment.tzinfo)
+
+
+def _next_month(month_start: datetime) -> datetime:
+    return _month_start(month_start + timedelta(days=32))
+
+
+class StatementService:
+    def __init__(self):
+        self.statement_repo = StatementRepository()
+        self.analytics_repo = AnalyticsRepository()
+        self.authorization = AuthorizationService()
+
+    def get_wallet_statements(self, db: Session, wallet_id: UUID, user_id: UUID, limit: int = 24) -> List[WalletStatement]:
+        """Get statements of a wallet the user can access, newest first"""
+        if not self.authorization.can_user_spend_from_wallet(db, user_id, wallet_id):
+            raise WalletNotFoundError("Wallet not found")
+        return self.statement_repo.get_wallet_statements(db, wallet_id, limit)
+
+    def get_statement(self, db: Session, statement_id: UUID, user_id: UUID) -> WalletStatement:
+        """Get one statement by id if the user can access its wallet"""
+        statement = self.statement_repo.get(db, statement_id)
+        if not statement or not self.authorization.can_user_spend_from_wallet(db, user_id, statement.wallet_id):
+            raise StatementNotFoundError("Statement not found")
+        return statement
+
+    def generate_next_statements(self, db: Session) -> bool:
+        """Generate statements for the next closed month after the job's watermark
+
+        Months are generated strictly in order, so each one can open from the
+        previous statements' closing balances. Statements and watermark commit
+        together. Returns True when another closed month is waiting.
+        """
+        tz = ZoneInfo(settings.ANALYTICS_TIMEZONE)
+        now = datetime.now(tz)
+        first = self.analytics_repo.get_first_transaction_time(db) or now
+        watermark = self.analytics_repo.lock_watermark(db, STATEMENT_JOB, _month_start(first.astimezone(tz)))
+        if watermark is None:
+            # Another worker is running this job
+            db.rollback()
+            return False
+
+        lag = timedelta(seconds=settings.STATEMENT_CLOSE_LAG_SECONDS)
+        try:
+            start = watermark.processed_until.astimezone(tz)
+            end = _next_month(start)
+            if end + lag > now:
+                db.rollback()
+                return False
+
+            self.statement_repo.generate_month(db, start.date(), start, end)
+            watermark.processed_until = end
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return _next_month(end) + lag <= now
@@ -0,0 +1,183 @@
+# app/services/store_service.py
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from decimal import Decimal
+from uuid import UUID
+import math
+import secrets
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.exceptions import StoreNotFoundError
+from app.models.store import Store, StoreLocation, StoreManager, StoreManagerRole, StoreCategory
+from app.models.wallet import QRCode
+from app.repositories.store_repository import StoreRepository
+from app.schemas.store import StoreCreate, StoreUpdate, StoreResponse
+from app.services.authorization_service import AuthorizationService
+
+# Shared by every StoreService instance in this process.
+# Keyed by store id -> StoreResponse / ETag, and by manager user id -> tuple of store ids.
+_store_cache = TTLCache(maxsize=settings.STORE_CACHE_MAX_ENTRIES, ttl=settings.STORE_CACHE_TTL_SECONDS)
+_managed_cache = TTLCache(maxsize=settings.STORE_CACHE_MAX_ENTRIES, ttl=settings.STORE_CACHE_TTL_SECONDS)
+_store_etag_cache = TTLCache(maxsize=settings.STORE_CACHE_MAX_ENTRIES, ttl=settings.STORE_CACHE_TTL_SECONDS)
+
+EARTH_RADIUS_KM = 6371.0
+NEARBY_MAX_STORES = 200
+
+
+def _distance_km(latitude: float, longitude: float, other_latitude: float, other_longitude: float) -> float:
+    """Great-circle (haversine) distance"""
+    phi1, phi2 = math.radians(latitude), math.radians(other_latitude)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(other_longitude - longitude)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class StoreService:
+    def __init__(self):
+        self.store_repo = StoreRepository()
+        self.authorization = AuthorizationService()
+
+    def create_store(self, db: Session, store_data: StoreCreate, owner_id: UUID) -> StoreResponse:
+        """Create store with location and register creator as owner"""
+        store = Store(
+            name=store_data.name,
+            category=StoreCategory(store_data.category),
+            business_registration_number=store_data.business_registration_number
+        )
+        store.location = StoreLocation(**store_data.location.dict())
+        db.add(store)
+        db.add(StoreManager(store=store, user_id=owner_id, role=StoreManagerRole.OWNER))
+        db.commit()
+
+        store = self.store_repo.get_with_location(db, store.id)
+        self.invalidate_manager(owner_id)
+        self.authorization.invalidate_user(owner_id)
+        return self._cache_store(store)
+
+    def update_store(self, db: Session, store_id: UUID, store_data: StoreUpdate) -> StoreResponse:
+        """Update store fields and/or location"""
+        store_id = UUID(str(store_id))
+        store = self.store_repo.get_with_location(db, store_id)
+        if not store:
+            raise StoreNotFoundError("Store not found")
+
+        update_data = store_data.dict(exclude_unset=True)
+        location_data = update_data.pop("location", None)
+        if "category" in update_data and update_data["category"] is not None:
+            update_data["category"] = StoreCategory(update_data["category"])
+        for field, value in update_data.items():
+            setattr(store, field, value)
+        if location_data is not None:
+            if store.location is None:
+                store.location = StoreLocation(**location_data)
+            else:
+                for field, value in location_data.items():
+                    setattr(store.location, field, value)
+        db.commit()
+
+        self.invalidate_store(store_id)
+        store = self.store_repo.get_with_location(db, store_id)
+        return self._cache_store(store)
+
+    def get_store(self, db: Session, store_id: UUID) -> Optional[StoreResponse]:
+        """Get store read model (cached)"""
+        store_id = UUID(str(store_id))
+        cached = _store_cache.get(store_id)
+        if cached is not None:
+            return cached
+
+        store = self.store_repo.get_with_location(db, store_id)
+        if not store:
+            return None
+        return self._cache_store(store)
+
+    def get_user_managed_stores(self, db: Session, user_id: UUID) -> List[StoreResponse]:
+        """Get read models of stores managed by user (cached)"""
+        store_ids = _managed_cache.get(user_id)
+        if store_ids is None:
+            stores = [self._cache_store(store) for store in self.store_repo.get_managed_stores(db, user_id)]
+            _managed_cache.set(user_id, tuple(store.id for store in stores))
+            return stores
+
+        cached = {store_id: _store_cache.get(store_id) for store_id in store_ids}
+        missing = [store_id for store_id, store in cached.items() if store is None]
+        for store in self.store_repo.get_many_with_location(db, missing):
+            cached[store.id] = self._cache_store(store)
+        return [cached[store_id] for store_id in store_ids if cached[store_id] is not None]
+
+    def get_store_etag(self, db: Session, store_id: UUID) -> Optional[str]:
+        """ETag of the store read model, or None if the store does not exist"""
+        store_id = UUID(str(store_id))
+        etag = _store_etag_cache.get(store_id)
+        if etag is None:
+            store = self.store_repo.get_with_location(db, store_id)
+            if not store:
+                return None
+            self._cache_store(store)
+            etag = _store_etag_cache.get(store_id)
+        return etag
+
+    def find_nearby_stores(
+            self,
+            db: Session,
+            latitude: Decimal,
+            longitude: Decimal,
+            radius_km: int,
+            category: Optional[str] = None
+    ) -> List[StoreResponse]:
+        """Get active stores within radius_km, nearest first
+
+        The bounding box is filtered in SQL, the exact distance in Python.
+        """
+        latitude, longitude = float(latitude), float(longitude)
+        lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+        # Longitude degrees shrink towards the poles
+        lon_delta = lat_delta / max(math.cos(math.radians(latitude)), 0.01)
+        stores = self.store_repo.get_in_bounds(
+            db,
+            Decimal(str(latitude - lat_delta)), Decimal(str(latitude + lat_delta)),
+            Decimal(str(longitude - lon_delta)), Decimal(str(longitude + lon_delta)),
+            StoreCategory(category) if category else None,
+            limit=NEARBY_MAX_STORES
+        )
+        by_distance = []
+        for store in stores:
+            distance = _distance_km(latitude, longitude, float(store.location.latitude), float(store.location.longitude))
+            if distance <= radius_km:
+                by_distance.append((distance, store))
+        by_distance.sort(key=lambda pair: pair[0])
+        return [self._cache_store(store) for _, store in by_distance]
+
+    def get_or_create_qr_code(self, db: Session, store_id: UUID) -> QRCode:
+        """Get store's active payment QR code, creating one on first use"""
+        store_id = UUID(str(store_id))
+        qr_code = self.store_repo.get_active_qr_code(db, store_id)
+        if qr_code is None:
+            if not self.store_repo.get(db, store_id):
+                raise StoreNotFoundError("Store not found")
+            qr_code = QRCode(store_id=store_id, qr_code_data=f"SCP1:{secrets.token_urlsafe(24)}", qr_type="PAYMENT")
+            db.add(qr_code)
+            db.commit()
+        return qr_code
+
+    def user_manages_store(self, db: Session, user_id: UUID, store_id: UUID) -> bool:
+        """Check whether user is an active manager of store"""
+        return self.authorization.user_manages_store(db, user_id, store_id)
+
+    def invalidate_store(self, store_id: UUID) -> None:
+        _store_cache.delete(store_id)
+        _store_etag_cache.delete(store_id)
+
+    def invalidate_manager(self, user_id: UUID) -> None:
+        _managed_cache.delete(user_id)
+
+    def _cache_store(self, store: Store) -> StoreResponse:
+        response = StoreResponse.from_orm(store)
+        _store_cache.set(store.id, response)
+        _store_etag_cache.set(store.id, make_etag(
+            "store", store.id, store.updated_at, store.location.updated_at if store.location else None
+        ))
+        return response
@@ -0,0 +1,24 @@
+# app/services/user_service.py
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from app.core.exceptions import UserNotFoundError
+from app.models.user import User, Gender
+from app.repositories.user_repository import UserRepository
+from app.schemas.user import UserUpdate
+
+
+class UserService:
+    def __init__(self):
+        self.user_repo = UserRepository()
+
+    def update_user(self, db: Session, user_id: UUID, user_update: dict) -> User:
+        """Update the profile fields present in user_update; phone number and verification are not editable"""
+        user = self.user_repo.get(db, user_id)
+        if not user:
+            raise UserNotFoundError("User not found")
+
+        update_data = UserUpdate(**user_update).dict(exclude_unset=True)
+        if update_data.get("gender") is not None:
+            update_data["gender"] = Gender(update_data["gender"])
+        return self.user_repo.update(db, db_obj=user, obj_in=update_data)
@@ -1,34 +1,71 @@
 # app/services/wallet_service.py
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from decimal import Decimal
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
-from app.repositories.wallet_repository import WalletRepository, TransactionRepository
-from app.models.wallet import Wallet, Transaction, WalletStatus, TransactionType, TransactionMethod
-from app.core.exceptions import InsufficientFundsError, WalletNotFoundError
+import base64
+import uuid
+from app.repositories.wallet_repository import WalletRepository, WalletMemberRepository
+from app.repositories.transaction_repository import TransactionRepository
+from app.repositories.user_repository import UserRepository
+from app.repositories.pos_sync_repository import SyncOperationRepository
+from app.repositories.bonus_repository import BonusLotRepository
+from app.models.wallet import (
+    Wallet, WalletMember, WalletMemberRole, Transaction, WalletStatus, TransactionType, TransactionMethod,
+    BonusLot
+)
+from app.models.pos_sync import SyncOperation, SyncOperationStatus
+from app.schemas.pos_sync import SyncOperationCreate, SyncOperationResult, WalletBalanceDelta, SyncResponse
+from app.schemas.wallet import WalletBalanceTotal
+from app.core.config import settings
+from app.core.exceptions import (
+    InsufficientFundsError, WalletNotFoundError, WalletAccessDeniedError, UserNotFoundError,
+    TransactionNotFoundError, RefundNotAllowedError, SyncConflictError
+)
+from app.core.etag import make_etag
+from app.core.events import event_broker
+from app.core.risk import risk_engine
+from app.services.authorization_service import AuthorizationService
+from app.utils.phone_utils import phone_search_digits
 
 
 class WalletService:
     def __init__(self):
         self.wallet_repo = WalletRepository()
+        self.member_repo = WalletMemberRepository()
         self.transaction_repo = TransactionRepository()
+        self.user_repo = UserRepository()
+        self.sync_repo = SyncOperationRepository()
+        self.bonus_repo = BonusLotRepository()
+        self.authorization = AuthorizationService()
 
     def create_wallet(self, db: Session, user_id: UUID, store_id: UUID, nickname: Optional[str] = None) -> Wallet:
-        """Create a new wallet for user at store"""
+        """Create a new wallet for user at store
+
+        At a store of a chain this is the user's chain wallet, shared by every
+        store of the chain.
+        """
+        store_group_id = self.authorization.get_store_group_id(db, store_id)
         # Check if wallet already exists
-        existing = self.wallet_repo.get_user_store_wallet(db, user_id, store_id)
+        existing = self.wallet_repo.get_user_store_wallet(db, user_id, store_id, store_group_id)
         if existing:
             return existing
 
         wallet_data = {
             "owner_id": user_id,
             "store_id": store_id,
+            "store_group_id": store_group_id,
             "nickname": nickname,
             "balance": Decimal("0.00"),
             "bonus_balance": Decimal("0.00"),
             "status": WalletStatus.ACTIVE
         }
-        return self.wallet_repo.create(db, obj_in=wallet_data)
+        wallet = self.wallet_repo.create(db, obj_in=wallet_data)
+        self.authorization.invalidate_user(user_id)
+        return wallet
 
     def charge_wallet(
             self,
@@ -37,102 +74,675 @@ class WalletService:
             amount: Decimal,
             method: TransactionMethod,
             created_by: UUID,
+            description: Optional[str] = None,
+            store_id: Optional[UUID] = None
+    ) -> Transaction:
+        """Charge money to wallet with bonus calculation
+
+        store_id is where the charge happens; see _posting_store_id for the default.
+        """
+        store_id = store_id or self._posting_store_id(db, created_by, wallet_id)
+        wallet = self._lock_active_wallet(db, wallet_id)
+        try:
+            transaction = self._post_charge(db, wallet, store_id, amount, method, created_by, description)
+            self._commit_postings(db, (wallet, transaction))
+        except Exception:
+            db.rollback()
+            raise
+        return transaction
+
+    def spend_from_wallet(
+            self,
+            db: Session,
+            wallet_id: UUID,
+            amount: Decimal,
+            method: TransactionMethod,
+            created_by: UUID,
+            description: Optional[str] = None,
+            store_id: Optional[UUID] = None
+    ) -> Transaction:
+        """Spend money from wallet (use bonus first, then regular balance)
+
+        store_id is where the spend happens, which for chain wallets can be
+        any store of the chain; see _posting_store_id for the default.
+
+        The wallet row stays locked only from the SELECT ... FOR UPDATE to the
+        single commit, so members of a shared wallet spending at the same time
+        queue on the row briefly instead of overwriting each other's balance.
+        Velocity rules run before the row is locked, from the cached wallet
+        store, so a shared risk backend is never waited on under the lock; a
+        refused spend raises RiskCheckFailedError. Only committed spends
+        count toward the limits.
+        """
+        store_id = store_id or self._posting_store_id(db, created_by, wallet_id)
+        risk_engine.check_spend(created_by, wallet_id, store_id, amount)
+        wallet = self._lock_active_wallet(db, wallet_id)
+        try:
+            transaction = self._post_spend(db, wallet, store_id, amount, method, created_by, description)
+            self._commit_postings(db, (wallet, transaction))
+        except Exception:
+            db.rollback()
+            raise
+        risk_engine.record_spend(created_by, wallet_id, store_id, amount)
+        return transaction
+
+    def transfer_credit(
+            self,
+            db: Session,
+            from_wallet_id: UUID,
+            to_wallet_id: UUID,
+            amount: Decimal,
+            created_by: UUID,
             description: Optional[str] = None
     ) -> Transaction:
-        """Charge money to wallet with bonus calculation"""
-        wallet = self.wallet_repo.get(db, wallet_id)
+        """Move regular balance between two wallets of the same store or chain
+
+        Writes a CREDIT_TRANSFER row on each wallet; the incoming row points at
+        the outgoing one through reference_transaction_id. Bonus balance is
+        store-granted and stays with the wallet that earned it. The outgoing leg
+        counts toward the same velocity limits as a spend.
+        """
+        if from_wallet_id == to_wallet_id:
+            raise ValueError("Cannot transfer to the same wallet")
+
+        store_id = self._posting_store_id(db, created_by, from_wallet_id)
+        risk_engine.check_spend(created_by, from_wallet_id, store_id, amount)
+        locked = self.wallet_repo.get_many_for_update(db, [from_wallet_id, to_wallet_id])
+        wallets = {wallet.id: wallet for wallet in locked if wallet.status == WalletStatus.ACTIVE}
+        from_wallet = wallets.get(from_wallet_id)
+        to_wallet = wallets.get(to_wallet_id)
+        try:
+            if not from_wallet or not to_wallet:
+                raise WalletNotFoundError("Wallet not found or inactive")
+            if not self._same_store_or_chain(db, from_wallet, to_wallet):
+                raise ValueError("Credit can only be transferred between wallets of the same store or chain")
+            if from_wallet.balance < amount:
+                raise InsufficientFundsError(
+                    f"Insufficient transferable balance. Available: {from_wallet.balance}, Required: {amount}"
+                )
+
+            from_wallet.balance = from_wallet.balance - amount
+            to_wallet.balance = to_wallet.balance + amount
+
+            outgoing_data = {
+                "type": TransactionType.CREDIT_TRANSFER,
+                "method": TransactionMethod.TRANSFER,
+                "wallet_id": from_wallet.id,
+                "amount": amount,
+                "balance_after_transaction": from_wallet.balance + from_wallet.bonus_balance,
+                "description": description or f"Transfer to wallet {to_wallet.id}",
+                "created_by": created_by
+            }
+            outgoing = Transaction(**outgoing_data)
+            incoming_data = {
+                "type": TransactionType.CREDIT_TRANSFER,
+                "method": TransactionMethod.TRANSFER,
+                "wallet_id": to_wallet.id,
+                "amount": amount,
+                "balance_after_transaction": to_wallet.balance + to_wallet.bonus_balance,
+                "description": description or f"Transfer from wallet {from_wallet.id}",
+                "created_by": created_by,
+                "reference_transaction": outgoing
+            }
+            incoming = Transaction(**incoming_data)
+            db.add(outgoing)
+            db.add(incoming)
+            self._commit_postings(db, (from_wallet, outgoing), (to_wallet, incoming))
+        except Exception:
+            db.rollback()
+            raise
+        risk_engine.record_spend(created_by, from_wallet_id, store_id, amount)
+        return outgoing
+
+    def refund_transaction(
+            self,
+            db: Session,
+            transaction_id: UUID,
+            created_by: UUID,
+            amount: Optional[Decimal] = None,
+            description: Optional[str] = None
+    ) -> Transaction:
+        """Refund a SPEND fully or partially (store managers only)
+
+        Refunds return the regular part of the spend first and the bonus part
+        last, so a full refund restores both balances exactly. Earlier refunds
+        are summed through the reference_transaction_id index while the wallet
+        row is locked, so concurrent refunds cannot exceed the original amount.
+        """
+        original = self.transaction_repo.get(db, transaction_id)
+        if not original:
+            raise TransactionNotFoundError("Transaction not found")
+        if original.type != TransactionType.SPEND:
+            raise RefundNotAllowedError("Only SPEND transactions can be refunded")
+        if not self.authorization.can_user_manage_wallet(db, created_by, original.wallet_id):
+            raise WalletAccessDeniedError("Only store managers can refund")
+
+        wallet = self._lock_active_wallet(db, original.wallet_id)
+        try:
+            refunded, bonus_refunded = self.transaction_repo.get_refund_totals(db, original)
+            refundable = original.amount - refunded
+            if refundable <= 0:
+                raise RefundNotAllowedError("Transaction is already fully refunded")
+            if amount is None:
+                amount = refundable
+            if amount > refundable:
+                raise RefundNotAllowedError(f"Refund exceeds refundable amount. Refundable: {refundable}")
+
+            regular_refundable = (original.amount - original.bonus_amount) - (refunded - bonus_refunded)
+            regular_part = min(amount, regular_refundable)
+            bonus_part = amount - regular_part
+            wallet.balance = wallet.balance + regular_part
+            wallet.bonus_balance = wallet.bonus_balance + bonus_part
+
+            transaction_data = {
+                "id": uuid.uuid4(),
+                "type": TransactionType.REFUND,
+                "method": original.method,
+                "wallet_id": wallet.id,
+                "store_id": original.store_id,
+                "amount": amount,
+                "bonus_amount": bonus_part,
+                "balance_after_transaction": wallet.balance + wallet.bonus_balance,
+                "description": description or f"Refund of {original.id}",
+                "created_by": created_by,
+                "reference_transaction_id": original.id
+            }
+            transaction = Transaction(**transaction_data)
+            db.add(transaction)
+            if bonus_part > 0:
+                # Returned bonus starts a new lot rather than reopening the spent ones
+                self._grant_bonus_lot(db, wallet, bonus_part, transaction)
+            self._commit_postings(db, (wallet, transaction))
+        except Exception:
+            db.rollback()
+            raise
+        return transaction
+
+    def sync_terminal_operations(
+            self,
+            db: Session,
+            store_id: UUID,
+            terminal_id: str,
+            operations: List[SyncOperationCreate],
+            created_by: UUID,
+            sync_token: Optional[str] = None
+    ) -> Tuple[SyncResponse, List[Transaction]]:
+        """Apply a POS terminal's queued charges and spends, then report balance changes
+
+        The whole batch runs in one database transaction: every wallet it
+        touches is locked up front in id order, operations are applied in the
+        order given, and each one's outcome is recorded under its client_op_id.
+        Operations that were recorded by an earlier upload are not applied
+        again; their original outcome is returned. A rejected operation (e.g.
+        insufficient funds) does not stop the rest of the batch.
+
+        Returns the response and the newly posted transactions.
+        """
+        if len(operations) > settings.SYNC_MAX_BATCH_OPERATIONS:
+            raise ValueError(f"At most {settings.SYNC_MAX_BATCH_OPERATIONS} operations per sync")
+        client_op_ids = [operation.client_op_id for operation in operations]
+        if len(set(client_op_ids)) != len(client_op_ids):
+            raise ValueError("Duplicate client_op_id in batch")
+        since = self._decode_sync_token(sync_token)
+
+        results = []
+        postings = []
+        if operations:
+            # Locking before the duplicate check also serializes concurrent re-uploads of the same batch
+            locked = self.wallet_repo.get_many_for_update(db, list({op.wallet_id for op in operations}))
+            wallets = {wallet.id: wallet for wallet in locked}
+            try:
+                recorded = self.sync_repo.get_recorded(db, store_id, terminal_id, client_op_ids)
+                records = []
+                for operation in operations:
+                    record = recorded.get(operation.client_op_id)
+                    if record is not None:
+                        records.append((record, None, True))
+                        continue
+
+                    transaction = None
+                    error = None
+                    wallet = wallets.get(operation.wallet_id)
+                    if (
+                            not wallet or wallet.status != WalletStatus.ACTIVE
+                            or not self.authorization.wallet_usable_at_store(db, wallet, store_id)
+                    ):
+                        error = "Wallet not found or inactive"
+                    else:
+                        post = self._post_charge if operation.type == TransactionType.CHARGE else self._post_spend
+                        try:
+                            transaction = post(
+                                db,
+                                wallet,
+                                store_id,
+                                operation.amount,
+                                TransactionMethod(operation.method),
+                                created_by,
+                                operation.description
+                            )
+                            postings.append((wallet, transaction))
+                        except InsufficientFundsError as e:
+                            error = str(e)
+
+                    record_data = {
+                        "store_id": store_id,
+                        "terminal_id": terminal_id,
+                        "client_op_id": operation.client_op_id,
+                        "client_created_at": operation.client_created_at,
+                        "wallet_id": operation.wallet_id,
+                        "type": TransactionType(operation.type),
+                        "method": TransactionMethod(operation.method),
+                        "amount": operation.amount,
+                        "status": SyncOperationStatus.REJECTED if error else SyncOperationStatus.APPLIED,
+                        "error": error,
+                        "created_by": created_by
+                    }
+                    record = SyncOperation(**record_data)
+                    db.add(record)
+                    records.append((record, transaction, False))
+
+                # Transaction ids are assigned on flush
+                db.flush()
+                for record, transaction, duplicate in records:
+                    if transaction is not None:
+                        record.transaction_id = transaction.id
+                    results.append(SyncOperationResult(
+                        client_op_id=record.client_op_id,
+                        status=record.status.value,
+                        transaction_id=record.transaction_id,
+                        error=record.error,
+                        duplicate=duplicate
+                    ))
+                self._commit_postings(db, *postings)
+            except IntegrityError:
+                db.rollback()
+                raise SyncConflictError("Operations were uploaded concurrently; retry the sync")
+            except Exception:
+                db.rollback()
+                raise
+
+        # now() is the start of this read transaction; the overlap on the next
+        # sync covers postings that committed after it but started earlier
+        synced_at = db.scalar(select(func.now()))
+        if since is not None:
+            since = since - timedelta(seconds=settings.SYNC_DELTA_OVERLAP_SECONDS)
+        changed = self.sync_repo.get_changed_wallets(
+            db, store_id, since, self.authorization.get_store_group_id(db, store_id)
+        )
+        response = SyncResponse(
+            results=results,
+            wallets=[
+                WalletBalanceDelta(
+                    wallet_id=row.id,
+                    balance=row.balance,
+                    bonus_balance=row.bonus_balance,
+                    status=row.status.value
+                )
+                for row in changed
+            ],
+            sync_token=self._encode_sync_token(synced_at)
+        )
+        return response, [transaction for _, transaction in postings]
+
+    def _encode_sync_token(self, synced_at: datetime) -> str:
+        return base64.urlsafe_b64encode(synced_at.isoformat().encode()).decode()
+
+    def _decode_sync_token(self, sync_token: Optional[str]) -> Optional[datetime]:
+        if not sync_token:
+            return None
+        try:
+            return datetime.fromisoformat(base64.urlsafe_b64decode(sync_token.encode()).decode())
+        except ValueError:
+            raise ValueError("Invalid sync token")
+
+    def _commit_postings(self, db: Session, *postings: Tuple[Wallet, Transaction]) -> None:
+        """Commit posted rows, then publish the new balances to subscribers"""
+        # Flush first so ids are assigned; commit expires attributes and would reload them
+        db.flush()
+        events = [
+            {
+                "wallet_id": str(wallet.id),
+                "balance": str(wallet.balance),
+                "bonus_balance": str(wallet.bonus_balance),
+                "transaction_id": str(transaction.id),
+                "transaction_type": transaction.type.value,
+                "amount": str(transaction.amount),
+                "created_at": transaction.created_at.isoformat()
+            }
+            for wallet, transaction in postings
+        ]
+        db.commit()
+        for event in events:
+            event_broker.publish(event)
+
+    def _same_store_or_chain(self, db: Session, first: Wallet, second: Wallet) -> bool:
+        """Wallets of one store, or of one chain, counting store wallets opened before their store joined it"""
+        if first.store_id == second.store_id:
+            return True
+        first_group = first.store_group_id or self.authorization.get_store_group_id(db, first.store_id)
+        second_group = second.store_group_id or self.authorization.get_store_group_id(db, second.store_id)
+        return first_group is not None and first_group == second_group
+
+    def _posting_store_id(self, db: Session, user_id: UUID, wallet_id: UUID) -> Optional[UUID]:
+        """Store a posting is made at when the caller didn't say
+
+        The store the user manages for this wallet (a chain store for a chain
+        wallet), else the wallet's own store.
+        """
+        return (
+            self.authorization.get_acting_store_id(db, user_id, wallet_id)
+            or self.authorization.get_wallet_store_id(db, wallet_id)
+        )
+
+    def _lock_active_wallet(self, db: Session, wallet_id: UUID) -> Wallet:
+        """Lock wallet row for the current transaction, rejecting missing or inactive wallets"""
+        wallet = self.wallet_repo.get_for_update(db, wallet_id)
         if not wallet or wallet.status != WalletStatus.ACTIVE:
+            db.rollback()
             raise WalletNotFoundError("Wallet not found or inactive")
+        return wallet
 
+    def _post_charge(
+            self,
+            db: Session,
+            wallet: Wallet,
+            store_id: UUID,
+            amount: Decimal,
+            method: TransactionMethod,
+            created_by: UUID,
+            description: Optional[str]
+    ) -> Transaction:
+        """Apply a charge to a locked wallet; caller commits"""
         # Calculate bonus (5% default)
         bonus_amount = amount * Decimal("0.05")
-        new_balance = wallet.balance + amount
-        new_bonus_balance = wallet.bonus_balance + bonus_amount
-
-        # Update wallet
-        self.wallet_repo.update(db, db_obj=wallet, obj_in={
-            "balance": new_balance,
-            "bonus_balance": new_bonus_balance
-        })
+        wallet.balance = wallet.balance + amount
+        wallet.bonus_balance = wallet.bonus_balance + bonus_amount
 
         # Create main transaction
         transaction_data = {
             "type": TransactionType.CHARGE,
             "method": method,
-            "wallet_id": wallet_id,
+            "wallet_id": wallet.id,
+            "store_id": store_id,
             "amount": amount,
-            "balance_after_transaction": new_balance + new_bonus_balance,
+            "balance_after_transaction": wallet.balance + wallet.bonus_balance,
             "description": description,
             "created_by": created_by
         }
-        transaction = self.transaction_repo.create(db, obj_in=transaction_data)
+        transaction = Transaction(**transaction_data)
+        db.add(transaction)
 
         # Create bonus transaction if bonus > 0
         if bonus_amount > 0:
             bonus_transaction_data = {
+                "id": uuid.uuid4(),
                 "type": TransactionType.BONUS_EARNED,
                 "method": method,
-                "wallet_id": wallet_id,
+                "wallet_id": wallet.id,
+                "store_id": store_id,
                 "amount": bonus_amount,
-                "balance_after_transaction": new_balance + new_bonus_balance,
+                "balance_after_transaction": wallet.balance + wallet.bonus_balance,
                 "description": f"5% bonus for {amount} charge",
                 "created_by": created_by,
-                "reference_transaction_id": transaction.id
+                "reference_transaction": transaction
             }
-            self.transaction_repo.create(db, obj_in=bonus_transaction_data)
+            bonus_transaction = Transaction(**bonus_transaction_data)
+            db.add(bonus_transaction)
+            self._grant_bonus_lot(db, wallet, bonus_amount, bonus_transaction)
 
         return transaction
 
-    def spend_from_wallet(
+    def _post_spend(
             self,
             db: Session,
-            wallet_id: UUID,
+            wallet: Wallet,
+            store_id: UUID,
             amount: Decimal,
             method: TransactionMethod,
             created_by: UUID,
-            description: Optional[str] = None
+            description: Optional[str]
     ) -> Transaction:
-        """Spend money from wallet (use bonus first, then regular balance)"""
-        wallet = self.wallet_repo.get(db, wallet_id)
-        if not wallet or wallet.status != WalletStatus.ACTIVE:
-            raise WalletNotFoundError("Wallet not found or inactive")
-
+        """Apply a spend to a locked wallet; caller commits"""
         total_available = wallet.balance + wallet.bonus_balance
         if total_available < amount:
             raise InsufficientFundsError(f"Insufficient funds. Available: {total_available}, Required: {amount}")
 
-        # Use bonus balance first
-        remaining_amount = amount
-        bonus_used = min(wallet.bonus_balance, remaining_amount)
-        remaining_amount -= bonus_used
-        regular_used = remaining_amount
-
-        new_bonus_balance = wallet.bonus_balance - bonus_used
-        new_balance = wallet.balance - regular_used
-
-        # Update wallet
-        self.wallet_repo.update(db, db_obj=wallet, obj_in={
-            "balance": new_balance,
-            "bonus_balance": new_bonus_balance
-        })
+        # Use bonus balance first, oldest lots first
+        bonus_used = min(wallet.bonus_balance, amount)
+        regular_used = amount - bonus_used
+        wallet.bonus_balance = wallet.bonus_balance - bonus_used
+        wallet.balance = wallet.balance - regular_used
+        if bonus_used > 0:
+            self._consume_bonus_lots(db, wallet, bonus_used)
 
-        # Create transaction
         transaction_data = {
             "type": TransactionType.SPEND,
             "method": method,
-            "wallet_id": wallet_id,
+            "wallet_id": wallet.id,
+            "store_id": store_id,
             "amount": amount,
-            "balance_after_transaction": new_balance + new_bonus_balance,
+            "bonus_amount": bonus_used,
+            "balance_after_transaction": wallet.balance + wallet.bonus_balance,
             "description": description,
             "created_by": created_by
         }
-        return self.transaction_repo.create(db, obj_in=transaction_data)
+        transaction = Transaction(**transaction_data)
+        db.add(transaction)
+        return transaction
+
+    def _grant_bonus_lot(self, db: Session, wallet: Wallet, amount: Decimal, source: Transaction) -> BonusLot:
+        """Open a bonus lot for bonus credited by `source`; caller commits"""
+        # Python clock rather than now(): lots granted in one database transaction
+        # (e.g. a POS batch) still need distinct, ordered times for FIFO
+        granted_at = datetime.now(timezone.utc)
+        expires_at = None
+        if settings.BONUS_LOT_EXPIRY_DAYS is not None:
+            expires_at = granted_at + timedelta(days=settings.BONUS_LOT_EXPIRY_DAYS)
+        lot = BonusLot(
+            created_at=granted_at,
+            wallet_id=wallet.id,
+            source_transaction_id=source.id,
+            amount=amount,
+            remaining_amount=amount,
+            expires_at=expires_at
+        )
+        db.add(lot)
+        return lot
+
+    def _consume_bonus_lots(self, db: Session, wallet: Wallet, amount: Decimal) -> None:
+        """Take `amount` of bonus from the wallet's open lots, oldest first; caller commits
+
+        Whatever the lots cannot cover came from untracked (pre-lot) bonus.
+        """
+        # Lots opened earlier in this transaction (e.g. a synced charge) must be visible
+        db.flush()
+        for lot in self.bonus_repo.get_open_lots(db, wallet.id):
+            if amount <= 0:
+                break
+            taken = min(lot.remaining_amount, amount)
+            lot.remaining_amount = lot.remaining_amount - taken
+            amount -= taken
+
+    def get_wallet_members(self, db: Session, wallet_id: UUID, user_id: UUID) -> List[WalletMember]:
+        """Get members of a wallet the user can access"""
+        self.get_wallet_with_access_check(db, wallet_id, user_id)
+        return self.member_repo.get_wallet_members(db, wallet_id)
+
+    def add_wallet_member(self, db: Session, wallet_id: UUID, owner_id: UUID, phone_number: str) -> WalletMember:
+        """Share wallet with another user (wallet owner only)"""
+        wallet = self.wallet_repo.get(db, wallet_id)
+        if not wallet or wallet.status != WalletStatus.ACTIVE:
+            raise WalletNotFoundError("Wallet not found or inactive")
+        if wallet.owner_id != owner_id:
+            raise WalletAccessDeniedError("Only the wallet owner can add members")
+
+        user = self.user_repo.get_by_phone(db, phone_number)
+        if not user:
+            raise UserNotFoundError("No user with this phone number")
+        if user.id == wallet.owner_id:
+            raise ValueError("Wallet owner cannot be added as a member")
+
+        member = self.member_repo.get_member(db, wallet.id, user.id)
+        if member:
+            return member
+
+        member = WalletMember(wallet_id=wallet.id, user_id=user.id, role=WalletMemberRole.MEMBER)
+        db.add(member)
+        wallet.is_shared = True
+        db.commit()
+        db.refresh(member)
+
+        self.authorization.invalidate_user(user.id)
+        return member
+
+    def remove_wallet_member(self, db: Session, wallet_id: UUID, member_user_id: UUID, user_id: UUID) -> None:
+        """Remove member from wallet (wallet owner, or the member leaving)"""
+        wallet = self.wallet_repo.get(db, wallet_id)
+        if not wallet:
+            raise WalletNotFoundError("Wallet not found")
+        if user_id not in (wallet.owner_id, member_user_id):
+            raise WalletAccessDeniedError("Only the wallet owner can remove other members")
+
+        member = self.member_repo.get_member(db, wallet.id, member_user_id)
+        if not member:
+            raise UserNotFoundError("Member not found")
+
+        db.delete(member)
+        db.flush()
+        if not self.member_repo.get_wallet_members(db, wallet.id):
+            wallet.is_shared = False
+        db.commit()
+
+        self.authorization.invalidate_user(member_user_id)
+
+    def can_user_manage_wallet(self, db: Session, user_id: UUID, wallet_id: UUID) -> bool:
+        """Check if user manages the wallet's store or a store of its chain"""
+        return self.authorization.can_user_manage_wallet(db, user_id, wallet_id)
+
+    def can_user_spend_from_wallet(self, db: Session, user_id: UUID, wallet_id: UUID) -> bool:
+        """Check if user owns, shares or manages the wallet"""
+        return self.authorization.can_user_spend_from_wallet(db, user_id, wallet_id)
+
+    def get_subscribable_wallet_ids(
+            self,
+            db: Session,
+            user_id: UUID,
+            wallet_ids: Optional[List[UUID]] = None
+    ) -> List[UUID]:
+        """Filter requested wallets to those the user may watch (default: owned and shared wallets)"""
+        if not wallet_ids:
+            access = self.authorization.get_access_map(db, user_id)
+            return list(access.owned_wallet_ids | access.member_wallet_ids)
+        return [
+            wallet_id for wallet_id in wallet_ids
+            if self.authorization.can_user_spend_from_wallet(db, user_id, wallet_id)
+        ]
+
+    def get_wallet_etag(self, db: Session, wallet_id: UUID, user_id: UUID) -> str:
+        """ETag of a wallet the user can access, from its version counter alone"""
+        if not self.authorization.can_user_spend_from_wallet(db, user_id, wallet_id):
+            raise WalletNotFoundError("Wallet not found")
+        version = self.wallet_repo.get_version(db, wallet_id)
+        if version is None:
+            raise WalletNotFoundError("Wallet not found")
+        return make_etag("wallet", wallet_id, version)
+
+    def get_user_wallets_etag(self, db: Session, user_id: UUID) -> str:
+        """ETag of the user's wallet list; changes when any wallet changes or one is added"""
+        return make_etag("wallets", user_id, *(
+            f"{wallet_id}.{version}" for wallet_id, version in self.wallet_repo.get_user_wallet_versions(db, user_id)
+        ))
+
+    def get_wallet_with_access_check(self, db: Session, wallet_id: UUID, user_id: UUID) -> Wallet:
+        """Get wallet if user owns, shares or manages it"""
+        wallet = self.wallet_repo.get(db, wallet_id)
+        if not wallet:
+            raise WalletNotFoundError("Wallet not found")
+        self.authorization.remember_wallet_store(wallet.id, wallet.store_id, wallet.store_group_id)
+        if not self.authorization.can_user_spend_from_wallet(db, user_id, wallet.id):
+            raise WalletNotFoundError("Wallet not found")
+        return wallet
+
+    def search_store_wallets(
+            self,
+            db: Session,
+            store_id: UUID,
+            q: Optional[str] = None,
+            by: str = "phone",
+            cursor: Optional[UUID] = None,
+            limit: int = 20
+    ) -> Tuple[List[Wallet], Optional[UUID]]:
+        """Find active wallets usable at store (chain wallets included) by owner phone, name or nickname
+
+        Returns (wallets, next cursor); the cursor is None on the last page.
+        """
+        filters = {}
+        if q:
+            q = q.strip()
+            if by == "phone":
+                digits = phone_search_digits(q)
+                if len(digits) < 4:
+                    raise ValueError("Phone search needs at least 4 digits")
+                filters["phone_suffix"] = digits
+            elif by == "name":
+                filters["name_prefix"] = q
+            elif by == "nickname":
+                if len(q) < 2:
+                    raise ValueError("Nickname search needs at least 2 characters")
+                filters["nickname"] = q
+            else:
+                raise ValueError("Search field must be phone, name or nickname")
+
+        # Fetch one extra row to know whether another page exists
+        wallets = self.wallet_repo.get_store_wallets(
+            db, store_id, self.authorization.get_store_group_id(db, store_id), after=cursor, limit=limit + 1, **filters
+        )
+        if len(wallets) > limit:
+            return wallets[:limit], wallets[limit - 1].id
+        return wallets, None
 
     def get_user_wallets(self, db: Session, user_id: UUID) -> List[Wallet]:
         """Get all wallets for a user"""
         return self.wallet_repo.get_user_wallets(db, user_id)
 
-    def get_wallet_transactions(self, db: Session, wallet_id: UUID, skip: int = 0, limit: int = 50) -> List[
-        Transaction]:
+    def get_user_balances(self, db: Session, user_id: UUID) -> List[WalletBalanceTotal]:
+        """Get user's active balances summed per chain, or per store outside chains"""
+        return [
+            WalletBalanceTotal(
+                store_group_id=row.store_group_id,
+                store_id=row.store_id,
+                wallet_count=row.wallet_count,
+                balance=row.balance,
+                bonus_balance=row.bonus_balance
+            )
+            for row in self.wallet_repo.get_user_balance_totals(db, user_id)
+        ]
+
+    def process_qr_payment(self, db: Session, qr_code: str, amount: Decimal, user_id: UUID) -> Transaction:
+        """Pay at the store behind a payment QR code from the user's wallet there
+
+        The QR code and the store's chain resolve from process caches, so the
+        only queries are the wallet lookup and the spend itself.
+        """
+        store_id = self.authorization.get_qr_store_id(db, qr_code)
+        if store_id is None:
+            raise WalletNotFoundError("Store not found")
+        store_group_id = self.authorization.get_store_group_id(db, store_id)
+        wallet = self.wallet_repo.get_user_payment_wallet(db, user_id, store_id, store_group_id, amount)
+        if not wallet:
+            raise WalletNotFoundError("Wallet not found")
+        # Read without a lock; spend_from_wallet reloads it under the row lock
+        return self.spend_from_wallet(
+            db, wallet.id, amount, TransactionMethod.QR, user_id, "QR payment", store_id=store_id
+        )
+
+    def get_wallet_transactions(
+            self,
+            db: Session,
+            wallet_id: UUID,
+            skip: int = 0,
+            limit: int = 50,
+            before: Optional[datetime] = None
+    ) -> List[Transaction]:
         """Get transaction history for a wallet"""
-        return self.transaction_repo.get_wallet_transactions(db, wallet_id, skip, limit)
+        return self.transaction_repo.get_wallet_transactions(db, wallet_id, skip, limit, before)
@@ -0,0 +1,96 @@
+# tests/conftest.py
+"""
+In-process test harness.
+
+The whole API runs in this process against in-memory SQLite by default, or
+against a throwaway Postgres database when TEST_DATABASE_URL is set (its
+tables are created on start and emptied before every test):
+
+    python -m pytest
+    TEST_DATABASE_URL=postgresql+psycopg://localhost/storecredit_test python -m pytest
+
+The repository root is the `app` package, so it is registered under that
+name before anything imports it.
+"""
+import os
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if "app" not in sys.modules:
+    _package = types.ModuleType("app")
+    _package.__path__ = [str(ROOT)]
+    sys.modules["app"] = _package
+
+# Settings are read at import time, so these must be set before importing app.*
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+for _name, _value in {
+    "SECRET_KEY": "test-secret-key",
+    "DEBUG": "false",
+    "RATE_LIMIT_ENABLED": "false",
+    "PARTITION_MAINTENANCE_INTERVAL_SECONDS": "0",
+    "ANALYTICS_ROLLUP_INTERVAL_SECONDS": "0",
+    "STATEMENT_JOB_INTERVAL_SECONDS": "0",
+    "BONUS_EXPIRY_INTERVAL_SECONDS": "0",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.risk import risk_engine, LocalRiskStore
+from app.core.config import settings
+from app.services import authorization_service, store_service
+
+from factories import Factory
+
+
+def _clear_process_caches() -> None:
+    """Forget what earlier tests left in module-level caches"""
+    for cache in (
+            authorization_service._access_cache,
+            authorization_service._wallet_store_cache,
+            authorization_service._store_group_cache,
+            authorization_service._qr_store_cache,
+            store_service._store_cache,
+            store_service._managed_cache,
+            store_service._store_etag_cache,
+    ):
+        cache.clear()
+    if isinstance(risk_engine.store, LocalRiskStore):
+        risk_engine.store = LocalRiskStore(settings.RISK_MAX_SUBJECTS)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+
+    # Entering the client runs the lifespan: tables, partitions, event broker
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def clean_database(client):
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    _clear_process_caches()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def factory(db):
+    return Factory(db)
@@ -0,0 +1,88 @@
+# tests/factories.py
+"""
+Deterministic factories for the harness.
+
+Each test gets its own Factory, so generated names and phone numbers depend
+only on the order of calls within that test.
+"""
+import itertools
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.store import Store, StoreGroup, StoreLocation, StoreManager, StoreManagerRole, StoreCategory
+from app.models.wallet import Wallet, WalletMember, WalletStatus
+from app.services.auth_service import AuthService
+
+_auth = AuthService()
+
+
+class Factory:
+    def __init__(self, db: Session):
+        self.db = db
+        self._sequence = itertools.count(1)
+
+    def _next(self) -> int:
+        return next(self._sequence)
+
+    def user(self, name: Optional[str] = None, is_verified: bool = True) -> User:
+        n = self._next()
+        user = User(name=name or f"User {n}", phone_number=f"+8210{n:08d}", is_verified=is_verified)
+        self.db.add(user)
+        self.db.commit()
+        return user
+
+    def store_group(self, name: Optional[str] = None) -> StoreGroup:
+        group = StoreGroup(name=name or f"Chain {self._next()}")
+        self.db.add(group)
+        self.db.commit()
+        return group
+
+    def store(
+            self,
+            manager: Optional[User] = None,
+            name: Optional[str] = None,
+            category: StoreCategory = StoreCategory.CAFE,
+            latitude: str = "37.56650000",
+            longitude: str = "126.97800000",
+            store_group: Optional[StoreGroup] = None
+    ) -> Store:
+        n = self._next()
+        store = Store(
+            name=name or f"Store {n}", category=category, store_group_id=store_group.id if store_group else None
+        )
+        store.location = StoreLocation(
+            address=f"{n} Teheran-ro, Seoul", latitude=Decimal(latitude), longitude=Decimal(longitude)
+        )
+        self.db.add(store)
+        if manager is not None:
+            self.db.add(StoreManager(store=store, user_id=manager.id, role=StoreManagerRole.OWNER))
+        self.db.commit()
+        return store
+
+    def wallet(
+            self,
+            owner: User,
+            store: Store,
+            balance: str = "0.00",
+            bonus_balance: str = "0.00",
+            is_shared: bool = False
+    ) -> Wallet:
+        wallet = Wallet(
+            owner_id=owner.id, store_id=store.id, status=WalletStatus.ACTIVE, is_shared=is_shared,
+            balance=Decimal(balance), bonus_balance=Decimal(bonus_balance)
+        )
+        self.db.add(wallet)
+        self.db.commit()
+        return wallet
+
+    def member(self, wallet: Wallet, user: User) -> WalletMember:
+        member = WalletMember(wallet_id=wallet.id, user_id=user.id)
+        self.db.add(member)
+        self.db.commit()
+        return member
+
+    def headers(self, user: User) -> dict:
+        return {"Authorization": f"Bearer {_auth.create_access_token(user.id)}"}
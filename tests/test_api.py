@@ -0,0 +1,186 @@
+# tests/test_api.py
+import asyncio
+
+import httpx
+
+from app.api.middleware import LoadSheddingMiddleware
+from app.core.config import settings
+from app.core.rate_limit import ConcurrencyLimiter
+
+
+def test_verify_phone_creates_user_and_token(client):
+    response = client.post(
+        "/api/v1/auth/verify-phone", json={"phone_number": "010-1234-5678", "verification_code": "123456"}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["access_token"]
+
+
+def test_update_profile(client, factory):
+    user = factory.user()
+
+    response = client.patch(
+        "/api/v1/users/profile", json={"name": "Jin", "gender": "FEMALE"}, headers=factory.headers(user)
+    )
+
+    assert response.status_code == 200, response.text
+    assert (response.json()["name"], response.json()["gender"]) == ("Jin", "FEMALE")
+
+
+def test_create_store_then_find_it_nearby(client, factory):
+    owner = factory.user()
+    created = client.post("/api/v1/stores/", json={
+        "name": "Jin's Cafe", "category": "CAFE",
+        "location": {"address": "123 Teheran-ro, Seoul", "latitude": "37.5665", "longitude": "126.9780"}
+    }, headers=factory.headers(owner))
+    factory.store(name="Busan Cafe", latitude="35.17960000", longitude="129.07560000")
+
+    nearby = client.get("/api/v1/stores/nearby", params={"latitude": "37.57", "longitude": "126.98", "radius_km": 5})
+
+    assert created.status_code == 200, created.text
+    assert [store["name"] for store in nearby.json()] == ["Jin's Cafe"]
+
+
+def test_store_etag_returns_not_modified(client, factory):
+    store = factory.store()
+
+    first = client.get(f"/api/v1/stores/{store.id}")
+    second = client.get(f"/api/v1/stores/{store.id}", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+
+
+def test_store_qr_code_is_stable(client, factory):
+    manager = factory.user()
+    store = factory.store(manager=manager)
+
+    first = client.get(f"/api/v1/stores/{store.id}/qr", headers=factory.headers(manager))
+    second = client.get(f"/api/v1/stores/{store.id}/qr", headers=factory.headers(manager))
+
+    assert first.status_code == 200, first.text
+    assert first.json()["qr_code"] == second.json()["qr_code"]
+
+
+def test_rapid_spends_hit_velocity_limit(client, factory):
+    owner = factory.user()
+    wallet = factory.wallet(owner, factory.store(), balance="1000.00")
+    limit = settings.RISK_WALLET_SPENDS_PER_MINUTE
+
+    statuses = [
+        client.post(
+            "/api/v1/transactions/spend", params={"wallet_id": str(wallet.id)},
+            json={"type": "SPEND", "method": "CASH", "amount": "1.00"}, headers=factory.headers(owner)
+        ).status_code
+        for _ in range(limit + 1)
+    ]
+
+    assert statuses == [200] * limit + [429]
+
+
+def test_rapid_transfers_hit_velocity_limit(client, factory):
+    owner = factory.user()
+    store = factory.store()
+    wallet = factory.wallet(owner, store, balance="1000.00")
+    other = factory.wallet(factory.user(), store)
+    limit = settings.RISK_WALLET_SPENDS_PER_MINUTE
+
+    statuses = [
+        client.post(
+            "/api/v1/transactions/transfer", params={"wallet_id": str(wallet.id)},
+            json={"to_wallet_id": str(other.id), "amount": "1.00"}, headers=factory.headers(owner)
+        ).status_code
+        for _ in range(limit + 1)
+    ]
+
+    assert statuses == [200] * limit + [429]
+
+
+async def _open_event_stream(app, headers, opened):
+    """Start the event stream; returns (task, event that disconnects it) and sets `opened` once headers are sent"""
+    disconnected = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            opened.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/v1/wallets/events", "raw_path": b"/api/v1/wallets/events", "query_string": b"",
+        "root_path": "", "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80)
+    }
+    return asyncio.create_task(app(scope, receive, send)), disconnected
+
+
+def test_open_event_stream_does_not_take_a_concurrency_slot(client, factory, monkeypatch):
+    owner = factory.user()
+    factory.wallet(owner, factory.store())
+    headers = factory.headers(owner)
+    shedder = client.app.middleware_stack
+    while not isinstance(shedder, LoadSheddingMiddleware):
+        shedder = shedder.app
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(shedder, "concurrency", ConcurrencyLimiter(1, 0, 0.1))
+
+    async def run():
+        opened = asyncio.Event()
+        stream, disconnected = await _open_event_stream(client.app, headers, opened)
+        await asyncio.wait_for(opened.wait(), 5)
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=client.app), base_url="http://test") as api:
+                return (await api.get("/api/v1/wallets/", headers=headers)).status_code
+        finally:
+            disconnected.set()
+            await asyncio.wait_for(stream, 5)
+
+    assert client.portal.call(run) == 200
+
+
+def test_event_stream_headers_are_not_held_back_by_compression(client, factory):
+    owner = factory.user()
+    factory.wallet(owner, factory.store())
+    headers = {**factory.headers(owner), "Accept-Encoding": "gzip, br"}
+
+    async def run():
+        opened = asyncio.Event()
+        stream, disconnected = await _open_event_stream(client.app, headers, opened)
+        try:
+            # Well before the first keepalive
+            await asyncio.wait_for(opened.wait(), 2)
+        finally:
+            disconnected.set()
+            await asyncio.wait_for(stream, 5)
+
+    client.portal.call(run)
+
+
+def test_refused_spends_do_not_count_toward_velocity_limit(client, factory):
+    owner = factory.user()
+    wallet = factory.wallet(owner, factory.store(), balance="1.00")
+    params, headers = {"wallet_id": str(wallet.id)}, factory.headers(owner)
+
+    refused = [
+        client.post(
+            "/api/v1/transactions/spend", params=params,
+            json={"type": "SPEND", "method": "CASH", "amount": "5.00"}, headers=headers
+        ).status_code
+        for _ in range(settings.RISK_WALLET_SPENDS_PER_MINUTE)
+    ]
+    spent = client.post(
+        "/api/v1/transactions/spend", params=params,
+        json={"type": "SPEND", "method": "CASH", "amount": "1.00"}, headers=headers
+    )
+
+    assert set(refused) == {400}
+    assert spent.status_code == 200, spent.text
@@ -0,0 +1,231 @@
+# tests/test_ledger_stress.py
+"""
+Concurrency stress tests for the posting engine.
+
+Thousands of charges, spends and transfers run concurrently, from a thread
+pool straight into WalletService and from asyncio through the HTTP API.
+The tests then check the ledger invariants:
+
+- each wallet's balance and bonus_balance equal the sum of its postings
+- no balance is ever negative
+- no update is lost: balances match what the successful calls add up to
+- open bonus lots add up to the bonus balance
+
+Row locks only mean something on Postgres, so these are skipped on SQLite:
+
+    TEST_DATABASE_URL=postgresql+psycopg://localhost/storecredit_test \
+        STRESS_OPERATIONS=5000 STRESS_WORKERS=32 python -m pytest -s tests/test_ledger_stress.py
+
+Throughput is printed with -s and serves as the posting engine's baseline.
+"""
+import asyncio
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal, engine
+from app.core.exceptions import InsufficientFundsError
+from app.core.risk import risk_engine
+from app.models.wallet import BonusLot, Transaction, TransactionMethod, TransactionType, Wallet
+from app.repositories.statement_repository import _BONUS_DELTA, _REGULAR_DELTA
+from app.services.wallet_service import WalletService
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="needs TEST_DATABASE_URL pointing at Postgres"
+)
+
+OPERATIONS = int(os.environ.get("STRESS_OPERATIONS", "2000"))
+WORKERS = int(os.environ.get("STRESS_WORKERS", "32"))
+BONUS_RATE = Decimal("0.05")
+OPENING_CHARGE = Decimal("1000.00")
+
+wallet_service = WalletService()
+
+
+@pytest.fixture(autouse=True)
+def no_velocity_limits(monkeypatch):
+    # Thousands of spends a minute from one user is exactly what the risk rules stop
+    monkeypatch.setattr(risk_engine, "rules", [])
+
+
+def _report(name: str, operations: int, seconds: float, outcomes: Counter) -> None:
+    print(f"\n{name}: {operations} ops in {seconds:.2f}s = {operations / seconds:,.0f} ops/s  {dict(outcomes)}")
+
+
+def _run_in_session(operation):
+    db = SessionLocal()
+    try:
+        return operation(db)
+    finally:
+        db.close()
+
+
+def _assert_ledger_invariants(db, wallet_ids):
+    db.expire_all()
+    totals = {
+        wallet_id: (regular, bonus)
+        for wallet_id, regular, bonus in db.execute(
+            select(Transaction.wallet_id, func.sum(_REGULAR_DELTA), func.sum(_BONUS_DELTA))
+            .where(Transaction.wallet_id.in_(wallet_ids)).group_by(Transaction.wallet_id)
+        )
+    }
+    open_lots = dict(db.execute(
+        select(BonusLot.wallet_id, func.sum(BonusLot.remaining_amount))
+        .where(BonusLot.wallet_id.in_(wallet_ids)).group_by(BonusLot.wallet_id)
+    ).all())
+    for wallet in db.query(Wallet).filter(Wallet.id.in_(wallet_ids)):
+        regular, bonus = totals.get(wallet.id, (Decimal(0), Decimal(0)))
+        assert wallet.balance == regular, f"wallet {wallet.id}: balance drifted from its postings"
+        assert wallet.bonus_balance == bonus, f"wallet {wallet.id}: bonus_balance drifted from its postings"
+        assert wallet.balance >= 0 and wallet.bonus_balance >= 0, f"wallet {wallet.id} overdrawn"
+        assert open_lots.get(wallet.id, Decimal(0)) == wallet.bonus_balance, f"wallet {wallet.id}: lots out of step"
+
+
+def _funded_wallets(db, factory, count):
+    manager = factory.user()
+    store = factory.store(manager=manager)
+    members = [factory.user() for _ in range(4)]
+    wallets = []
+    for i in range(count):
+        wallet = factory.wallet(factory.user(), store, is_shared=True)
+        factory.member(wallet, members[i % len(members)])
+        wallet_service.charge_wallet(db, wallet.id, OPENING_CHARGE, TransactionMethod.CASH, manager.id)
+        wallets.append(wallet.id)
+    return manager, members, wallets
+
+
+def test_threaded_charges_spends_and_transfers_keep_the_ledger_consistent(db, factory):
+    manager, members, wallet_ids = _funded_wallets(db, factory, 8)
+    rng = random.Random(48)
+    plan = []
+    for _ in range(OPERATIONS):
+        kind = rng.choices(("charge", "spend", "transfer"), weights=(3, 6, 1))[0]
+        source, target = rng.sample(wallet_ids, 2)
+        plan.append((kind, source, target, Decimal(rng.randint(1, 200))))
+
+    def execute(step):
+        kind, source, target, amount = step
+
+        def operation(session):
+            if kind == "charge":
+                wallet_service.charge_wallet(session, source, amount, TransactionMethod.CASH, manager.id)
+            elif kind == "spend":
+                wallet_service.spend_from_wallet(session, source, amount, TransactionMethod.CASH, members[0].id)
+            else:
+                wallet_service.transfer_credit(session, source, target, amount, members[0].id)
+        try:
+            _run_in_session(operation)
+            return step, "ok"
+        except InsufficientFundsError:
+            return step, "insufficient"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(execute, plan))
+    elapsed = time.perf_counter() - started
+
+    outcomes = Counter(f"{step[0]}:{outcome}" for step, outcome in results)
+    _report("threads", len(plan), elapsed, outcomes)
+
+    expected = defaultdict(lambda: OPENING_CHARGE * (1 + BONUS_RATE))
+    for (kind, source, target, amount), outcome in results:
+        if outcome != "ok":
+            continue
+        if kind == "charge":
+            expected[source] += amount * (1 + BONUS_RATE)
+        elif kind == "spend":
+            expected[source] -= amount
+        else:
+            expected[source] -= amount
+            expected[target] += amount
+    db.expire_all()
+    for wallet in db.query(Wallet).filter(Wallet.id.in_(wallet_ids)):
+        assert wallet.balance + wallet.bonus_balance == expected[wallet.id], f"wallet {wallet.id} lost an update"
+    spends = db.query(Transaction).filter(
+        Transaction.type == TransactionType.SPEND, Transaction.wallet_id.in_(wallet_ids)
+    ).count()
+    assert spends == outcomes["spend:ok"]
+    _assert_ledger_invariants(db, wallet_ids)
+
+
+def test_contended_spends_never_overdraw_a_shared_wallet(db, factory):
+    manager, members, (wallet_id,) = _funded_wallets(db, factory, 1)
+    available = OPENING_CHARGE * (1 + BONUS_RATE)
+    # Twice as many one-unit spends as the wallet can cover, all on one row lock
+    attempts = int(available) * 2
+
+    def spend(index):
+        member = members[index % len(members)]
+        try:
+            _run_in_session(lambda session: wallet_service.spend_from_wallet(
+                session, wallet_id, Decimal("1.00"), TransactionMethod.CASH, member.id
+            ))
+            return "ok"
+        except InsufficientFundsError:
+            return "insufficient"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        outcomes = Counter(pool.map(spend, range(attempts)))
+    _report("hot wallet", attempts, time.perf_counter() - started, outcomes)
+
+    assert outcomes["ok"] == int(available)
+    wallet = db.get(Wallet, wallet_id)
+    db.refresh(wallet)
+    assert wallet.balance + wallet.bonus_balance == available - int(available)
+    _assert_ledger_invariants(db, [wallet_id])
+
+
+def test_async_api_postings_keep_the_ledger_consistent(client, db, factory):
+    manager, members, wallet_ids = _funded_wallets(db, factory, 8)
+    rng = random.Random(4848)
+    plan = [
+        (rng.choice(("charge", "spend", "spend")), rng.choice(wallet_ids), Decimal(rng.randint(1, 200)))
+        for _ in range(OPERATIONS)
+    ]
+    manager_headers = factory.headers(manager)
+    member_headers = {member.id: factory.headers(member) for member in members}
+    member_of = {}
+    for i, wallet_id in enumerate(wallet_ids):
+        member_of[wallet_id] = member_headers[members[i % len(members)].id]
+
+    async def run():
+        limit = asyncio.Semaphore(WORKERS)
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            async def post(kind, wallet_id, amount):
+                async with limit:
+                    response = await api.post(
+                        f"/api/v1/transactions/{kind}", params={"wallet_id": str(wallet_id)},
+                        json={"type": kind.upper(), "method": "CASH", "amount": str(amount)},
+                        headers=manager_headers if kind == "charge" else member_of[wallet_id]
+                    )
+                return kind, wallet_id, amount, response.status_code
+            return await asyncio.gather(*(post(*step) for step in plan))
+
+    started = time.perf_counter()
+    # On the client's own event loop, which the app's limiter and event broker are bound to
+    results = client.portal.call(run)
+    elapsed = time.perf_counter() - started
+
+    outcomes = Counter(f"{kind}:{status}" for kind, _, _, status in results)
+    _report("asyncio api", len(plan), elapsed, outcomes)
+    # 400 is a refused spend (insufficient funds); anything else is a failure
+    assert {status for _, _, _, status in results} <= {200, 400}
+    assert outcomes["charge:400"] == 0
+
+    expected = defaultdict(lambda: OPENING_CHARGE * (1 + BONUS_RATE))
+    for kind, wallet_id, amount, status in results:
+        if status == 200:
+            expected[wallet_id] += amount * (1 + BONUS_RATE) if kind == "charge" else -amount
+    db.expire_all()
+    for wallet in db.query(Wallet).filter(Wallet.id.in_(wallet_ids)):
+        assert wallet.balance + wallet.bonus_balance == expected[wallet.id], f"wallet {wallet.id} lost an update"
+    _assert_ledger_invariants(db, wallet_ids)
@@ -0,0 +1,148 @@
+# tests/test_store_chains.py
+from decimal import Decimal
+
+import pytest
+
+from app.core.exceptions import WalletNotFoundError
+from app.models.wallet import TransactionMethod, Wallet, WalletStatus
+from app.services.store_service import StoreService
+from app.services.wallet_service import WalletService
+
+wallet_service = WalletService()
+store_service = StoreService()
+
+
+def _chain(factory, stores=2):
+    group = factory.store_group()
+    managers = [factory.user() for _ in range(stores)]
+    return group, managers, [factory.store(manager=manager, store_group=group) for manager in managers]
+
+
+def test_one_chain_wallet_per_customer(db, factory):
+    group, managers, (first, second) = _chain(factory)
+    customer = factory.user()
+
+    wallet = wallet_service.create_wallet(db, customer.id, first.id)
+    again = wallet_service.create_wallet(db, customer.id, second.id)
+
+    assert wallet.store_group_id == group.id
+    assert again.id == wallet.id
+    assert wallet_service.can_user_manage_wallet(db, managers[1].id, wallet.id)
+
+
+def test_store_wallet_outside_chain_stays_at_its_store(db, factory):
+    group, managers, (chain_store, _) = _chain(factory)
+    manager = factory.user()
+    store = factory.store(manager=manager)
+    customer = factory.user()
+
+    wallet = wallet_service.create_wallet(db, customer.id, store.id)
+
+    assert wallet.store_group_id is None
+    assert wallet_service.create_wallet(db, customer.id, chain_store.id).id != wallet.id
+    assert not wallet_service.can_user_manage_wallet(db, managers[0].id, wallet.id)
+
+
+def test_qr_payment_spends_chain_wallet_at_another_store(client, db, factory):
+    group, managers, (first, second) = _chain(factory)
+    customer = factory.user()
+    wallet = wallet_service.create_wallet(db, customer.id, first.id)
+    wallet_service.charge_wallet(db, wallet.id, Decimal("100.00"), TransactionMethod.CASH, managers[0].id)
+    qr_code = client.get(f"/api/v1/stores/{second.id}/qr", headers=factory.headers(managers[1])).json()["qr_code"]
+
+    response = client.post(
+        "/api/v1/transactions/qr-payment", params={"qr_code": qr_code, "amount": "30.00"},
+        headers=factory.headers(customer)
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["wallet_id"] == str(wallet.id)
+    db.expire_all()
+    assert db.get(Wallet, wallet.id).balance + db.get(Wallet, wallet.id).bonus_balance == Decimal("75.00")
+
+
+def _pay_by_qr(db, store, user, amount):
+    qr_code = store_service.get_or_create_qr_code(db, store.id).qr_code_data
+    return wallet_service.process_qr_payment(db, qr_code, Decimal(amount), user.id)
+
+
+def test_qr_payment_skips_pre_chain_wallet_that_is_closed_or_short(db, factory):
+    group, managers, (first, second) = _chain(factory)
+    closed_at, short_at = factory.user(), factory.user()
+    closed = factory.wallet(closed_at, second, balance="50.00")
+    closed.status = WalletStatus.CLOSED
+    factory.wallet(short_at, second, balance="1.00")
+    db.commit()
+    chain_wallets = {}
+    for customer in (closed_at, short_at):
+        chain_wallets[customer.id] = factory.wallet(customer, first, balance="20.00")
+        chain_wallets[customer.id].store_group_id = group.id
+    db.commit()
+
+    for customer in (closed_at, short_at):
+        assert _pay_by_qr(db, second, customer, "5.00").wallet_id == chain_wallets[customer.id].id
+
+
+def test_inactive_chain_wallet_is_usable_only_at_its_own_store(db, factory):
+    group, managers, (first, second) = _chain(factory)
+    customer = factory.user()
+    wallet = wallet_service.create_wallet(db, customer.id, first.id)
+    wallet_service.charge_wallet(db, wallet.id, Decimal("10.00"), TransactionMethod.CASH, managers[0].id)
+    group.is_active = False
+    db.commit()
+    wallet_service.authorization.invalidate_store_group(first.id)
+    wallet_service.authorization.invalidate_store_group(second.id)
+
+    assert _pay_by_qr(db, first, customer, "2.00").wallet_id == wallet.id
+    with pytest.raises(WalletNotFoundError):
+        _pay_by_qr(db, second, customer, "2.00")
+
+
+def test_chain_wallets_listed_at_every_member_store(db, factory):
+    group, managers, (first, second) = _chain(factory)
+    other = factory.store()
+    chain_wallet = wallet_service.create_wallet(db, factory.user().id, first.id)
+    factory.wallet(factory.user(), other)
+
+    at_second, _ = wallet_service.search_store_wallets(db, second.id)
+    at_other, _ = wallet_service.search_store_wallets(db, other.id)
+
+    assert [wallet.id for wallet in at_second] == [chain_wallet.id]
+    assert chain_wallet.id not in {wallet.id for wallet in at_other}
+
+
+def test_balances_are_summed_per_chain(client, factory):
+    group, managers, (first, second) = _chain(factory)
+    solo = factory.store()
+    customer = factory.user()
+    # Opened before `second` joined the chain, plus the chain wallet itself
+    factory.wallet(customer, second, balance="10.00")
+    factory.db.add(Wallet(owner_id=customer.id, store_id=first.id, store_group_id=group.id, balance=Decimal("5.00"),
+                          bonus_balance=Decimal("1.00")))
+    factory.db.commit()
+    factory.wallet(customer, solo, balance="7.00")
+
+    response = client.get("/api/v1/wallets/balances", headers=factory.headers(customer))
+
+    assert response.status_code == 200, response.text
+    totals = {
+        (row["store_group_id"], row["store_id"]): (row["wallet_count"], Decimal(row["balance"]))
+        for row in response.json()
+    }
+    assert totals == {(str(group.id), None): (2, Decimal("15.00")), (None, str(solo.id)): (1, Decimal("7.00"))}
+
+
+def test_postings_record_the_store_they_were_made_at(client, db, factory):
+    group, managers, (first, second) = _chain(factory)
+    customer = factory.user()
+    wallet = wallet_service.create_wallet(db, customer.id, first.id)
+
+    charge = client.post(
+        "/api/v1/transactions/charge", params={"wallet_id": str(wallet.id)},
+        json={"type": "CHARGE", "method": "CASH", "amount": "50.00"}, headers=factory.headers(managers[1])
+    )
+    spend = _pay_by_qr(db, first, customer, "10.00")
+
+    assert charge.status_code == 200, charge.text
+    assert charge.json()["store_id"] == str(second.id)
+    assert spend.store_id == first.id
@@ -0,0 +1,141 @@
+# tests/test_wallet_postings.py
+from decimal import Decimal
+
+from app.models.wallet import BonusLot, Transaction, TransactionType, Wallet
+
+API = "/api/v1/transactions"
+
+
+def _charge(client, factory, manager, wallet, amount):
+    return client.post(
+        f"{API}/charge", params={"wallet_id": str(wallet.id)},
+        json={"type": "CHARGE", "method": "CASH", "amount": amount}, headers=factory.headers(manager)
+    )
+
+
+def _spend(client, factory, user, wallet, amount):
+    return client.post(
+        f"{API}/spend", params={"wallet_id": str(wallet.id)},
+        json={"type": "SPEND", "method": "CASH", "amount": amount}, headers=factory.headers(user)
+    )
+
+
+def _balances(db, wallet):
+    db.expire_all()
+    wallet = db.get(Wallet, wallet.id)
+    return wallet.balance, wallet.bonus_balance
+
+
+def test_charge_credits_balance_and_opens_bonus_lot(client, db, factory):
+    manager, owner = factory.user(), factory.user()
+    store = factory.store(manager=manager)
+    wallet = factory.wallet(owner, store)
+
+    response = _charge(client, factory, manager, wallet, "100.00")
+
+    assert response.status_code == 200, response.text
+    assert _balances(db, wallet) == (Decimal("100.00"), Decimal("5.00"))
+    lots = db.query(BonusLot).filter(BonusLot.wallet_id == wallet.id).all()
+    assert [(lot.amount, lot.remaining_amount) for lot in lots] == [(Decimal("5.00"), Decimal("5.00"))]
+
+
+def test_charge_requires_store_manager(client, db, factory):
+    manager, owner = factory.user(), factory.user()
+    wallet = factory.wallet(owner, factory.store(manager=manager))
+
+    response = _charge(client, factory, owner, wallet, "100.00")
+
+    assert response.status_code in (400, 403)
+    assert _balances(db, wallet) == (Decimal("0.00"), Decimal("0.00"))
+
+
+def test_spend_uses_bonus_first(client, db, factory):
+    manager, owner = factory.user(), factory.user()
+    wallet = factory.wallet(owner, factory.store(manager=manager), balance="50.00", bonus_balance="10.00")
+
+    response = _spend(client, factory, owner, wallet, "15.00")
+
+    assert response.status_code == 200, response.text
+    assert _balances(db, wallet) == (Decimal("45.00"), Decimal("0.00"))
+    spend = db.query(Transaction).filter(Transaction.type == TransactionType.SPEND).one()
+    assert spend.bonus_amount == Decimal("10.00")
+
+
+def test_spend_rejects_insufficient_funds(client, db, factory):
+    manager, owner = factory.user(), factory.user()
+    wallet = factory.wallet(owner, factory.store(manager=manager), balance="10.00")
+
+    response = _spend(client, factory, owner, wallet, "10.01")
+
+    assert response.status_code == 400
+    assert _balances(db, wallet) == (Decimal("10.00"), Decimal("0.00"))
+    assert db.query(Transaction).count() == 0
+
+
+def test_spend_consumes_bonus_lots_oldest_first(client, db, factory):
+    manager, owner = factory.user(), factory.user()
+    wallet = factory.wallet(owner, factory.store(manager=manager))
+    _charge(client, factory, manager, wallet, "100.00")
+    _charge(client, factory, manager, wallet, "200.00")
+
+    response = _spend(client, factory, owner, wallet, "7.00")
+
+    assert response.status_code == 200, response.text
+    remaining = sorted(
+        (lot.amount, lot.remaining_amount) for lot in db.query(BonusLot).filter(BonusLot.wallet_id == wallet.id)
+    )
+    assert remaining == [(Decimal("5.00"), Decimal("0.00")), (Decimal("10.00"), Decimal("8.00"))]
+
+
+def test_full_refund_restores_both_balances(client, db, factory):
+    manager, owner = factory.user(), factory.user()
+    wallet = factory.wallet(owner, factory.store(manager=manager), balance="50.00", bonus_balance="10.00")
+    spend = _spend(client, factory, owner, wallet, "30.00").json()
+
+    response = client.post(
+        f"{API}/refund", params={"transaction_id": spend["id"]}, json={}, headers=factory.headers(manager)
+    )
+
+    assert response.status_code == 200, response.text
+    assert _balances(db, wallet) == (Decimal("50.00"), Decimal("10.00"))
+    second = client.post(
+        f"{API}/refund", params={"transaction_id": spend["id"]}, json={}, headers=factory.headers(manager)
+    )
+    assert second.status_code == 400
+
+
+def test_transfer_moves_regular_balance(client, db, factory):
+    manager, owner, friend = factory.user(), factory.user(), factory.user()
+    store = factory.store(manager=manager)
+    source = factory.wallet(owner, store, balance="40.00", bonus_balance="5.00")
+    target = factory.wallet(friend, store)
+
+    response = client.post(
+        f"{API}/transfer", params={"wallet_id": str(source.id)},
+        json={"to_wallet_id": str(target.id), "amount": "25.00"}, headers=factory.headers(owner)
+    )
+
+    assert response.status_code == 200, response.text
+    assert _balances(db, source) == (Decimal("15.00"), Decimal("5.00"))
+    assert _balances(db, target) == (Decimal("25.00"), Decimal("0.00"))
+
+
+def test_pos_sync_applies_each_operation_once(client, db, factory):
+    manager, owner = factory.user(), factory.user()
+    store = factory.store(manager=manager)
+    wallet = factory.wallet(owner, store)
+    payload = {"operations": [
+        {"client_op_id": "op-1", "client_created_at": "2026-01-05T10:00:00+09:00", "wallet_id": str(wallet.id),
+         "type": "CHARGE", "method": "CASH", "amount": "100.00"},
+        {"client_op_id": "op-2", "client_created_at": "2026-01-05T10:01:00+09:00", "wallet_id": str(wallet.id),
+         "type": "SPEND", "method": "CASH", "amount": "500.00"},
+    ]}
+    url = f"/api/v1/stores/{store.id}/terminals/pos-1/sync"
+
+    first = client.post(url, json=payload, headers=factory.headers(manager))
+    retry = client.post(url, json=payload, headers=factory.headers(manager))
+
+    assert first.status_code == 200, first.text
+    assert [r["status"] for r in first.json()["results"]] == ["APPLIED", "REJECTED"]
+    assert [r["duplicate"] for r in retry.json()["results"]] == [True, True]
+    assert _balances(db, wallet) == (Decimal("100.00"), Decimal("5.00"))
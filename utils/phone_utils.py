@@ -0,0 +1,63 @@
+# app/utils/phone_utils.py
+"""
+Korean mobile phone numbers in one canonical form.
+
+Users type 010-1234-5678, 01012345678, +82 10 1234 5678 and so on; all of them
+are stored and looked up as E.164 (+821012345678), so the unique index on
+users.phone_number matches exactly one row per person.
+"""
+import re
+from typing import Optional
+
+COUNTRY_CODE = "82"
+
+_E164_MOBILE = re.compile(r"\+8210\d{8}")
+_DOMESTIC_MOBILE = re.compile(r"010\d{8}")
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone_number(value: str) -> str:
+    """Return canonical E.164 form of a Korean mobile number, or raise ValueError"""
+    if _E164_MOBILE.fullmatch(value):
+        return value
+
+    digits = _NON_DIGITS.sub("", value)
+    if digits.startswith(COUNTRY_CODE):
+        digits = digits[len(COUNTRY_CODE):]
+        if not digits.startswith("0"):
+            digits = "0" + digits
+    if not _DOMESTIC_MOBILE.fullmatch(digits):
+        raise ValueError("Invalid mobile phone number (expected 010-XXXX-XXXX)")
+    return f"+{COUNTRY_CODE}{digits[1:]}"
+
+
+def try_normalize_phone_number(value: str) -> Optional[str]:
+    """Like normalize_phone_number, but return None for invalid input"""
+    try:
+        return normalize_phone_number(value)
+    except ValueError:
+        return None
+
+
+def is_valid_phone_number(value: str) -> bool:
+    return try_normalize_phone_number(value) is not None
+
+
+def phone_search_digits(value: str) -> str:
+    """Digits to suffix-match against stored numbers
+
+    A complete number is converted to its E.164 digits so that typing the
+    full domestic form still matches.
+    """
+    normalized = try_normalize_phone_number(value)
+    if normalized is not None:
+        return normalized[1:]
+    return _NON_DIGITS.sub("", value)
+
+
+def format_phone_number(value: str) -> str:
+    """Format a stored E.164 number for display (010-1234-5678)"""
+    if not _E164_MOBILE.fullmatch(value):
+        return value
+    local = "0" + value[len(COUNTRY_CODE) + 1:]
+    return f"{local[:3]}-{local[3:7]}-{local[7:]}"